@@ -1 +1 @@
-__version__ = '2.8.2'
+__version__ = '2.33.0'
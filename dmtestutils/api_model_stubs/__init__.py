@@ -1,13 +1,56 @@
+import importlib
+import sys
+
 from .base import BaseAPIModelStub
-from .audit_event import AuditEventStub
-from .brief import BriefStub
-from .brief_response import BriefResponseStub
-from .framework import FrameworkStub
-from .framework_agreement import FrameworkAgreementStub
-from .lot import LotStub, as_a_service_lots, cloud_lots, dos_lots
-from .services import ArchivedServiceStub, DraftServiceStub, ServiceStub
-from .supplier import SupplierStub
-from .supplier_framework import SupplierFrameworkStub
+
+
+# Stub classes are imported from their modules on first access (see ``__getattr__`` below), so that importing this
+# package doesn't pay for importing every stub module
+_lazy_exports = {
+    "AuditEventStub": ".audit_event",
+    "BriefStub": ".brief",
+    "BriefResponseStub": ".brief_response",
+    "FrameworkStub": ".framework",
+    "FrameworkAgreementStub": ".framework_agreement",
+    "LotStub": ".lot",
+    "as_a_service_lots": ".lot",
+    "cloud_lots": ".lot",
+    "dos_lots": ".lot",
+    "ArchivedServiceStub": ".services",
+    "DraftServiceStub": ".services",
+    "ServiceStub": ".services",
+    "SupplierStub": ".supplier",
+    "SupplierFrameworkStub": ".supplier_framework",
+}
+
+__all__ = [
+    "BaseAPIModelStub",
+    *_lazy_exports,
+    "DirectAwardProjectStub",
+    "DirectAwardSearchStub",
+    "OutcomeStub",
+    "UserStub",
+]
+
+
+def __getattr__(name):
+    try:
+        module_name = _lazy_exports[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_exports))
+
+
+if sys.version_info < (3, 7):
+    # module-level __getattr__ (PEP 562) isn't supported, so import everything up front
+    for _name in _lazy_exports:
+        __getattr__(_name)
 
 
 # TODO: Flesh out the stubs below and move to their own modules
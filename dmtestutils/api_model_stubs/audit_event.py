@@ -2,6 +2,7 @@ from .base import BaseAPIModelStub
 
 
 class AuditEventStub(BaseAPIModelStub):
+    derived_keys = frozenset(("acknowledged", "acknowledgedAt", "acknowledgedBy"))
     resource_name = 'auditEvents'
     default_data = {
             'id': 123,
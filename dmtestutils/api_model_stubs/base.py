@@ -1,5 +1,20 @@
-import re
-from copy import deepcopy
+from copy import copy, deepcopy
+from functools import wraps
+import random
+from typing import FrozenSet, Optional
+
+
+def _scaled_once_constructed(init):
+    """
+    Wrap a stub class's ``__init__`` to scale the stub once it has finished, if it's the ``__init__`` the stub was
+    constructed with rather than one called by a subclass's, so subclasses' ``__init__`` s don't have to
+    """
+    @wraps(init)
+    def __init__(self, **kwargs):
+        init(self, **kwargs)
+        if type(self).__init__ is __init__:
+            self._apply_scale()
+    return __init__
 
 
 class BaseAPIModelStub:
@@ -24,12 +39,51 @@ class BaseAPIModelStub:
          example_brief = BriefStub(framework_slug="digital-outcomes-and-specialists-3")
          mocked_get_brief_method.return_value = example_brief.single_result_response()
 
+    Variants of an existing stub, sharing memory with it, can be derived with ``evolve``:
+
+      draft_brief = BriefStub(framework_slug="digital-outcomes-and-specialists-3")
+      briefs_by_status = {status: draft_brief.evolve(status=status) for status in ("live", "closed", "withdrawn")}
+
+    Where the changed kwargs don't affect any of the keys a stub's class derives from its kwargs (as declared by its
+    ``derived_keys``) the variant is made without re-running the class's ``__init__``, so is cheap to make too.
+
+    Stubs which support it (those with ``scalable`` set) can be scaled up to exercise templates with large payloads:
+    ``scale=N`` fills their list-valued fields (e.g. a brief's clarification questions) with N items and their long
+    text fields (e.g. a service's description) with N sentences, once the stub is otherwise complete. The filler text
+    is generated from ``seed``, so is the same every time:
+
+      briefs = [BriefStub(status="live", scale=n).single_result_response() for n in (1, 10, 100, 1000)]
+
     """
     resource_name = None
     default_data = {}
     optional_keys = []
-
+    scalable = False
+    # the kwargs and response data keys this class's ``__init__`` reads or writes other than by simply copying kwargs
+    # into the response data. A subclass which overrides ``__init__`` without declaring these has all its variants
+    # built from scratch by evolve()
+    derived_keys: FrozenSet[str] = frozenset()
+
+    def __new__(cls, **kwargs):
+        self = super().__new__(cls)
+        # keep the kwargs the stub was constructed with so that evolve() can derive variants from them. These are
+        # copied by evolve() rather than here, so that constructing a stub from large kwargs stays cheap
+        self._stub_kwargs = kwargs
+        return self
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._defines_init = "__init__" in vars(cls)
+        # wrapping even an inherited __init__ means a mixin's __init__ which comes first in the MRO is covered too
+        cls.__init__ = _scaled_once_constructed(cls.__init__)
+
+    @_scaled_once_constructed
     def __init__(self, **kwargs):
+        self.scale = kwargs.pop("scale", None)
+        self.seed = kwargs.pop("seed", 0)
+        if self.scale is not None and not self.scalable:
+            raise TypeError(f"{type(self).__name__} doesn't support scale")
+
         self.response_data = deepcopy(self.default_data)
         self._normalise_kwargs(kwargs)
         self.response_data.update(**kwargs)
@@ -49,16 +103,11 @@ class BaseAPIModelStub:
 
     def _format_framework(self, slug, *, new_style: bool, old_style: bool):
         """Return a dictionary with correct keys for framework slug"""
-        family, iteration = re.match(r"^(?P<family>[a-z-]*)(?:-(?P<iteration>\d+))?$", slug).groups()
-        name = (
-            {
-                "g-cloud": "G-Cloud",
-                "digital-outcomes-and-specialists": "Digital Outcomes and Specialists",
-            }.get(family,
-                  slug.replace("-", " ").title())
-        )
-        if iteration:
-            name += " " + iteration
+        # imported here as the catalogue's lots are built from LotStubs, which need this module
+        from .framework_catalogue import framework_details
+
+        framework = framework_details(slug)
+        family, name = framework.family, framework.name
 
         d = {}
 
@@ -80,12 +129,77 @@ class BaseAPIModelStub:
 
         return d
 
+    def _scale_response_data(self, scale: int, text: "FillerText"):
+        """Fill the stub's list-valued fields with ``scale`` items and its long text fields with ``scale`` sentences"""
+
+    def _apply_scale(self):
+        """Scale the stub's response data if it was constructed with ``scale``, once its ``__init__`` has finished"""
+        if self.scale is not None:
+            self._scale_response_data(self.scale, FillerText(f"{type(self).__name__}-{self.seed}"))
+
     def _format_values(self, d):
         """Format all entries in a dictionary using values from response data"""
         return {
             k: v.format(**self.response_data) for k, v in d.items()
         }
 
+    def evolve(self, **changes):
+        """
+        Return a new stub of the same class, constructed as though the kwargs given to this stub had been updated with
+        ``changes``. Any parts of the new stub's response data which are unchanged from this stub's are shared with
+        this stub rather than copied, so many variants of one stub take up little more memory than the stub itself.
+
+        As a result, the response data of stubs derived with ``evolve`` should be treated as immutable. If none of
+        ``changes`` is one of the class's ``derived_keys`` the changes are simply applied to a copy of this stub's
+        response data; otherwise the variant is built from scratch and then compared with this stub, which saves
+        memory rather than time.
+        """
+        variant = self._evolve_underived(changes)
+        if variant is not None:
+            return variant
+
+        # stubs can modify the kwargs they're given, so give the variant its own copy of this stub's
+        variant = type(self)(**{**deepcopy(self._stub_kwargs), **changes})
+        # the top level dict itself is never shared, as some stubs add keys to it in single_result_response()
+        variant.response_data = {
+            k: _share_unchanged(self.response_data[k], v) if k in self.response_data else v
+            for k, v in variant.response_data.items()
+        }
+        return variant
+
+    @classmethod
+    def _known_derived_keys(cls) -> Optional[FrozenSet[str]]:
+        """The class's ``derived_keys``, or None if a class in its hierarchy has overridden ``__init__`` without them"""
+        for klass in cls.__mro__:
+            if "derived_keys" in vars(klass):
+                return klass.derived_keys
+            if vars(klass).get("_defines_init", "__init__" in vars(klass)):
+                return None
+
+    def _evolve_underived(self, changes):
+        """
+        Return a variant of this stub with ``changes`` applied directly to its response data, or None if the
+        changes could affect a derived key (or scaling) so the variant needs building from scratch
+        """
+        derived_keys = self._known_derived_keys()
+        if derived_keys is None or self.scale is not None or {"scale", "seed"} & changes.keys():
+            return None
+
+        kwargs = {**self._stub_kwargs, **changes}
+        old_kwargs, new_kwargs = dict(self._stub_kwargs), dict(kwargs)
+        self._normalise_kwargs(old_kwargs)
+        self._normalise_kwargs(new_kwargs)
+        changed_keys = {k for k, v in new_kwargs.items() if k not in old_kwargs or old_kwargs[k] is not v}
+        # a change can drop a key from the normalised kwargs (e.g. by setting its snake_case kwarg to None), in which
+        # case the key would revert to its default
+        if not old_kwargs.keys() <= new_kwargs.keys() or (changed_keys | changes.keys()) & derived_keys:
+            return None
+
+        variant = copy(self)
+        variant._stub_kwargs = kwargs
+        variant.response_data = {**self.response_data, **{k: new_kwargs[k] for k in changed_keys}}
+        return variant
+
     def response(self):
         return self.response_data
 
@@ -95,3 +209,46 @@ class BaseAPIModelStub:
                 self.resource_name: self.response()
             }
         return self.response()
+
+
+_filler_words = (
+    "agile", "analysis", "api", "approach", "assessment", "backend", "budget", "cloud", "content", "contract", "data",
+    "delivery", "design", "digital", "discovery", "evidence", "experience", "frontend", "hosting", "infrastructure",
+    "migration", "outcome", "platform", "portal", "project", "research", "security", "service", "software",
+    "specialist", "support", "team", "testing", "transformation", "user", "website",
+)
+
+
+class FillerText:
+    """Deterministic filler text for scaled stubs, generated from a seed"""
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+
+    def sentence(self, word_count: int = 12) -> str:
+        return " ".join(self.random.choices(_filler_words, k=word_count)).capitalize() + "."
+
+    def sentences(self, count: int, word_count: int = 12) -> str:
+        return " ".join(self.sentence(word_count) for _ in range(count))
+
+
+def _share_unchanged(original, new):
+    """
+    Return ``new``, with any subtrees that are equal to the corresponding subtree of ``original`` replaced by the
+    original's subtree
+    """
+    if original is new or type(original) is not type(new):
+        return new
+
+    if isinstance(new, dict):
+        shared = {k: _share_unchanged(original[k], v) if k in original else v for k, v in new.items()}
+        if len(shared) == len(original) and all(k in original and v is original[k] for k, v in shared.items()):
+            return original
+        return shared
+
+    if isinstance(new, list):
+        shared = [_share_unchanged(o, n) for o, n in zip(original, new)] + new[len(original):]
+        if len(shared) == len(original) and all(s is o for s, o in zip(shared, original)):
+            return original
+        return shared
+
+    return original if original == new else new
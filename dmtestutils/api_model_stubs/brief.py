@@ -2,6 +2,15 @@ from .base import BaseAPIModelStub
 
 
 class BriefStub(BaseAPIModelStub):
+    scalable = True
+    derived_keys = frozenset((
+        "user_id", "users", "framework", "frameworkFamily",
+        "framework_family", "framework_name", "framework_slug", "framework_status",
+        "frameworkFramework", "frameworkName", "frameworkSlug", "frameworkStatus",
+        "status", "publishedAt", "applicationsClosedAt", "clarificationQuestionsClosedAt",
+        "clarificationQuestionsPublishedBy", "clarification_questions_closed", "clarificationQuestionsAreClosed",
+        "withdrawnAt", "unsuccessfulAt", "cancelledAt",
+    ))
     resource_name = 'briefs'
     user = {
         "active": True,
@@ -94,6 +103,18 @@ class BriefStub(BaseAPIModelStub):
         elif self.response_data['status'] == "cancelled":
             self.response_data["cancelledAt"] = "2016-05-07T00:00:00.000000Z"
 
+    def _scale_response_data(self, scale, text):
+        self.response_data["essentialRequirements"] = [text.sentence() for _ in range(scale)]
+        self.response_data["niceToHaveRequirements"] = [text.sentence() for _ in range(scale)]
+        self.response_data["clarificationQuestions"] = [
+            {
+                "question": text.sentences(2),
+                "answer": text.sentences(3),
+                "publishedAt": "2016-04-01T00:00:00.000000Z",
+            }
+            for _ in range(scale)
+        ]
+
     def single_result_response(self):
         # users and clarificationQuestions are always included in API response
         if 'users' not in self.response_data:
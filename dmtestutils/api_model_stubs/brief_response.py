@@ -1,7 +1,14 @@
+from copy import deepcopy
+
 from .base import BaseAPIModelStub
 
 
 class BriefResponseStub(BaseAPIModelStub):
+    scalable = True
+    derived_keys = frozenset((
+        "brief", "brief_id", "briefId", "framework_slug", "links", "supplier_id", "supplierId", "id",
+        "status", "awardDetails", "awardedAt",
+    ))
     resource_name = 'briefResponses'
     brief = {
         "id": 1234,
@@ -58,8 +65,16 @@ class BriefResponseStub(BaseAPIModelStub):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        if "brief" not in kwargs:
-            self.response_data["brief"] = self.brief.copy()
+        if "brief" in kwargs:
+            # the brief's id and framework slug are set below: copy just the parts that touches, rather than
+            # modifying (or deep-copying, which is slow for large briefs) the caller's brief
+            brief = self.response_data["brief"] = dict(kwargs["brief"])
+            if isinstance(brief.get("framework"), dict):
+                brief["framework"] = dict(brief["framework"])
+        else:
+            self.response_data["brief"] = deepcopy(self.brief)
+        if "links" in kwargs:
+            self.response_data["links"] = dict(kwargs["links"])
 
         if kwargs.get("framework_slug") is not None:
             self.response_data["brief"]["framework"]["slug"] = kwargs.pop("framework_slug")
@@ -82,3 +97,16 @@ class BriefResponseStub(BaseAPIModelStub):
                 self.response_data['awardDetails'] = self.award_details.copy()
                 self.response_data['awardedAt'] = "2017-01-21T12:00:01.000000Z"
             self.response_data["status"] = kwargs.pop("status")
+
+    def _scale_response_data(self, scale, text):
+        # the brief's requirements are scaled too, so there's one piece of evidence for each of them
+        self.response_data["brief"] = {
+            **self.response_data["brief"],
+            "essentialRequirements": [text.sentence() for _ in range(scale)],
+            "niceToHaveRequirements": [text.sentence() for _ in range(scale)],
+        }
+        self.response_data["essentialRequirements"] = [{"evidence": text.sentences(3)} for _ in range(scale)]
+        self.response_data["niceToHaveRequirements"] = [
+            {"yesNo": True, "evidence": text.sentences(3)} if i % 2 == 0 else {"yesNo": False}
+            for i in range(scale)
+        ]
@@ -1,6 +1,6 @@
 from datetime import datetime as dt
 from .base import BaseAPIModelStub
-from .lot import as_a_service_lots, cloud_lots, dos_lots
+from .framework_catalogue import framework_details
 
 
 class FrameworkStub(BaseAPIModelStub):
@@ -66,39 +66,14 @@ class FrameworkStub(BaseAPIModelStub):
     ]
 
     def derive_framework_details_from_slug(self, **kwargs):
-        slug = kwargs.get('slug', 'g-cloud-10')
-        name = kwargs.get('name')
-        lots = kwargs.get('lots', [])
-
-        if slug.startswith('g-cloud'):
-            family = kwargs.get('framework_family') or kwargs.get('family') or 'g-cloud'
-            name = name or 'G-Cloud {}'.format(slug.split('-')[-1])
-            has_direct_award = kwargs.get('has_direct_award', True)
-            has_further_competition = kwargs.get('has_further_competition', False)
-            framework_iteration = int(slug.split('-')[-1])
-            if not lots:
-                lots = as_a_service_lots() if framework_iteration <= 8 else cloud_lots()
-
-        elif slug.startswith('digital-outcomes-and-specialists'):
-            family = kwargs.get('framework_family') or kwargs.get('family', 'digital-outcomes-and-specialists')
-            name = name or slug.replace("-", " ").title().replace('And', 'and')
-            has_direct_award = kwargs.get('has_direct_award', False)
-            has_further_competition = kwargs.get('has_further_competition', True)
-            if not lots:
-                lots = dos_lots()
-
-        else:
-            family = kwargs.get('framework_family') or kwargs.get('family', slug)
-            name = name or slug.replace("-", " ").title()
-            has_direct_award = kwargs.get('has_direct_award', True)
-            has_further_competition = kwargs.get('has_further_competition', True)
+        framework = framework_details(kwargs.get('slug', 'g-cloud-10'))
 
         return {
-            "name": name,
-            "family": family,
-            "hasDirectAward": has_direct_award,
-            "hasFurtherCompetition": has_further_competition,
-            "lots": lots
+            "name": kwargs.get('name') or framework.name,
+            "family": kwargs.get('framework_family') or kwargs.get('family') or framework.family,
+            "hasDirectAward": kwargs.get('has_direct_award', framework.has_direct_award),
+            "hasFurtherCompetition": kwargs.get('has_further_competition', framework.has_further_competition),
+            "lots": kwargs.get('lots') or [dict(lot) for lot in framework.lots],
         }
 
     def __init__(self, **kwargs):
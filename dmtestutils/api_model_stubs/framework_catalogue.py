@@ -0,0 +1,99 @@
+"""
+The frameworks the Digital Marketplace has run, with the details stubs derive from a framework's slug: its family,
+iteration, name, lots and whether it allows direct award and further competition.
+
+  from dmtestutils.api_model_stubs.framework_catalogue import framework_details
+
+  framework_details("g-cloud-12").name  # "G-Cloud 12"
+
+Slugs which aren't in the catalogue have their details derived from the slug instead: frameworks from a known family
+(e.g. a future "g-cloud-14") take their lots and flags from the family's latest framework.
+"""
+from collections import namedtuple
+from functools import lru_cache
+import re
+from typing import Dict, Tuple
+
+from .lot import as_a_service_lots, cloud_lots, dos_lots
+
+
+FrameworkDetails = namedtuple(
+    "FrameworkDetails",
+    ("slug", "family", "iteration", "name", "lots", "has_direct_award", "has_further_competition"),
+)
+
+# stubs copy these before putting them in their response data, as their lot dicts are shared
+_AS_A_SERVICE_LOTS = tuple(as_a_service_lots())
+_CLOUD_LOTS = tuple(cloud_lots())
+_DOS_LOTS = tuple(dos_lots())
+
+FRAMEWORK_CATALOGUE: Tuple[FrameworkDetails, ...] = (
+    FrameworkDetails("g-cloud-4", "g-cloud", 4, "G-Cloud 4", _AS_A_SERVICE_LOTS, True, False),
+    FrameworkDetails("g-cloud-5", "g-cloud", 5, "G-Cloud 5", _AS_A_SERVICE_LOTS, True, False),
+    FrameworkDetails("g-cloud-6", "g-cloud", 6, "G-Cloud 6", _AS_A_SERVICE_LOTS, True, False),
+    FrameworkDetails("g-cloud-7", "g-cloud", 7, "G-Cloud 7", _AS_A_SERVICE_LOTS, True, False),
+    FrameworkDetails("g-cloud-8", "g-cloud", 8, "G-Cloud 8", _AS_A_SERVICE_LOTS, True, False),
+    FrameworkDetails("g-cloud-9", "g-cloud", 9, "G-Cloud 9", _CLOUD_LOTS, True, False),
+    FrameworkDetails("g-cloud-10", "g-cloud", 10, "G-Cloud 10", _CLOUD_LOTS, True, False),
+    FrameworkDetails("g-cloud-11", "g-cloud", 11, "G-Cloud 11", _CLOUD_LOTS, True, False),
+    FrameworkDetails("g-cloud-12", "g-cloud", 12, "G-Cloud 12", _CLOUD_LOTS, True, False),
+    FrameworkDetails("g-cloud-13", "g-cloud", 13, "G-Cloud 13", _CLOUD_LOTS, True, False),
+    FrameworkDetails(
+        "digital-outcomes-and-specialists", "digital-outcomes-and-specialists", 1,
+        "Digital Outcomes and Specialists", _DOS_LOTS, False, True,
+    ),
+    FrameworkDetails(
+        "digital-outcomes-and-specialists-2", "digital-outcomes-and-specialists", 2,
+        "Digital Outcomes and Specialists 2", _DOS_LOTS, False, True,
+    ),
+    FrameworkDetails(
+        "digital-outcomes-and-specialists-3", "digital-outcomes-and-specialists", 3,
+        "Digital Outcomes and Specialists 3", _DOS_LOTS, False, True,
+    ),
+    FrameworkDetails(
+        "digital-outcomes-and-specialists-4", "digital-outcomes-and-specialists", 4,
+        "Digital Outcomes and Specialists 4", _DOS_LOTS, False, True,
+    ),
+    FrameworkDetails(
+        "digital-outcomes-and-specialists-5", "digital-outcomes-and-specialists", 5,
+        "Digital Outcomes and Specialists 5", _DOS_LOTS, False, True,
+    ),
+    FrameworkDetails(
+        "digital-outcomes-and-specialists-6", "digital-outcomes-and-specialists", 6,
+        "Digital Outcomes and Specialists 6", _DOS_LOTS, False, True,
+    ),
+)
+
+FRAMEWORKS_BY_SLUG: Dict[str, FrameworkDetails] = {framework.slug: framework for framework in FRAMEWORK_CATALOGUE}
+
+FAMILY_NAMES = {
+    "g-cloud": "G-Cloud",
+    "digital-outcomes-and-specialists": "Digital Outcomes and Specialists",
+}
+
+_latest_by_family: Dict[str, FrameworkDetails] = {
+    family: max((f for f in FRAMEWORK_CATALOGUE if f.family == family), key=lambda f: f.iteration)
+    for family in FAMILY_NAMES
+}
+
+_slug_pattern = re.compile(r"^(?P<family>[a-z-]*)(?:-(?P<iteration>\d+))?$")
+
+
+@lru_cache(maxsize=1024)
+def _derived_framework_details(slug: str) -> FrameworkDetails:
+    match = _slug_pattern.match(slug)
+    family, iteration = match.groups() if match else (slug, None)
+    iteration = int(iteration) if iteration else None
+
+    latest = _latest_by_family.get(family)
+    if latest is None:
+        # not a framework we know anything about, so make no assumptions about it
+        return FrameworkDetails(slug, family, iteration, slug.replace("-", " ").title(), (), True, True)
+
+    name = FAMILY_NAMES[family] if iteration is None else f"{FAMILY_NAMES[family]} {iteration}"
+    return latest._replace(slug=slug, iteration=iteration, name=name)
+
+
+def framework_details(slug: str) -> FrameworkDetails:
+    """Return the details of the framework with ``slug``, deriving them from the slug if it isn't in the catalogue"""
+    return FRAMEWORKS_BY_SLUG.get(slug) or _derived_framework_details(slug)
@@ -9,6 +9,13 @@ __all__ = [
 
 
 class ServicesStubsBase(BaseAPIModelStub):
+    scalable = True
+    # links are formatted from the id, which the subclasses also set
+    derived_keys = frozenset((
+        "id", "serviceId", "service_id", "links",
+        "framework_family", "framework_framework", "framework_name", "framework_slug",
+        "frameworkFamily", "frameworkFramework", "frameworkName", "frameworkSlug",
+    ))
     resource_name = "services"
     default_data = {
         "id": 1010101010,
@@ -58,8 +65,14 @@ class ServicesStubsBase(BaseAPIModelStub):
                 self._format_framework(self.response_data["frameworkSlug"], new_style=False, old_style=True)
             )
 
+    def _scale_response_data(self, scale, text):
+        self.response_data["serviceDescription"] = text.sentences(scale)
+        self.response_data["serviceFeatures"] = [text.sentence(6) for _ in range(scale)]
+        self.response_data["serviceBenefits"] = [text.sentence(6) for _ in range(scale)]
+
 
 class ArchivedServiceStub(ServicesStubsBase):
+    derived_keys = ServicesStubsBase.derived_keys
     links = {
         "self": "http://127.0.0.1:5000/archived-services/{id}",
     }
@@ -74,6 +87,7 @@ class ArchivedServiceStub(ServicesStubsBase):
 
 
 class DraftServiceStub(ServicesStubsBase):
+    derived_keys = ServicesStubsBase.derived_keys
     links = {
         "self": "http://127.0.0.1:5000/draft-services/{id}",
         "publish": "http://127.0.0.1:5000/draft-services/{id}/publish",
@@ -101,6 +115,7 @@ class DraftServiceStub(ServicesStubsBase):
 
 
 class ServiceStub(ServicesStubsBase):
+    derived_keys = ServicesStubsBase.derived_keys
     links = {
         "self": "http://127.0.0.1:5000/services/{id}",
     }
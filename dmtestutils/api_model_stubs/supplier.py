@@ -1,7 +1,10 @@
+from copy import deepcopy
+
 from .base import BaseAPIModelStub
 
 
 class SupplierStub(BaseAPIModelStub):
+    scalable = True
     resource_name = 'suppliers'
     contact_information = {
         "address1": "123 Fake Road",
@@ -58,12 +61,13 @@ class SupplierStub(BaseAPIModelStub):
             self.response_data["links"]["self"] = "http://localhost:5000/suppliers/{id}".format(id=kwargs.get('id'))
 
         if kwargs.get('contact_id'):
-            self.contact_information['id'] = kwargs.get('contact_id')
-            self.contact_information['links']['self'] = \
+            contact_information = deepcopy(self.contact_information)
+            contact_information['id'] = kwargs.get('contact_id')
+            contact_information['links']['self'] = \
                 "http://localhost:5000/suppliers/{id}/contact-information/{contact_id}".format(
                     id=self.response_data['id'], contact_id=kwargs.get('contact_id')
                 )
-            self.response_data["contactInformation"] = [self.contact_information]
+            self.response_data["contactInformation"] = [contact_information]
             # Don't include the kwarg in response
             del self.response_data['contact_id']
 
@@ -72,3 +76,22 @@ class SupplierStub(BaseAPIModelStub):
             del self.response_data['companiesHouseNumber']
             # Companies without a Companies House number aren't necessarily overseas, but they might well be
             self.response_data['registrationCountry'] = 'country:NZ'
+
+    def _scale_response_data(self, scale, text):
+        self.response_data["description"] = text.sentences(scale)
+
+        # base the contacts on the stub's first, or the default if it was given none
+        first_contact = (self.response_data.get("contactInformation") or [self.contact_information])[0]
+        self.response_data["contactInformation"] = [
+            {
+                **first_contact,
+                "id": first_contact["id"] + i,
+                "contactName": text.sentence(2)[:-1],
+                "links": {
+                    "self": "http://localhost:5000/suppliers/{id}/contact-information/{contact_id}".format(
+                        id=self.response_data["id"], contact_id=first_contact["id"] + i
+                    ),
+                },
+            }
+            for i in range(scale)
+        ]
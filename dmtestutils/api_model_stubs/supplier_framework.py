@@ -1,7 +1,15 @@
 from .base import BaseAPIModelStub
+from .framework_catalogue import framework_details
 
 
 class SupplierFrameworkStub(BaseAPIModelStub):
+    derived_keys = frozenset((
+        "framework_slug", "frameworkSlug", "frameworkFamily", "frameworkFramework",
+        "agreed_variations", "agreedVariations", "with_declaration", "declaration_status", "declaration",
+        "with_agreement", "with_users", "agreementId", "agreementReturned", "agreementReturnedAt",
+        "agreementDetails", "agreementPath", "countersigned", "countersignedAt", "countersignedDetails",
+        "agreementStatus",
+    ))
     resource_name = 'frameworkInterest'
     default_data = {
         "agreementId": None,
@@ -33,6 +41,13 @@ class SupplierFrameworkStub(BaseAPIModelStub):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        if (
+            ("framework_slug" in kwargs or "frameworkSlug" in kwargs)
+            and "frameworkFamily" not in kwargs and "frameworkFramework" not in kwargs
+        ):
+            family = framework_details(self.response_data["frameworkSlug"]).family
+            self.response_data["frameworkFamily"] = self.response_data["frameworkFramework"] = family
+
         if kwargs.get('agreed_variations'):
             self.response_data['agreedVariations'] = {
                 "1": {
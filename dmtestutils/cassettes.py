@@ -0,0 +1,240 @@
+"""
+Record and replay the responses of an API client (real or fake) to and from a compact "cassette" file.
+
+Calls made through a ``CassetteRecorder`` are passed on to the wrapped client, and each call's method name, arguments
+and response are written to the cassette:
+
+  with CassetteRecorder(DataAPIClient(...), "tests/cassettes/brief-page.dmcassette") as data_api_client:
+      data_api_client.get_brief(1234)
+
+A ``CassettePlayer`` can then stand in for the client, answering each call with the response recorded for a call with
+the same method and arguments:
+
+  with CassettePlayer("tests/cassettes/brief-page.dmcassette") as data_api_client:
+      with mock.patch("app.main.views.briefs.data_api_client", data_api_client):
+          ...
+
+The cassette file holds the (compressed) responses followed by an index of call signature hashes, sorted so that it
+can be binary searched in place. The player memory-maps the file and only ever decodes the responses to calls that
+are actually made, so loading even very large cassettes is almost free. If the same call was recorded more than once,
+the responses are replayed in the order they were recorded, with the last one repeated thereafter.
+
+Exceptions raised by the client (e.g. a ``dmapiclient.HTTPError`` for a 404) are recorded too, and raised again when
+the call is replayed.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from hashlib import blake2b
+import importlib
+import json
+import mmap
+import re
+import struct
+from typing import Any, Dict, Iterator, List, Tuple
+from unittest import mock
+from uuid import UUID
+import zlib
+
+
+_MAGIC = b"DMCASS01"
+_HEADER = struct.Struct("<8s")
+# signature digest, offset of the response within the file, length of the compressed response
+_INDEX_ENTRY = struct.Struct("<16sQI")
+# offset of the index within the file, number of index entries
+_FOOTER = struct.Struct("<QQ8s")
+
+
+# the default repr of objects, which includes their address and so is different every run
+_unstable_repr = re.compile(r" at 0x[0-9a-fA-F]+>")
+
+
+def _signature_default(value):
+    """Turn an argument JSON can't encode into something that's the same every time the test is run"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, Enum):
+        return f"{type(value).__qualname__}.{value.name}"
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=lambda item: json.dumps(item, sort_keys=True, default=_signature_default))
+    representation = repr(value)
+    if _unstable_repr.search(representation):
+        raise TypeError(f"Can't record a call with argument {representation}, as its repr differs between runs")
+    return representation
+
+
+def call_signature_digest(method_name: str, args: tuple, kwargs: dict) -> bytes:
+    """Return a hash identifying a call to ``method_name`` with the given arguments"""
+    signature = json.dumps(
+        [method_name, list(args), kwargs], sort_keys=True, default=_signature_default, separators=(",", ":")
+    )
+    return blake2b(signature.encode("utf-8"), digest_size=16).digest()
+
+
+def _describe_exception(exception: Exception) -> Dict[str, Any]:
+    described = {
+        "type": f"{type(exception).__module__}:{type(exception).__qualname__}",
+        "args": json.loads(json.dumps(exception.args, default=str)),
+    }
+    if hasattr(exception, "status_code"):
+        # dmapiclient's errors are built from the response, so keep what's needed to fake one
+        described["statusCode"] = exception.status_code
+        described["message"] = str(getattr(exception, "message", ""))
+    return described
+
+
+def _recorded_exception_class(described: Dict[str, Any]) -> type:
+    module_name, qualname = described["type"].split(":")
+    try:
+        exception_class = importlib.import_module(module_name)
+        for name in qualname.split("."):
+            exception_class = getattr(exception_class, name)
+    except Exception as e:
+        raise AssertionError(f"Couldn't find the recorded exception type {described['type']}") from e
+    # cassettes are data, so mustn't be able to make us call anything other than an exception class
+    if not (isinstance(exception_class, type) and issubclass(exception_class, BaseException)):
+        raise AssertionError(f"The cassette entry {described!r} doesn't record an exception type")
+    return exception_class
+
+
+def _rebuild_exception(described: Dict[str, Any]) -> Exception:
+    exception_class = _recorded_exception_class(described)
+    try:
+        if "statusCode" in described:
+            response = mock.Mock(status_code=described["statusCode"])
+            response.json.return_value = {"error": described["message"]}
+            return exception_class(response, described["message"])
+        return exception_class(*described["args"])
+    except Exception as e:
+        raise AssertionError(f"Couldn't raise the recorded {described['type']}{tuple(described['args'])}") from e
+
+
+class CassetteRecorder:
+    """
+    Wraps ``client``, recording every method call made through it (and its response) to a cassette at ``path``. The
+    cassette is complete once ``close()`` has been called, or the recorder has been used as a context manager.
+
+    Methods returning iterators (e.g. ``find_services_iter``) have their results consumed and recorded in full, and
+    exceptions raised by the client are recorded before being passed on.
+    """
+    def __init__(self, client, path: str):
+        self._client = client
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(_MAGIC))
+        self._index: List[Tuple[bytes, int, int, int]] = []
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._client, name)
+        if not callable(attribute):
+            return attribute
+
+        def _recorded(*args, **kwargs):
+            digest = call_signature_digest(name, args, kwargs)
+            try:
+                response = attribute(*args, **kwargs)
+            except Exception as e:
+                self._record(digest, {"error": _describe_exception(e)})
+                raise
+            is_iterator = isinstance(response, Iterator)
+            if is_iterator:
+                response = list(response)
+            self._record(digest, {"response": response, "iterator": is_iterator})
+            return iter(response) if is_iterator else response
+        return _recorded
+
+    def _record(self, digest: bytes, entry: Dict[str, Any]):
+        payload = zlib.compress(json.dumps(entry, separators=(",", ":")).encode("utf-8"))
+        self._index.append((digest, len(self._index), self._file.tell(), len(payload)))
+        self._file.write(payload)
+
+    def close(self):
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        # sorting on (digest, recording order) keeps repeated calls in the order they were made
+        for digest, _, offset, length in sorted(self._index):
+            self._file.write(_INDEX_ENTRY.pack(digest, offset, length))
+        self._file.write(_FOOTER.pack(index_offset, len(self._index), _MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class CassettePlayer:
+    """
+    Stands in for an API client, answering method calls with the responses recorded in the cassette at ``path``. Any
+    call that wasn't recorded raises an ``AssertionError``.
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size + _FOOTER.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a cassette file")
+        (magic,) = _HEADER.unpack_from(self._mmap, 0)
+        self._index_offset, self._index_length, footer_magic = _FOOTER.unpack_from(
+            self._mmap, len(self._mmap) - _FOOTER.size
+        )
+        if magic != _MAGIC or footer_magic != _MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a cassette file")
+        self._replay_counts: Dict[bytes, int] = {}
+
+    def _index_entry(self, position: int) -> Tuple[bytes, int, int]:
+        return _INDEX_ENTRY.unpack_from(self._mmap, self._index_offset + position * _INDEX_ENTRY.size)
+
+    def _find(self, digest: bytes) -> int:
+        """Return the position of the first index entry for ``digest``, or -1 if there isn't one"""
+        low, high = 0, self._index_length
+        while low < high:
+            middle = (low + high) // 2
+            if self._index_entry(middle)[0] < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self._index_length and self._index_entry(low)[0] == digest else -1
+
+    def replay(self, method_name: str, *args, **kwargs):
+        digest = call_signature_digest(method_name, args, kwargs)
+        first = self._find(digest)
+        if first == -1:
+            raise AssertionError(f"No recorded response for {method_name}(*{args!r}, **{kwargs!r})")
+
+        # move on to the next recording of this call, if there is one
+        position = first + self._replay_counts.get(digest, 0)
+        if position >= self._index_length or self._index_entry(position)[0] != digest:
+            position -= 1
+        else:
+            self._replay_counts[digest] = self._replay_counts.get(digest, 0) + 1
+
+        _, offset, length = self._index_entry(position)
+        entry = json.loads(zlib.decompress(self._mmap[offset:offset + length]).decode("utf-8"))
+        if "error" in entry:
+            raise _rebuild_exception(entry["error"])
+        return iter(entry["response"]) if entry["iterator"] else entry["response"]
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def _replayed(*args, **kwargs):
+            return self.replay(name, *args, **kwargs)
+        return _replayed
+
+    def __len__(self):
+        return self._index_length
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
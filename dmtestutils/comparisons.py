@@ -1,9 +1,33 @@
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
 from functools import lru_cache
+from itertools import chain
+import json
 import re
 from types import MappingProxyType
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, Union
 from typing.re import Pattern
 
 
+def _freeze(value) -> Hashable:
+    """
+    Return a hashable equivalent of ``value``, such that equal values have equal frozen forms. Objects which can't be
+    frozen are represented by their identity.
+    """
+    if isinstance(value, dict):
+        return (dict, frozenset((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_freeze(v) for v in value))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    try:
+        hash(value)
+    except TypeError:
+        return (id, id(value))
+    return value
+
+
 class RestrictedAny:
     """
     Analogous to mock.ANY, this class takes an arbitrary callable in its constructor and the returned instance will
@@ -16,18 +40,46 @@ class RestrictedAny:
     True
     >>> (4, 9, 6,) == (4, RestrictedAny(lambda x: x % 2), 6,)
     True
+
+    Matchers can be combined with ``&`` (see ``AllOf``), ``|`` (see ``AnyOf``) and ``~`` (see ``Not``).
+
+    Compared with another matcher, a matcher is equal to it if they match in the same way, and matchers hash
+    accordingly, so they can be deduplicated and used as dict keys.
     """
+    # a rough relative cost of evaluating the matcher, used to evaluate cheaper matchers first when combining them
+    _cost = 10
+
     def __init__(self, condition):
         self._condition = condition
 
+    def _key(self) -> Hashable:
+        return (RestrictedAny, self._condition)
+
     def __eq__(self, other):
+        if isinstance(other, RestrictedAny):
+            return self._key() == other._key()
         return self._condition(other)
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self._condition})"
 
     def __hash__(self):
-        return None
+        return hash(self._key())
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+    def __rand__(self, other):
+        return AllOf(other, self)
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __ror__(self, other):
+        return AnyOf(other, self)
+
+    def __invert__(self):
+        return Not(self)
 
 
 class AnySupersetOf(RestrictedAny):
@@ -39,10 +91,17 @@ class AnySupersetOf(RestrictedAny):
     >>> [{"a": 123, "b": 456, "less": "predictabananas"}, 789] == [AnySupersetOf({"a": 123, "b": 456}), 789]
     True
     """
+    _cost = 30
+
     def __init__(self, subset_dict):
         # take an immutable dict copy of supplied dict-like object
         self._subset_dict = MappingProxyType(dict(subset_dict))
-        super().__init__(lambda other: self._subset_dict == {k: v for k, v in other.items() if k in self._subset_dict})
+        super().__init__(lambda other: isinstance(other, Mapping) and self._subset_dict == {
+            k: v for k, v in other.items() if k in self._subset_dict
+        })
+
+    def _key(self):
+        return (AnySupersetOf, _freeze(dict(self._subset_dict)))
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self._subset_dict})"
@@ -55,6 +114,7 @@ class AnyStringMatching(RestrictedAny):
     >>> {"a": "Metempsychosis", "b": "c"} == {"a": AnyStringMatching(r"m+.+psycho.*", flags=re.I), "b": "c"}
     True
     """
+    _cost = 20
     _cached_re_compile = staticmethod(lru_cache(maxsize=32)(re.compile))
 
     def __init__(self, *args, **kwargs):
@@ -69,6 +129,9 @@ class AnyStringMatching(RestrictedAny):
         )
         super().__init__(lambda other: isinstance(other, (str, bytes)) and bool(self._regex.match(other)))
 
+    def _key(self):
+        return (AnyStringMatching, self._regex.pattern, self._regex.flags)
+
     def __repr__(self):
         return f"{self.__class__.__name__}({self._regex})"
 
@@ -83,9 +146,603 @@ class ExactIdentity(RestrictedAny):
     >>> (7, ExactIdentity(x),) == (7, [],)
     False
     """
+    _cost = 0
+
     def __init__(self, reference_object):
         self._reference_object = reference_object
         super().__init__(lambda other: self._reference_object is other)
 
+    def _key(self):
+        return (ExactIdentity, id(self._reference_object))
+
     def __repr__(self):
         return f"{self.__class__.__name__}({self._reference_object!r} @ {hex(id(self._reference_object))})"
+
+
+class AnyInstanceOf(RestrictedAny):
+    """
+    Instance will appear to "equal" any instance of the constructor-supplied type(s)
+
+    >>> {"a": 123, "b": "c"} == {"a": AnyInstanceOf(int), "b": AnyInstanceOf(str, bytes)}
+    True
+    """
+    _cost = 1
+
+    def __init__(self, *types):
+        self._types = types
+        super().__init__(lambda other: isinstance(other, self._types))
+
+    def _key(self):
+        return (AnyInstanceOf, frozenset(self._types))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({', '.join(t.__name__ for t in self._types)})"
+
+
+class AnyIn(RestrictedAny):
+    """
+    Instance will appear to "equal" any member of the constructor-supplied collection
+
+    >>> ("draft", 2) == (AnyIn({"draft", "live"}), AnyIn(range(5)))
+    True
+    """
+    _cost = 2
+
+    def __init__(self, collection):
+        # the collection may be an iterator, which can only be consumed once
+        collection = tuple(collection)
+        try:
+            self._collection = frozenset(collection)
+        except TypeError:
+            # unhashable members
+            self._collection = collection
+        super().__init__(lambda other: _is_member(other, self._collection))
+
+    def _key(self):
+        return (AnyIn, _freeze(self._collection))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({sorted(self._collection, key=repr)!r})"
+
+
+def _is_member(value, collection) -> bool:
+    try:
+        return value in collection
+    except TypeError:
+        # an unhashable value can't be in a frozenset
+        return False
+
+
+def _matcher_key(matcher) -> Hashable:
+    return matcher._key() if isinstance(matcher, RestrictedAny) else (None, _freeze(matcher))
+
+
+def _combined_matchers(combinator_class, matchers) -> tuple:
+    """
+    Flatten any nested ``combinator_class`` instances in ``matchers``, drop duplicates and order the result cheapest
+    first. Plain (non-matcher) values are compared by equality, and treated as cheap.
+    """
+    flattened = {}
+    for matcher in matchers:
+        for child in matcher._matchers if type(matcher) is combinator_class else (matcher,):
+            flattened.setdefault(_matcher_key(child), child)
+    # sorted() is stable, so matchers of equal cost are evaluated in the order they were given
+    return tuple(sorted(flattened.values(), key=lambda m: getattr(m, "_cost", 1)))
+
+
+class _Combination(RestrictedAny):
+    _evaluate = None
+
+    def __init__(self, *matchers):
+        self._matchers = _combined_matchers(type(self), matchers)
+        super().__init__(lambda other: self._evaluate(matcher == other for matcher in self._matchers))
+
+    @property
+    def _cost(self):
+        return sum(getattr(m, "_cost", 1) for m in self._matchers)
+
+    def _key(self):
+        return (type(self), frozenset(_matcher_key(m) for m in self._matchers))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({', '.join(repr(m) for m in self._matchers)})"
+
+
+class AllOf(_Combination):
+    """
+    Instance will appear to "equal" anything which all of the constructor-supplied matchers (or values) equal.
+
+    Matchers are evaluated cheapest first, stopping at the first that doesn't match, so e.g. type checks are made
+    before regex matches however the ``AllOf`` is written. ``a & b`` is equivalent to ``AllOf(a, b)``.
+
+    >>> "Metempsychosis" == AnyStringMatching(r"m+.+psycho.*", flags=re.I) & AnyInstanceOf(str) & ~AnyIn({"", "x"})
+    True
+    """
+    _evaluate = staticmethod(all)
+
+
+class AnyOf(_Combination):
+    """
+    Instance will appear to "equal" anything which any of the constructor-supplied matchers (or values) equal.
+
+    Matchers are evaluated cheapest first, stopping at the first that matches. ``a | b`` is equivalent to
+    ``AnyOf(a, b)``.
+
+    >>> ["live", "closed"] == [AnyOf("live", AnyStringMatching(r"clos")), AnyIn({"draft"}) | AnyIn({"closed"})]
+    True
+    """
+    _evaluate = staticmethod(any)
+
+
+class Not(RestrictedAny):
+    """
+    Instance will appear to "equal" anything the constructor-supplied matcher (or value) doesn't. ``~a`` is equivalent
+    to ``Not(a)``.
+
+    >>> {"a": "b"} == {"a": Not(AnyInstanceOf(int))}
+    True
+    """
+    def __init__(self, matcher):
+        self._matcher = matcher
+        super().__init__(lambda other: not (self._matcher == other))
+
+    @property
+    def _cost(self):
+        return getattr(self._matcher, "_cost", 1)
+
+    def _key(self):
+        return (Not, _matcher_key(self._matcher))
+
+    def __invert__(self):
+        return self._matcher
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._matcher!r})"
+
+
+_NO_VALUE_KEY = object()
+
+
+def _value_key(value) -> Hashable:
+    """
+    Return a hashable key such that values with equal keys are equal, or ``_NO_VALUE_KEY`` if ``value`` can't be
+    compared by key, because it is (or contains) a matcher or something unhashable
+    """
+    if isinstance(value, RestrictedAny):
+        return _NO_VALUE_KEY
+    if isinstance(value, dict):
+        items = [(k, _value_key(v)) for k, v in value.items()]
+        return _NO_VALUE_KEY if any(v is _NO_VALUE_KEY for _, v in items) else (dict, frozenset(items))
+    if isinstance(value, (list, tuple)):
+        items = tuple(_value_key(v) for v in value)
+        return _NO_VALUE_KEY if _NO_VALUE_KEY in items else (type(value), items)
+    try:
+        hash(value)
+    except TypeError:
+        return _NO_VALUE_KEY
+    return value
+
+
+def _hash_index(items: Sequence, item_key) -> Tuple[Dict[Hashable, List[int]], List[int]]:
+    """
+    Index the positions of ``items`` by the value key ``item_key`` gives them, skipping those it gives ``None``. The
+    positions of items whose key is ``_NO_VALUE_KEY`` are returned separately, as they could equal anything.
+    """
+    index, unindexable = defaultdict(list), []
+    for j, item in enumerate(items):
+        value_key = item_key(item)
+        if value_key is not None:
+            (unindexable if value_key is _NO_VALUE_KEY else index[value_key]).append(j)
+    return index, unindexable
+
+
+def _indexed_candidates(matchers: Sequence, items: Sequence) -> List[Optional[Tuple[List[int], int]]]:
+    """
+    For each of ``matchers`` which is a plain value, or an ``AnySupersetOf`` of plain values, use a hash index of
+    ``items`` to find the (positions of the) only items it could equal, along with the position in them to start
+    looking from. Other matchers get ``None``.
+    """
+    candidates: List[Optional[Tuple[List[int], int]]] = [None] * len(matchers)
+    groups = defaultdict(list)
+    value_keys = {}
+    for i, matcher in enumerate(matchers):
+        if type(matcher) is AnySupersetOf:
+            keys = tuple(matcher._subset_dict)
+            value_key = _value_key(tuple(matcher._subset_dict.values()))
+            if value_key is not _NO_VALUE_KEY:
+                groups[frozenset(keys)].append((i, keys, value_key))
+        elif _value_key(matcher) is not _NO_VALUE_KEY:
+            value_keys[i] = _value_key(matcher)
+
+    for key_set, group in groups.items():
+        keys = group[0][1]
+        index, unindexable = _hash_index(
+            items,
+            lambda item: _value_key(tuple(item[k] for k in keys))
+            if isinstance(item, Mapping) and all(k in item for k in keys) else None,
+        )
+        for i, matcher_keys, value_key in group:
+            if matcher_keys != keys:
+                # the same keys in a different order
+                value_key = _value_key(tuple(matchers[i]._subset_dict[k] for k in keys))
+            candidates[i] = (index.get(value_key, []) + unindexable, 0)
+
+    if value_keys:
+        index, unindexable = _hash_index(items, _value_key)
+        positions = {value_key: index.get(value_key, []) + unindexable for value_key in set(value_keys.values())}
+        # start repeated values at successive positions, so each usually finds a free item straight away
+        repeats = Counter()
+        for i, value_key in value_keys.items():
+            candidates[i] = (positions[value_key], repeats[value_key])
+            repeats[value_key] += 1
+    return candidates
+
+
+def _all_matched(matchers: Sequence, items: Sequence, item_owners: Optional[List[Optional[int]]] = None) -> bool:
+    """
+    Return whether each of ``matchers`` can be paired with a different one of ``items`` that it equals, by finding a
+    maximum bipartite matching with augmenting paths. Gives up as soon as any matcher can't be paired.
+
+    ``item_owners`` can give pairs already found (the position of the matcher paired with each item, or None), which
+    are kept and extended in-place, so a failed attempt can be carried on from rather than repeated.
+    """
+    def equal(i, j):
+        return matchers[i] == items[j]
+
+    indexed_candidates = _indexed_candidates(matchers, items)
+
+    def search_order(i):
+        if indexed_candidates[i] is not None:
+            candidates, start = indexed_candidates[i]
+            start = min(start, len(candidates))
+            return (candidates[k] for k in chain(range(start, len(candidates)), range(start)))
+        # lists tend to be in roughly the order the matchers were given in, so start looking at the same position
+        start = min(i, len(items))
+        return chain(range(start, len(items)), range(start))
+
+    if item_owners is None:
+        item_owners = [None] * len(items)
+    paired = set(item_owners)
+    return all(i in paired or _augment(i, item_owners, search_order, equal) for i in range(len(matchers)))
+
+
+def _augment(i: int, item_owners: List[Optional[int]], search_order, equal) -> bool:
+    """
+    Try to pair matcher ``i`` with an item, by depth first search for an augmenting path through the existing pairs in
+    ``item_owners``, updating them if one is found
+    """
+    # path[k] is the item taken by the matcher in stack[k]
+    stack, path, visited = [(i, search_order(i))], [], set()
+    while stack:
+        matcher, candidates = stack[-1]
+        j = next((j for j in candidates if j not in visited and equal(matcher, j)), None)
+        if j is None:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        visited.add(j)
+        path.append(j)
+        if item_owners[j] is None:
+            break
+        stack.append((item_owners[j], search_order(item_owners[j])))
+    else:
+        return False
+
+    for (matcher, _), j in zip(stack, path):
+        item_owners[j] = matcher
+    return True
+
+
+class AnyListContaining(RestrictedAny):
+    """
+    Instance will appear to "equal" any list or tuple containing all of the constructor-supplied ``items`` (which may be
+    matchers), in any order, each being paired with a different element. Repeated items must appear at least as many
+    times as they are given.
+
+    >>> ["a", {"id": 2, "b": "c"}, 3, "a"] == AnyListContaining(["a", AnySupersetOf({"id": 2}), "a"])
+    True
+    >>> [True, 1] == AnyListContaining([1, AnyInstanceOf(bool)])
+    True
+
+    Items which are plain values are first counted into a multiset and matched by hashing, in linear time, so only the
+    items which are (or contain) matchers need to be tried against each remaining element of the list. If that fails,
+    as it can when a plain value takes an element a matcher needed, the pairs found so far are rearranged to make room
+    for the remaining items.
+    """
+    _cost = 40
+    _exact_length = False
+
+    def __init__(self, items):
+        self._items = tuple(items)
+        # the positions in _values of the values with each value key
+        self._value_positions = defaultdict(list)
+        self._values = []
+        self._matchers = []
+        for item in self._items:
+            key = _value_key(item)
+            if key is _NO_VALUE_KEY:
+                self._matchers.append(item)
+            else:
+                self._value_positions[key].append(len(self._values))
+                self._values.append(item)
+        super().__init__(self._matches)
+
+    def _matches(self, other) -> bool:
+        if not isinstance(other, (list, tuple)):
+            return False
+        if self._exact_length and len(other) != len(self._items):
+            return False
+        if len(other) < len(self._items):
+            return False
+
+        # item_owners[j] is the position in _values + _matchers of the item paired with other[j]
+        item_owners: List[Optional[int]] = [None] * len(other)
+        unpaired_values = {key: list(positions) for key, positions in self._value_positions.items()}
+        unmatched = []
+        for j, element in enumerate(other):
+            positions = unpaired_values.get(_value_key(element))
+            if positions:
+                item_owners[j] = positions.pop()
+            else:
+                unmatched.append(j)
+        matcher_owners: List[Optional[int]] = [None] * len(unmatched)
+        if not any(unpaired_values.values()) and _all_matched(
+            self._matchers, [other[j] for j in unmatched], matcher_owners
+        ):
+            return True
+
+        # values which are equal without being interchangeable (e.g. 1 and True), or which are only equal to an
+        # unhashable element (e.g. frozenset({1}) and {1}), can trip up the multiset, so carry on with a full
+        # matching from the pairs found so far, which can re-pair any that got in the way
+        for j, owner in zip(unmatched, matcher_owners):
+            if owner is not None:
+                item_owners[j] = len(self._values) + owner
+        return _all_matched(self._values + self._matchers, other, item_owners)
+
+    def _key(self):
+        return (type(self), frozenset(Counter(_matcher_key(item) for item in self._items).items()))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self._items)!r})"
+
+
+class AnyPermutationOf(AnyListContaining):
+    """
+    Instance will appear to "equal" any list or tuple which is a reordering of the constructor-supplied ``items`` (which
+    may be matchers), each element being paired with a different item.
+
+    >>> [3, "b", {"id": 1, "a": 2}] == AnyPermutationOf([AnySupersetOf({"id": 1}), 3, "b"])
+    True
+    >>> [3, "b", "b"] == AnyPermutationOf([AnyInstanceOf(str), 3])
+    False
+    """
+    _exact_length = True
+
+
+DATESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+_datestamp_re = re.compile(r"(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)\.(\d{1,6})Z", flags=re.ASCII)
+
+
+@lru_cache(maxsize=4096)
+def parse_datestamp(value: str) -> datetime:
+    """
+    Parse a datestamp in the API's ``DATESTAMP_FORMAT`` into a naive UTC ``datetime``, several times faster than
+    ``datetime.strptime`` can. Raises ``ValueError`` for anything else.
+    """
+    match = _datestamp_re.fullmatch(value)
+    if match is None:
+        raise ValueError(f"{value!r} does not match format {DATESTAMP_FORMAT!r}")
+    year, month, day, hour, minute, second, fraction = match.groups()
+    return datetime(
+        int(year), int(month), int(day), int(hour), int(minute), int(second), int(fraction.ljust(6, "0")),
+    )
+
+
+def _as_utc_datetime(value: Union[datetime, str]) -> datetime:
+    if isinstance(value, str):
+        return parse_datestamp(value)
+    if not isinstance(value, datetime):
+        raise TypeError(f"{value!r} is not a datetime or datestamp")
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _is_datetime_within(other, start: Optional[datetime], end: Optional[datetime]) -> bool:
+    try:
+        other = _as_utc_datetime(other)
+    except (TypeError, ValueError):
+        return False
+    return (start is None or start <= other) and (end is None or other <= end)
+
+
+class AnyDatetimeBetween(RestrictedAny):
+    """
+    Instance will appear to "equal" any ``datetime``, or datestamp string in the API's format, between the
+    constructor-supplied ``start`` and ``end`` inclusive (either of which may be ``None`` for no limit). Naive
+    datetimes are taken to be UTC, as the API's datestamps are.
+
+    >>> {"createdAt": "2020-06-01T12:00:00.000000Z"} == {"createdAt": AnyDatetimeBetween(datetime(2020, 1, 1), None)}
+    True
+    """
+    _cost = 5
+
+    def __init__(self, start: Optional[Union[datetime, str]], end: Optional[Union[datetime, str]]):
+        self._start = None if start is None else _as_utc_datetime(start)
+        self._end = None if end is None else _as_utc_datetime(end)
+        super().__init__(lambda other: _is_datetime_within(other, self._start, self._end))
+
+    def _key(self):
+        return (AnyDatetimeBetween, self._start, self._end)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._start!r}, {self._end!r})"
+
+
+class AnyDatetimeNear(RestrictedAny):
+    """
+    Instance will appear to "equal" any ``datetime``, or datestamp string in the API's format, within ``tolerance``
+    (a ``timedelta`` or a number of seconds) of the constructor-supplied ``reference``. If ``reference`` is not given,
+    the current time when the comparison is made is used. Naive datetimes are taken to be UTC, as the API's datestamps
+    are.
+
+    >>> {"updatedAt": datetime.utcnow().strftime(DATESTAMP_FORMAT)} == {"updatedAt": AnyDatetimeNear(tolerance=5)}
+    True
+    """
+    _cost = 5
+
+    def __init__(
+        self,
+        reference: Optional[Union[datetime, str]] = None,
+        tolerance: Union[timedelta, float] = timedelta(minutes=1),
+    ):
+        self._reference = None if reference is None else _as_utc_datetime(reference)
+        self._tolerance = tolerance if isinstance(tolerance, timedelta) else timedelta(seconds=tolerance)
+        super().__init__(self._is_near)
+
+    def _is_near(self, other) -> bool:
+        reference = datetime.utcnow() if self._reference is None else self._reference
+        return _is_datetime_within(other, reference - self._tolerance, reference + self._tolerance)
+
+    def _key(self):
+        return (AnyDatetimeNear, self._reference, self._tolerance)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._reference or 'now'!r}, tolerance={self._tolerance!r})"
+
+
+_json_whitespace_re = re.compile(rb"[ \t\n\r]*")
+_json_string_re = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', flags=re.DOTALL)
+_json_scalar_re = re.compile(rb"[^,\]}\s]+")
+# strings are matched whole so that any brackets inside them are skipped over
+_json_container_token_re = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', flags=re.DOTALL)
+
+
+def _skip_json_whitespace(data, pos: int) -> int:
+    return _json_whitespace_re.match(data, pos).end()
+
+
+def _json_string_end(data, pos: int) -> int:
+    match = _json_string_re.match(data, pos)
+    if match is None:
+        raise ValueError(f"Invalid JSON string at position {pos}")
+    return match.end()
+
+
+def _json_container_end(data, pos: int) -> int:
+    """Return the position after the end of the array or object at ``pos``"""
+    depth = 0
+    for match in _json_container_token_re.finditer(data, pos):
+        token = match.group()
+        if token in (b"[", b"{"):
+            depth += 1
+        elif token in (b"]", b"}"):
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError("Unterminated JSON array or object")
+
+
+def _json_value_end(data, pos: int) -> int:
+    """Return the position after the end of the JSON value at ``pos``, without decoding it"""
+    first = data[pos:pos + 1]
+    if first == b'"':
+        return _json_string_end(data, pos)
+    if first in (b"{", b"["):
+        return _json_container_end(data, pos)
+    match = _json_scalar_re.match(data, pos)
+    if match is None:
+        raise ValueError(f"Expected a JSON value at position {pos}")
+    return match.end()
+
+
+def _expect_json_token(data, pos: int, token: bytes) -> int:
+    pos = _skip_json_whitespace(data, pos)
+    if data[pos:pos + 1] != token:
+        raise ValueError(f"Expected {token!r} at position {pos}")
+    return pos + 1
+
+
+def _match_json_object(data, pos: int, subset: Mapping, need_end: bool) -> Tuple[bool, int]:
+    """
+    Match the JSON object at ``pos`` against ``subset``, decoding only the values of keys in ``subset``. Returns
+    whether it matched and, if it did and ``need_end``, the position after the end of the object.
+
+    Gives up reading as soon as the outcome is known, unless ``need_end``, in which case the rest of the object is
+    skipped over without decoding it.
+    """
+    pos = _expect_json_token(data, pos, b"{")
+    remaining = dict(subset)
+    while remaining or need_end:
+        pos = _skip_json_whitespace(data, pos)
+        if data[pos:pos + 1] == b"}":
+            return not remaining, pos + 1
+        key_end = _json_string_end(data, pos)
+        key = data[pos + 1:key_end - 1]
+        key = json.loads(data[pos:key_end]) if b"\\" in key else key.decode("utf-8")
+        pos = _skip_json_whitespace(data, _expect_json_token(data, key_end, b":"))
+
+        if key in remaining:
+            expected = remaining.pop(key)
+            if type(expected) is AnySupersetOf:
+                # only decode the parts of the nested object that are needed
+                matched, pos = _match_json_object(
+                    data, pos, expected._subset_dict, need_end=bool(remaining) or need_end,
+                )
+            else:
+                value_end = _json_value_end(data, pos)
+                matched, pos = expected == json.loads(data[pos:value_end]), value_end
+            if not matched:
+                return False, pos
+            if not remaining and not need_end:
+                return True, pos
+        else:
+            pos = _json_value_end(data, pos)
+
+        pos = _skip_json_whitespace(data, pos)
+        if data[pos:pos + 1] == b",":
+            pos += 1
+        elif data[pos:pos + 1] != b"}":
+            raise ValueError(f"Expected ',' or '}}' at position {pos}")
+    return True, pos
+
+
+class AnyJSONBytesSupersetOf(RestrictedAny):
+    """
+    Instance will appear to "equal" any serialised JSON document (as ``bytes`` or ``str``, e.g. a Flask response's
+    ``.data``) whose top level object is a "superset" of the constructor-supplied ``subset_dict``, as
+    ``AnySupersetOf`` - but without decoding the whole document.
+
+    The document is scanned without decoding anything but the values of the keys in ``subset_dict``, and scanning stops
+    as soon as the outcome is known. Values in ``subset_dict`` which are themselves ``AnySupersetOf`` instances are
+    matched the same way, so only the parts of a large nested object that are asked about are ever decoded:
+
+    >>> b'{"services": {"id": "123", "serviceName": "Bar"}, "meta": {}}' == AnyJSONBytesSupersetOf({
+    ...     "services": AnySupersetOf({"id": "123"}),
+    ... })
+    True
+
+    As the rest of the document isn't read once the outcome is known, this doesn't check the document is valid JSON.
+    """
+    _cost = 30
+
+    def __init__(self, subset_dict):
+        self._subset_dict = MappingProxyType(dict(subset_dict))
+        super().__init__(self._matches)
+
+    def _matches(self, other) -> bool:
+        if isinstance(other, str):
+            other = other.encode("utf-8")
+        if not isinstance(other, (bytes, bytearray)):
+            return False
+        try:
+            return _match_json_object(other, _skip_json_whitespace(other, 0), self._subset_dict, need_end=False)[0]
+        except ValueError:
+            return False
+
+    def _key(self):
+        return (AnyJSONBytesSupersetOf, _freeze(dict(self._subset_dict)))
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._subset_dict})"
@@ -0,0 +1,264 @@
+"""
+Generates a referentially consistent synthetic Digital Marketplace dataset, for load testing frontends and search
+indexing against realistic volumes of data.
+
+The dataset is made up of frameworks (with their lots), suppliers, each supplier's framework interests and services,
+briefs and the brief responses to them. All ids and links are consistent between records: services belong to suppliers
+who are on the service's framework and are on one of the framework's lots, brief responses come from suppliers on the
+brief's framework, and so on.
+
+Every record is generated from its own seed, derived from the dataset seed and the record's position in the dataset,
+and which frameworks a supplier is on can be recomputed from the supplier's index alone. This means records can be
+streamed out one supplier or brief at a time, with memory use that doesn't depend on the size of the dataset:
+
+  from dmtestutils.datasets import MarketplaceDataset
+
+  dataset = MarketplaceDataset(seed=1, supplier_count=50000, brief_count=20000)
+  with open("marketplace.jsonl", "w") as f:
+      dataset.write_jsonl(f)
+
+Each line of the output is a JSON object with the record type under ``"type"`` and the stub's response under
+``"data"``.
+
+For larger datasets, ``write_jsonl_parts`` and ``write_jsonl_file`` split the dataset into shards of contiguous
+supplier and brief indexes and generate them in parallel with a process pool. Because each record's seed depends only
+on its position in the dataset, the output is the same whatever the number of shards or workers, and the merged file
+written by ``write_jsonl_file`` is identical to the output of ``write_jsonl``.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import random
+import shutil
+import tempfile
+from typing import IO, Iterator, List, Optional, Sequence, Tuple
+
+from .stub_generators import StubGenerator
+
+
+Record = Tuple[str, dict]
+
+DatasetShard = namedtuple("DatasetShard", ("index", "record_type", "start", "stop"))
+
+SUPPLIER_ID_BASE = 700000
+BRIEF_ID_BASE = 10000
+SERVICE_ID_BASE = 10 ** 14
+
+DEFAULT_FRAMEWORK_SLUGS = (
+    "g-cloud-10",
+    "g-cloud-11",
+    "g-cloud-12",
+    "digital-outcomes-and-specialists-4",
+    "digital-outcomes-and-specialists-5",
+)
+
+
+class MarketplaceDataset:
+    def __init__(
+        self,
+        seed: int = 0,
+        *,
+        supplier_count: int = 1000,
+        brief_count: int = 1000,
+        framework_slugs: Sequence[str] = DEFAULT_FRAMEWORK_SLUGS,
+        max_services_per_framework: int = 10,
+        max_responses_per_brief: int = 10,
+        interest_probability: float = 0.5,
+        on_framework_probability: float = 0.8,
+    ):
+        self.seed = seed
+        self.supplier_count = supplier_count
+        self.brief_count = brief_count
+        self.max_services_per_framework = max_services_per_framework
+        self.max_responses_per_brief = max_responses_per_brief
+        self.interest_probability = interest_probability
+        self.on_framework_probability = on_framework_probability
+
+        self.frameworks = [
+            StubGenerator(self._seed("framework", i)).framework(id=i + 1, slug=slug, status="live").response()
+            for i, slug in enumerate(framework_slugs)
+        ]
+        self._briefs_frameworks = [
+            framework for framework in self.frameworks if framework["family"] == "digital-outcomes-and-specialists"
+        ]
+        if brief_count and not self._briefs_frameworks:
+            raise ValueError("Can't generate briefs without any Digital Outcomes and Specialists frameworks")
+
+    def _seed(self, record_type: str, index: int) -> str:
+        return f"{self.seed}:{record_type}:{index}"
+
+    def supplier_id(self, supplier_index: int) -> int:
+        return SUPPLIER_ID_BASE + supplier_index
+
+    def brief_id(self, brief_index: int) -> int:
+        return BRIEF_ID_BASE + brief_index
+
+    def supplier_name(self, supplier_index: int) -> str:
+        return StubGenerator(self._seed("supplier-name", supplier_index)).text(1, 3)
+
+    def supplier_interests(self, supplier_index: int) -> List[Tuple[dict, bool]]:
+        """Return a list of ``(framework, on_framework)`` for each framework the supplier has registered interest in"""
+        rng = random.Random(self._seed("supplier-interests", supplier_index))
+        return [
+            (framework, rng.random() < self.on_framework_probability)
+            for framework in self.frameworks
+            if rng.random() < self.interest_probability
+        ]
+
+    def iter_supplier_records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Record]:
+        """Yield each supplier in ``range(start, stop)``, followed by its framework interests and services"""
+        for supplier_index in range(start, self.supplier_count if stop is None else stop):
+            generator = StubGenerator(self._seed("supplier", supplier_index))
+            supplier_id = self.supplier_id(supplier_index)
+            supplier_name = self.supplier_name(supplier_index)
+
+            yield "supplier", generator.supplier(id=supplier_id, name=supplier_name).response()
+
+            for framework_index, (framework, on_framework) in enumerate(self.supplier_interests(supplier_index)):
+                yield "supplier_framework", generator.supplier_framework(
+                    supplier_id=supplier_id,
+                    supplierName=supplier_name,
+                    framework_slug=framework["slug"],
+                    frameworkFamily=framework["family"],
+                    frameworkFramework=framework["family"],
+                    on_framework=on_framework,
+                ).response()
+
+                if not on_framework or framework["family"] != "g-cloud":
+                    continue
+                for service_index in range(generator.random.randint(0, self.max_services_per_framework)):
+                    lot = generator.random.choice(framework["lots"])
+                    service_number = (
+                        (supplier_index * len(self.frameworks) + framework_index) * self.max_services_per_framework
+                        + service_index
+                    )
+                    yield "service", generator.service(
+                        service_id=str(SERVICE_ID_BASE + service_number),
+                        framework_slug=framework["slug"],
+                        framework_name=framework["name"],
+                        framework_family=framework["family"],
+                        framework_framework=framework["family"],
+                        lot=lot["slug"],
+                        lot_slug=lot["slug"],
+                        lot_name=lot["name"],
+                        supplier_id=supplier_id,
+                        supplier_name=supplier_name,
+                    ).response()
+
+    def _responding_supplier_indexes(self, rng: random.Random, framework_slug: str) -> Iterator[int]:
+        """Yield the indexes of distinct, randomly chosen suppliers who are on the given framework"""
+        seen = set()
+        for _ in range(self.max_responses_per_brief * 10):
+            supplier_index = rng.randrange(self.supplier_count)
+            if supplier_index not in seen and any(
+                framework["slug"] == framework_slug and on_framework
+                for framework, on_framework in self.supplier_interests(supplier_index)
+            ):
+                seen.add(supplier_index)
+                yield supplier_index
+
+    def iter_brief_records(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Record]:
+        """Yield each brief in ``range(start, stop)``, followed by its brief responses"""
+        for brief_index in range(start, self.brief_count if stop is None else stop):
+            generator = StubGenerator(self._seed("brief", brief_index))
+            framework = generator.random.choice(self._briefs_frameworks)
+            lot = generator.random.choice([lot for lot in framework["lots"] if lot["allowsBrief"]])
+            brief_id = self.brief_id(brief_index)
+
+            brief = generator.brief(
+                id=brief_id, framework_slug=framework["slug"], lot_slug=lot["slug"], lot_name=lot["name"],
+            ).response()
+            yield "brief", brief
+
+            if brief["status"] == "draft" or not self.supplier_count:
+                continue
+            response_count = generator.random.randint(0, self.max_responses_per_brief)
+            supplier_indexes = self._responding_supplier_indexes(generator.random, framework["slug"])
+            for response_index, supplier_index in zip(range(response_count), supplier_indexes):
+                yield "brief_response", generator.brief_response(
+                    id=brief_id * self.max_responses_per_brief + response_index,
+                    brief={
+                        "id": brief_id,
+                        "title": brief["title"],
+                        "status": brief["status"],
+                        "applicationsClosedAt": brief["applicationsClosedAt"],
+                        "framework": dict(brief["framework"], status=framework["status"]),
+                    },
+                    framework_slug=framework["slug"],
+                    supplier_id=self.supplier_id(supplier_index),
+                    supplierName=self.supplier_name(supplier_index),
+                    status="submitted",
+                ).response()
+
+    def iter_records(self) -> Iterator[Record]:
+        """Yield every record in the dataset as a ``(record_type, response_data)`` pair"""
+        for framework in self.frameworks:
+            yield "framework", framework
+        yield from self.iter_supplier_records()
+        yield from self.iter_brief_records()
+
+    def shards(self, shard_count: int) -> List[DatasetShard]:
+        """
+        Split the dataset into up to ``shard_count`` shards of suppliers followed by up to ``shard_count`` shards of
+        briefs. The frameworks are included in the first shard.
+        """
+        shards = []
+        for record_type, total in (("supplier", self.supplier_count), ("brief", self.brief_count)):
+            shard_size = max(-(-total // shard_count), 1)
+            for start in range(0, total, shard_size):
+                shards.append(DatasetShard(len(shards), record_type, start, min(start + shard_size, total)))
+        return shards or [DatasetShard(0, "supplier", 0, 0)]
+
+    def iter_shard_records(self, shard: DatasetShard) -> Iterator[Record]:
+        if shard.index == 0:
+            for framework in self.frameworks:
+                yield "framework", framework
+        if shard.record_type == "supplier":
+            yield from self.iter_supplier_records(shard.start, shard.stop)
+        else:
+            yield from self.iter_brief_records(shard.start, shard.stop)
+
+    def write_jsonl(self, f: IO[str], records: Optional[Iterator[Record]] = None) -> int:
+        """
+        Write ``records`` (by default, the whole dataset) to the text file ``f`` as JSON lines, returning the number of
+        records written
+        """
+        count = 0
+        for record_type, data in self.iter_records() if records is None else records:
+            f.write(json.dumps({"type": record_type, "data": data}, separators=(",", ":")))
+            f.write("\n")
+            count += 1
+        return count
+
+    def write_jsonl_parts(
+        self,
+        directory: str,
+        shard_count: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> List[str]:
+        """
+        Generate the dataset in parallel across a pool of ``max_workers`` processes, writing each shard to its own part
+        file in ``directory``. Returns the paths of the part files, in dataset order.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        shards = self.shards(shard_count or max_workers * 4)
+        paths = [os.path.join(directory, f"part-{shard.index:05d}.jsonl") for shard in shards]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # consume the results so that any exceptions in the workers are raised here
+            list(executor.map(_write_shard_part, [self] * len(shards), shards, paths))
+        return paths
+
+    def write_jsonl_file(self, path: str, shard_count: Optional[int] = None, max_workers: Optional[int] = None):
+        """Generate the dataset in parallel, as ``write_jsonl_parts``, then merge the parts in order into ``path``"""
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as parts_directory:
+            part_paths = self.write_jsonl_parts(parts_directory, shard_count=shard_count, max_workers=max_workers)
+            with open(path, "wb") as f:
+                for part_path in part_paths:
+                    with open(part_path, "rb") as part:
+                        shutil.copyfileobj(part, f)
+
+
+def _write_shard_part(dataset: MarketplaceDataset, shard: DatasetShard, path: str) -> int:
+    with open(path, "w", encoding="utf-8") as f:
+        return dataset.write_jsonl(f, dataset.iter_shard_records(shard))
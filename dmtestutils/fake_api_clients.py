@@ -0,0 +1,548 @@
+"""
+In-memory stand-ins for the ``dmapiclient`` API clients, fed with API model stubs (or their responses).
+
+Rather than patching each API client method a view calls with its own ``side_effect``, tests can populate a fake
+client with all the data the view needs and patch the client as a whole. Queries are answered from secondary indexes
+and paginated in the same way as the real API, so the fakes remain fast with large amounts of stub data:
+
+  from dmtestutils.api_model_stubs import BriefStub, FrameworkStub
+  from dmtestutils.fake_api_clients import FakeDataAPIClient
+
+  data_api_client = FakeDataAPIClient()
+  data_api_client.add_frameworks(FrameworkStub(slug="digital-outcomes-and-specialists-4"))
+  data_api_client.add_briefs(*(BriefStub(id=i, status="live") for i in range(1000)))
+
+  with mock.patch("app.main.views.briefs.data_api_client", data_api_client):
+      ...
+
+``FakeSearchAPIClient`` does the same for the search API, with an inverted index over services' text fields, so that
+search result pages can be exercised (and benchmarked) against large corpora of ``ServiceStub`` data offline.
+
+To also make assertions about the calls made, wrap the fake in a mock: ``mock.Mock(wraps=FakeDataAPIClient())``.
+"""
+from collections import Counter, defaultdict
+from itertools import count
+from math import ceil
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+from unittest import mock
+from urllib.parse import urlencode
+
+from .api_model_stubs import BaseAPIModelStub
+
+
+StubOrResponse = Union[BaseAPIModelStub, Mapping]
+
+API_URL = "http://localhost:5000"
+
+
+def _response_data(stub: StubOrResponse) -> dict:
+    return stub.response() if isinstance(stub, BaseAPIModelStub) else stub
+
+
+def _index_values(value) -> Iterable[str]:
+    """Normalise a record's index value, or the value given to a query, to a collection of strings"""
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return value.split(",")
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(str(v) for v in value)
+    return (str(value),)
+
+
+def _not_found(resource: str, id_):
+    from dmapiclient import HTTPError
+
+    response = mock.Mock(status_code=404)
+    response.json.return_value = {"error": f"{resource} {id_} not found"}
+    return HTTPError(response)
+
+
+def _paginated(resource_name: str, path: str, records: List[dict], page_size: int, page=None, **params) -> dict:
+    """Return the given page of ``records`` in the format of a paginated API response"""
+    page = int(page or 1)
+    last_page = max(ceil(len(records) / page_size), 1)
+
+    def _url(page_number):
+        query = urlencode([(k, v) for k, v in sorted(params.items()) if v is not None] + [("page", page_number)])
+        return f"{API_URL}{path}?{query}"
+
+    links = {"self": _url(page)}
+    if page > 1:
+        links["prev"] = _url(page - 1)
+    if page < last_page:
+        links["next"] = _url(page + 1)
+        links["last"] = _url(last_page)
+
+    start = (page - 1) * page_size
+    return {
+        resource_name: records[start:start + page_size],
+        "meta": {"total": len(records)},
+        "links": links,
+    }
+
+
+class IndexedStore:
+    """
+    Keeps API model responses by id, along with a secondary index for each of ``indexes``, a mapping of index name to
+    a function returning the value (or values) a record should be indexed under.
+    """
+    def __init__(self, id_func: Callable[[dict], Any], indexes: Mapping[str, Callable[[dict], Any]]):
+        self._id_func = id_func
+        self._index_funcs = dict(indexes)
+        self._records: Dict[str, dict] = {}
+        self._sequence: Dict[str, int] = {}
+        self._next_sequence = count()
+        # index name -> index value -> ids (a dict rather than a set, to keep them in insertion order)
+        self._indexes: Dict[str, Dict[str, Dict[str, None]]] = {name: defaultdict(dict) for name in indexes}
+
+    def __len__(self):
+        return len(self._records)
+
+    def add(self, record: dict):
+        id_ = str(self._id_func(record))
+        self.remove(id_)
+        self._records[id_] = record
+        self._sequence[id_] = next(self._next_sequence)
+        for name, index_func in self._index_funcs.items():
+            for value in _index_values(index_func(record)):
+                self._indexes[name][value][id_] = None
+
+    def remove(self, id_):
+        record = self._records.pop(str(id_), None)
+        if record is None:
+            return
+        del self._sequence[str(id_)]
+        for name, index_func in self._index_funcs.items():
+            for value in _index_values(index_func(record)):
+                self._indexes[name][value].pop(str(id_), None)
+
+    def get(self, id_) -> Optional[dict]:
+        return self._records.get(str(id_))
+
+    def get_many(self, ids: Iterable) -> List[dict]:
+        """Return the records with any of ``ids``, in the order they were added"""
+        matching_ids = [str(id_) for id_ in ids if str(id_) in self._records]
+        matching_ids.sort(key=self._sequence.__getitem__)
+        return [self._records[id_] for id_ in matching_ids]
+
+    def counts(self, name: str) -> Dict[str, int]:
+        """Return the number of records indexed under each value of the index ``name``"""
+        return {value: len(ids) for value, ids in self._indexes[name].items() if ids}
+
+    def find(self, **criteria) -> List[dict]:
+        """
+        Return the records matching all of ``criteria``, in the order they were added. Each criterion is an index name
+        and either a single value or a collection (or comma-separated string) of values to match any of. ``None``
+        criteria are ignored.
+        """
+        candidate_sets = []
+        for name, value in criteria.items():
+            if value is None:
+                continue
+            buckets = [self._indexes[name].get(index_value, {}) for index_value in _index_values(value)]
+            if len(buckets) == 1:
+                candidate_sets.append(buckets[0])
+            else:
+                candidate_sets.append({id_: None for bucket in buckets for id_ in bucket})
+
+        if not candidate_sets:
+            return list(self._records.values())
+
+        # only scan the smallest set of candidates, checking membership of the others
+        candidate_sets.sort(key=len)
+        smallest, others = candidate_sets[0], candidate_sets[1:]
+        matching_ids = [id_ for id_ in smallest if all(id_ in candidates for candidates in others)]
+        matching_ids.sort(key=self._sequence.__getitem__)
+        return [self._records[id_] for id_ in matching_ids]
+
+
+class FakeDataAPIClient:
+    """
+    An in-memory stand-in for ``dmapiclient.DataAPIClient``, supporting the commonly-used read methods.
+
+    Data is added with the ``add_*`` methods, which take stubs or stub responses. Methods which would respond with a
+    404 from the real API raise a ``dmapiclient.HTTPError`` with that status code (or, like the real client, return
+    ``None`` for ``get_service``).
+    """
+    def __init__(self, page_size: int = 100):
+        self.page_size = page_size
+        self.frameworks = IndexedStore(lambda f: f["slug"], {"family": lambda f: f["family"]})
+        self.suppliers = IndexedStore(lambda s: s["id"], {"duns_number": lambda s: s.get("dunsNumber")})
+        self.supplier_frameworks = IndexedStore(
+            lambda sf: f"{sf['supplierId']}:{sf['frameworkSlug']}",
+            {
+                "supplier": lambda sf: sf["supplierId"],
+                "framework": lambda sf: sf["frameworkSlug"],
+            },
+        )
+        self.services = IndexedStore(
+            lambda s: s["id"],
+            {
+                "supplier": lambda s: s["supplierId"],
+                "framework": lambda s: s["frameworkSlug"],
+                "lot": lambda s: s["lotSlug"],
+                "status": lambda s: s["status"],
+            },
+        )
+        self.briefs = IndexedStore(
+            lambda b: b["id"],
+            {
+                "framework": lambda b: b["frameworkSlug"],
+                "lot": lambda b: b["lotSlug"],
+                "status": lambda b: b["status"],
+                "user": lambda b: [user["id"] for user in b.get("users", ())],
+            },
+        )
+        self.brief_responses = IndexedStore(
+            lambda br: br["id"],
+            {
+                "brief": lambda br: br["briefId"],
+                "supplier": lambda br: br["supplierId"],
+                "status": lambda br: br["status"],
+                "framework": lambda br: br["brief"]["framework"]["slug"],
+            },
+        )
+
+    def add_frameworks(self, *frameworks: StubOrResponse):
+        for framework in frameworks:
+            self.frameworks.add(_response_data(framework))
+
+    def add_suppliers(self, *suppliers: StubOrResponse):
+        for supplier in suppliers:
+            self.suppliers.add(_response_data(supplier))
+
+    def add_supplier_frameworks(self, *supplier_frameworks: StubOrResponse):
+        for supplier_framework in supplier_frameworks:
+            self.supplier_frameworks.add(_response_data(supplier_framework))
+
+    def add_services(self, *services: StubOrResponse):
+        for service in services:
+            self.services.add(_response_data(service))
+
+    def add_briefs(self, *briefs: StubOrResponse):
+        for brief in briefs:
+            # the API always includes users and clarificationQuestions in its brief responses
+            self.briefs.add(
+                brief.single_result_response()["briefs"] if isinstance(brief, BaseAPIModelStub) else brief
+            )
+
+    def add_brief_responses(self, *brief_responses: StubOrResponse):
+        for brief_response in brief_responses:
+            self.brief_responses.add(_response_data(brief_response))
+
+    @staticmethod
+    def _iter(find_method: Callable[..., dict], resource_name: str, **kwargs) -> Iterator[dict]:
+        page = 1
+        while True:
+            response = find_method(page=page, **kwargs)
+            yield from response[resource_name]
+            if "next" not in response["links"]:
+                return
+            page += 1
+
+    # Frameworks
+
+    def get_framework(self, slug: str) -> dict:
+        framework = self.frameworks.get(slug)
+        if framework is None:
+            raise _not_found("Framework", slug)
+        return {"frameworks": framework}
+
+    def find_frameworks(self) -> dict:
+        return {"frameworks": self.frameworks.find()}
+
+    # Suppliers
+
+    def get_supplier(self, supplier_id) -> dict:
+        supplier = self.suppliers.get(supplier_id)
+        if supplier is None:
+            raise _not_found("Supplier", supplier_id)
+        return {"suppliers": supplier}
+
+    def find_suppliers(
+        self, name=None, page=None, prefix=None, framework=None, duns_number=None, company_registration_number=None,
+    ) -> dict:
+        supplier_ids = None
+        if framework is not None:
+            supplier_ids = [sf["supplierId"] for sf in self.supplier_frameworks.find(framework=framework)]
+        suppliers = [
+            supplier for supplier in (
+                self.suppliers.find(duns_number=duns_number) if supplier_ids is None
+                else filter(None, map(self.suppliers.get, supplier_ids))
+            )
+            if (name is None or name.lower() in supplier["name"].lower())
+            and (prefix is None or supplier["name"].lower().startswith(prefix.lower()))
+            and (
+                company_registration_number is None
+                or company_registration_number in (
+                    supplier.get("companiesHouseNumber"), supplier.get("otherCompanyRegistrationNumber")
+                )
+            )
+        ]
+        return _paginated(
+            "suppliers", "/suppliers", suppliers, self.page_size, page=page,
+            name=name, prefix=prefix, framework=framework, duns_number=duns_number,
+            company_registration_number=company_registration_number,
+        )
+
+    def find_suppliers_iter(self, **kwargs) -> Iterator[dict]:
+        return self._iter(self.find_suppliers, "suppliers", **kwargs)
+
+    def get_supplier_frameworks(self, supplier_id) -> dict:
+        return {"frameworkInterest": self.supplier_frameworks.find(supplier=supplier_id)}
+
+    def get_supplier_framework_info(self, supplier_id, framework_slug: str) -> dict:
+        supplier_framework = self.supplier_frameworks.get(f"{supplier_id}:{framework_slug}")
+        if supplier_framework is None:
+            raise _not_found("Supplier framework", f"{supplier_id}:{framework_slug}")
+        return {"frameworkInterest": supplier_framework}
+
+    def find_framework_suppliers(
+        self, framework_slug: str, agreement_returned: Optional[bool] = None, statuses=None, with_declarations=True,
+    ) -> dict:
+        return {
+            "supplierFrameworks": [
+                supplier_framework
+                for supplier_framework in self.supplier_frameworks.find(framework=framework_slug)
+                if (agreement_returned is None or supplier_framework["agreementReturned"] == agreement_returned)
+                and (statuses is None or supplier_framework["agreementStatus"] in _index_values(statuses))
+            ]
+        }
+
+    # Services
+
+    def get_service(self, service_id) -> Optional[dict]:
+        service = self.services.get(service_id)
+        return None if service is None else {"services": service}
+
+    def find_services(self, supplier_id=None, framework=None, status=None, page=None, lot=None) -> dict:
+        return _paginated(
+            "services",
+            "/services",
+            self.services.find(supplier=supplier_id, framework=framework, status=status, lot=lot),
+            self.page_size,
+            page=page,
+            supplier_id=supplier_id, framework=framework, status=status, lot=lot,
+        )
+
+    def find_services_iter(self, **kwargs) -> Iterator[dict]:
+        return self._iter(self.find_services, "services", **kwargs)
+
+    # Briefs
+
+    def get_brief(self, brief_id) -> dict:
+        brief = self.briefs.get(brief_id)
+        if brief is None:
+            raise _not_found("Brief", brief_id)
+        return {"briefs": brief}
+
+    def find_briefs(
+        self, user_id=None, status=None, framework=None, lot=None, page=None, human=None, with_users=None,
+        with_clarification_questions=None,
+    ) -> dict:
+        return _paginated(
+            "briefs",
+            "/briefs",
+            self.briefs.find(user=user_id, status=status, framework=framework, lot=lot),
+            self.page_size,
+            page=page,
+            user_id=user_id, status=status, framework=framework, lot=lot,
+        )
+
+    def find_briefs_iter(self, **kwargs) -> Iterator[dict]:
+        return self._iter(self.find_briefs, "briefs", **kwargs)
+
+    # Brief responses
+
+    def get_brief_response(self, brief_response_id) -> dict:
+        brief_response = self.brief_responses.get(brief_response_id)
+        if brief_response is None:
+            raise _not_found("Brief response", brief_response_id)
+        return {"briefResponses": brief_response}
+
+    def find_brief_responses(
+        self, brief_id=None, supplier_id=None, status=None, framework=None, page=None, with_data=None,
+    ) -> dict:
+        return _paginated(
+            "briefResponses",
+            "/brief-responses",
+            self.brief_responses.find(brief=brief_id, supplier=supplier_id, status=status, framework=framework),
+            self.page_size,
+            page=page,
+            brief_id=brief_id, supplier_id=supplier_id, status=status, framework=framework,
+        )
+
+    def find_brief_responses_iter(self, **kwargs) -> Iterator[dict]:
+        return self._iter(self.find_brief_responses, "briefResponses", **kwargs)
+
+
+_word_re = re.compile(r"\w+")
+
+
+def _tokens(value) -> Iterator[str]:
+    if isinstance(value, str):
+        yield from (token.lower() for token in _word_re.findall(value))
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _tokens(item)
+
+
+class SearchIndex:
+    """
+    An inverted index over the ``text_fields`` of search documents, along with an ``IndexedStore`` for filtering and
+    aggregating on ``facet_fields``.
+    """
+    def __init__(self, text_fields: Iterable[str], facet_fields: Iterable[str]):
+        self.text_fields = tuple(text_fields)
+        self.facet_fields = tuple(facet_fields)
+        self.documents = IndexedStore(
+            lambda d: d["id"],
+            {field: (lambda d, field=field: d.get(field)) for field in self.facet_fields},
+        )
+        # token -> document id -> number of occurrences of the token in the document
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+
+    def add(self, document: dict):
+        self.remove(document["id"])
+        self.documents.add(document)
+        id_ = str(document["id"])
+        for token, occurrences in Counter(
+            token for field in self.text_fields for token in _tokens(document.get(field))
+        ).items():
+            self._postings[token][id_] = occurrences
+
+    def remove(self, id_):
+        document = self.documents.get(id_)
+        if document is None:
+            return
+        self.documents.remove(id_)
+        for field in self.text_fields:
+            for token in _tokens(document.get(field)):
+                self._postings[token].pop(str(id_), None)
+
+    def query(self, q: Optional[str] = None, **filters) -> List[dict]:
+        """
+        Return documents containing every word of ``q`` and matching all of ``filters`` (a mapping of field name to
+        value, or comma-separated values). Results are ordered by the number of occurrences of the query words, then in
+        the order they were added.
+        """
+        scores = None
+        query_tokens = set(_tokens(q))
+        if query_tokens:
+            postings = sorted((self._postings.get(token, {}) for token in query_tokens), key=len)
+            scores = {
+                id_: sum(token_postings[id_] for token_postings in postings)
+                for id_ in postings[0]
+                if all(id_ in token_postings for token_postings in postings[1:])
+            }
+
+        facet_filters = {field: value for field, value in filters.items() if field in self.facet_fields}
+        other_filters = {
+            field: set(_index_values(value)) for field, value in filters.items() if field not in facet_filters
+        }
+        if facet_filters or scores is None:
+            documents = self.documents.find(**facet_filters)
+            if scores is not None:
+                documents = [document for document in documents if str(document["id"]) in scores]
+        else:
+            documents = self.documents.get_many(scores)
+        if other_filters:
+            documents = [
+                document for document in documents
+                if all(set(_index_values(document.get(field))) & values for field, values in other_filters.items())
+            ]
+
+        if scores is not None:
+            # sort() is stable, so documents with equal scores stay in the order they were added
+            documents.sort(key=lambda document: -scores[str(document["id"])])
+        return documents
+
+    def aggregate(self, fields: Iterable[str], documents: Optional[List[dict]] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Return the number of ``documents`` (by default, all documents in the index) with each value of each of
+        ``fields``
+        """
+        if documents is None and all(field in self.facet_fields for field in fields):
+            return {field: self.documents.counts(field) for field in fields}
+
+        counts = {field: Counter() for field in fields}
+        for document in self.documents.find() if documents is None else documents:
+            for field, field_counts in counts.items():
+                field_counts.update(_index_values(document.get(field)))
+        return {field: dict(field_counts) for field, field_counts in counts.items()}
+
+
+class FakeSearchAPIClient:
+    """
+    An in-memory stand-in for ``dmapiclient.SearchAPIClient``'s ``search`` and ``aggregate`` methods, over services
+    added with ``add_services`` (or the client's own ``index`` method).
+
+    As with the real search API, filters are given as ``filter_<fieldName>`` kwargs, and searching an index that
+    doesn't exist raises a ``dmapiclient.HTTPError`` with a 404 status code.
+    """
+    text_fields = (
+        "serviceName", "serviceSummary", "serviceDescription", "serviceFeatures", "serviceBenefits", "supplierName",
+    )
+    facet_fields = ("lot", "lotSlug", "frameworkSlug", "frameworkName", "supplierId", "status")
+
+    def __init__(self, page_size: int = 30):
+        self.page_size = page_size
+        self.indexes: Dict[str, SearchIndex] = {}
+
+    def _get_index(self, index: str) -> SearchIndex:
+        if index not in self.indexes:
+            raise _not_found("Index", index)
+        return self.indexes[index]
+
+    def create_index(self, index: str, mapping: str = "services") -> dict:
+        self.indexes.setdefault(index, SearchIndex(self.text_fields, self.facet_fields))
+        return {"message": f"acknowledged: {index}"}
+
+    def add_services(self, *services: StubOrResponse, index: str = "g-cloud"):
+        self.create_index(index)
+        for service in services:
+            self.indexes[index].add(_response_data(service))
+
+    def index(self, index: str, object_id, serialized_object: dict, doc_type: str = "services") -> dict:
+        self.create_index(index)
+        self.indexes[index].add(dict(serialized_object, id=object_id))
+        return {"message": "acknowledged"}
+
+    def delete(self, index: str, service_id) -> dict:
+        self._get_index(index).remove(service_id)
+        return {"message": "acknowledged"}
+
+    @staticmethod
+    def _split_params(params: Mapping) -> Dict[str, Any]:
+        return {
+            key[len("filter_"):]: value
+            for key, value in params.items()
+            if key.startswith("filter_") and value is not None
+        }
+
+    def search(self, index: str, doc_type: str = "services", q: Optional[str] = None, page=None, **params) -> dict:
+        response = _paginated(
+            "documents",
+            f"/{index}/{doc_type}/search",
+            self._get_index(index).query(q, **self._split_params(params)),
+            self.page_size,
+            page=page,
+            q=q,
+            **params,
+        )
+        response["meta"]["query"] = dict(params, **({} if q is None else {"q": q}))
+        return response
+
+    def aggregate(
+        self, index: str, doc_type: str = "services", aggregations: Iterable[str] = (), q: Optional[str] = None,
+        **params,
+    ) -> dict:
+        search_index = self._get_index(index)
+        filters = self._split_params(params)
+        documents = search_index.query(q, **filters) if q or filters else None
+        return {
+            "aggregations": search_index.aggregate(aggregations, documents),
+            "meta": {"total": len(search_index.documents) if documents is None else len(documents)},
+        }
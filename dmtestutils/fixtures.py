@@ -27,7 +27,29 @@ from io import BytesIO
 valid_pdf_bytes = BytesIO(valid_pdf_bytes)
 
 ```
+
+Larger files of an arbitrary size, for testing upload limits and streaming, can be produced from any of these with
+``iter_valid_file_chunks``, ``LazyValidFile`` or ``valid_file_mmap`` without holding the whole file in memory.
+
+Alternatively, signature entries from fleep's ``data.json`` can be added to the registry at the bottom of this file with
+``register_file_signature``. Fixtures for registered types are built once and then shared, and can be looked up by
+extension or MIME type as bytes (``file_signature_bytes``), as a zero-copy ``memoryview`` (``file_signature_view``) or
+as a fresh read-only file-like object over the shared buffer (``file_signature_file``):
+
+```
+@pytest.mark.parametrize("extension", ("pdf", "odt", "docx"))
+def test_upload(extension):
+    client.post('/upload', data={'document': (file_signature_file(extension), f'test.{extension}')})
+```
 """
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+import io
+import mmap
+import tempfile
+from typing import Dict, Iterator, Optional, Tuple, Union
+
 
 valid_pdf_bytes = b'\x25\x50\x44\x46\xff\xff\xff\xff'
 
@@ -35,4 +57,222 @@ valid_odt_bytes = (b"PK\x03\x04\x14\x00\x00\x08\x00\x00,"
                    b"~\xacP^\xc62\x0c'\x00\x00\x00'\x00\x00\x00\x08\x00\x00\x00mimetypeapplication/vnd.oasis"
                    b".opendocument.textPK")
 
+
 valid_jpeg_bytes = valid_jpg_bytes = b'\xff\xd8\xff\xff\xff\xff\xff\xff'
+
+_padding_byte = b'\xff'
+_default_chunk_size = 64 * 1024
+_padding_block = _padding_byte * _default_chunk_size
+
+
+def _check_size(header: bytes, size: int):
+    if size < len(header):
+        raise ValueError(f"size {size} is smaller than the {len(header)}-byte file signature")
+
+
+def iter_valid_file_chunks(header: bytes, size: int, chunk_size: int = _default_chunk_size) -> Iterator[bytes]:
+    """
+    Yield successive chunks of a file that is ``size`` bytes long, starting with ``header`` (e.g. ``valid_pdf_bytes``)
+    and padded out with ``\\xff`` bytes. Only a single chunk-sized padding block is ever held in memory, so this can be
+    used to stream arbitrarily large uploads:
+
+    ```
+    for chunk in iter_valid_file_chunks(valid_pdf_bytes, 50 * 1024 * 1024):
+        ...
+    ```
+    """
+    _check_size(header, size)
+    padding = _padding_block if chunk_size == _default_chunk_size else _padding_byte * chunk_size
+    position = 0
+    while position < size:
+        chunk_end = min(position + chunk_size, size)
+        if position < len(header):
+            head = header[position:chunk_end]
+            yield head + padding[:chunk_end - position - len(head)]
+        else:
+            yield padding if chunk_end - position == chunk_size else padding[:chunk_end - position]
+        position = chunk_end
+
+
+class LazyValidFile(io.RawIOBase):
+    """
+    A read-only, seekable file-like object of ``size`` bytes which starts with ``header`` and is otherwise filled with
+    ``\\xff`` padding. Content is generated on demand as it is read, so memory use doesn't grow with ``size``:
+
+    ```
+    client.post('/upload', data={'document': (LazyValidFile(valid_pdf_bytes, 50 * 1024 * 1024), 'test.pdf')})
+    ```
+    """
+    def __init__(self, header: bytes, size: int, name: Optional[str] = None):
+        _check_size(header, size)
+        super().__init__()
+        self._header = memoryview(header)
+        self._size = size
+        self._position = 0
+        self.name = name
+
+    def __len__(self):
+        return self._size
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence})")
+        if position < 0:
+            raise ValueError(f"negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast("B")
+        start = min(self._position, self._size)
+        end = min(start + len(view), self._size)
+        written = 0
+        if start < len(self._header):
+            head = self._header[start:end]
+            view[:len(head)] = head
+            written = len(head)
+        while start + written < end:
+            n = min(end - start - written, len(_padding_block))
+            view[written:written + n] = _padding_block[:n]
+            written += n
+        self._position = end
+        return written
+
+
+@contextmanager
+def valid_file_mmap(header: bytes, size: int) -> Iterator[mmap.mmap]:
+    """
+    Context manager yielding a read-only ``mmap`` of a ``size``-byte temporary file starting with ``header``. The file
+    is sparse beyond the header (so is zero-filled rather than padded), meaning neither memory nor disk use depend on
+    ``size``. The temporary file is removed on exit.
+    """
+    _check_size(header, size)
+    with tempfile.TemporaryFile() as f:
+        f.write(header)
+        f.truncate(size)
+        f.flush()
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+FileSignature = namedtuple("FileSignature", ("extension", "mime", "signatures"))
+
+_file_signatures_by_extension: Dict[str, FileSignature] = {}
+_file_signatures_by_mime: Dict[str, FileSignature] = {}
+
+
+def register_file_signature(extension: str, mime: str, *signatures: Tuple[int, Union[str, bytes]]) -> FileSignature:
+    """
+    Register a file type from its fleep ``data.json`` entry. Each signature is an ``(offset, signature)`` pair, where
+    ``signature`` is either the hex string as written in ``data.json`` (e.g. ``"25 50 44 46"``) or a bytes object.
+    """
+    file_signature = FileSignature(
+        extension,
+        mime,
+        tuple(
+            (offset, bytes.fromhex(signature) if isinstance(signature, str) else signature)
+            for offset, signature in signatures
+        ),
+    )
+    _file_signatures_by_extension[extension] = file_signature
+    _file_signatures_by_mime.setdefault(mime, file_signature)
+    return file_signature
+
+
+def get_file_signature(extension_or_mime: str) -> FileSignature:
+    try:
+        return _file_signatures_by_extension.get(extension_or_mime) or _file_signatures_by_mime[extension_or_mime]
+    except KeyError:
+        raise KeyError(f"No file signature registered for {extension_or_mime!r}") from None
+
+
+def registered_file_extensions() -> Tuple[str, ...]:
+    return tuple(_file_signatures_by_extension)
+
+
+@lru_cache(maxsize=None)
+def _build_file_signature_bytes(signatures: Tuple[Tuple[int, bytes], ...]) -> bytes:
+    content = bytearray(_padding_byte * (max(offset + len(signature) for offset, signature in signatures) + 4))
+    for offset, signature in signatures:
+        content[offset:offset + len(signature)] = signature
+    return bytes(content)
+
+
+def file_signature_bytes(extension_or_mime: str) -> bytes:
+    """
+    Return the (shared) fixture bytes for a registered file type: each signature placed at its offset, with ``\\xff``
+    padding in any gaps and a few bytes of padding at the end.
+    """
+    return _build_file_signature_bytes(get_file_signature(extension_or_mime).signatures)
+
+
+def file_signature_view(extension_or_mime: str) -> memoryview:
+    """Return a read-only ``memoryview`` over the shared fixture bytes for a registered file type"""
+    return memoryview(file_signature_bytes(extension_or_mime))
+
+
+def file_signature_file(extension_or_mime: str, size: Optional[int] = None) -> LazyValidFile:
+    """
+    Return a fresh read-only file-like object over the shared fixture bytes for a registered file type, optionally
+    padded out to ``size`` bytes.
+    """
+    content = file_signature_bytes(extension_or_mime)
+    return LazyValidFile(
+        content,
+        len(content) if size is None else size,
+        name=f"test.{get_file_signature(extension_or_mime).extension}",
+    )
+
+
+# Formats accepted by the document upload checks in digitalmarketplace-utils
+register_file_signature("pdf", "application/pdf", (0, "25 50 44 46"))
+register_file_signature(
+    "odt", "application/vnd.oasis.opendocument.text",
+    (0, "50 4B 03 04"), (30, b"mimetypeapplication/vnd.oasis.opendocument.text"),
+)
+register_file_signature(
+    "ods", "application/vnd.oasis.opendocument.spreadsheet",
+    (0, "50 4B 03 04"), (30, b"mimetypeapplication/vnd.oasis.opendocument.spreadsheet"),
+)
+register_file_signature(
+    "odp", "application/vnd.oasis.opendocument.presentation",
+    (0, "50 4B 03 04"), (30, b"mimetypeapplication/vnd.oasis.opendocument.presentation"),
+)
+register_file_signature("jpg", "image/jpeg", (0, "FF D8 FF"))
+register_file_signature("jpeg", "image/jpeg", (0, "FF D8 FF"))
+register_file_signature("png", "image/png", (0, "89 50 4E 47 0D 0A 1A 0A"))
+
+# Formats rejected by the document upload checks
+register_file_signature("doc", "application/msword", (0, "D0 CF 11 E0 A1 B1 1A E1"))
+register_file_signature("xls", "application/vnd.ms-excel", (0, "D0 CF 11 E0 A1 B1 1A E1"))
+register_file_signature("ppt", "application/vnd.ms-powerpoint", (0, "D0 CF 11 E0 A1 B1 1A E1"))
+register_file_signature(
+    "docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", (0, "50 4B 03 04 14 00 06 00")
+)
+register_file_signature(
+    "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", (0, "50 4B 03 04 14 00 06 00")
+)
+register_file_signature(
+    "pptx", "application/vnd.openxmlformats-officedocument.presentationml.presentation", (0, "50 4B 03 04 14 00 06 00")
+)
+register_file_signature("rtf", "application/rtf", (0, "7B 5C 72 74 66 31"))
+register_file_signature("zip", "application/zip", (0, "50 4B 03 04"))
+register_file_signature("gif", "image/gif", (0, "47 49 46 38 39 61"))
+register_file_signature("bmp", "image/bmp", (0, "42 4D"))
+register_file_signature("tiff", "image/tiff", (0, "49 49 2A 00"))
+register_file_signature("exe", "application/vnd.microsoft.portable-executable", (0, "4D 5A"))
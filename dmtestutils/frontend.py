@@ -1,7 +1,66 @@
-from markupsafe import escape
+import os
+
+from .load import run_load
 
 
 class BaseFrontendApplicationTest(object):
+    # default budgets for render_budget and assert_response_size - see dmtestutils.render_budget
+    response_size_budget = None
+    template_loads_budget = None
+    render_time_budget = None
+
     def get_flash_messages(self):
+        from markupsafe import escape
+
         with self.client.session_transaction() as session:
             return tuple((category, escape(message)) for category, message in (session.get("_flashes") or ()))
+
+    def run_load(self, requests, **kwargs):
+        """Fire ``requests`` at ``self.app`` concurrently, returning a ``LoadReport`` - see ``dmtestutils.load``"""
+        return run_load(self.app, requests, **kwargs)
+
+    def teardown_method(self, method):
+        self._detach_request_instrumentation()
+
+    def instrument_requests(self, *api_client_mocks):
+        """
+        Record a timing breakdown of each request made to ``self.app`` from now on, including the time spent in calls
+        to ``api_client_mocks`` - see ``dmtestutils.instrumentation``. The instrumentation is detached again in
+        ``teardown_method``, so subclasses overriding that must call ``super().teardown_method(method)``.
+        """
+        from .instrumentation import RequestInstrumentation
+
+        self._detach_request_instrumentation()
+        test = os.environ.get("PYTEST_CURRENT_TEST", "").rsplit(" ", 1)[0] or None
+        self.request_instrumentation = RequestInstrumentation(self.app, test=test).attach()
+        self.request_instrumentation.time_api_calls(*api_client_mocks)
+        return self.request_instrumentation
+
+    def _detach_request_instrumentation(self):
+        if getattr(self, "request_instrumentation", None) is not None:
+            self.request_instrumentation.detach()
+            self.request_instrumentation = None
+
+    def render_budget(self, max_bytes=None, max_template_loads=None, max_render_time=None):
+        """
+        Return a context manager checking every request made to ``self.app`` inside it against a budget for its
+        response size, template loads and render time, defaulting to the class's budgets - see
+        ``dmtestutils.render_budget``
+        """
+        from .render_budget import RenderBudget
+
+        return RenderBudget(
+            self.app,
+            max_bytes=self.response_size_budget if max_bytes is None else max_bytes,
+            max_template_loads=self.template_loads_budget if max_template_loads is None else max_template_loads,
+            max_render_time=self.render_time_budget if max_render_time is None else max_render_time,
+        )
+
+    def assert_response_size(self, response, max_bytes=None):
+        """Check the size of ``response``'s body against a budget, listing its largest elements if it's over"""
+        from .render_budget import response_size_problems
+
+        problems = response_size_problems(
+            response.get_data(), self.response_size_budget if max_bytes is None else max_bytes,
+        )
+        assert not problems, "\n".join(problems)
@@ -0,0 +1,317 @@
+"""
+Opt-in instrumentation recording where the time goes in each request a frontend test makes: view code, Jinja template
+rendering, (mocked) API calls and loading and saving the session.
+
+Example usage, in a ``BaseFrontendApplicationTest`` subclass:
+
+  def setup_method(self, method):
+      ...
+      self.instrument_requests(self.data_api_client)
+
+Every request made to the app is then timed, using Flask's ``request_started``, ``before_render_template``,
+``template_rendered`` and ``request_finished`` signals (which need ``blinker`` to be installed), along with the calls
+made to the given API client mocks and the app's session interface.
+
+The instrumentation is detached again in ``BaseFrontendApplicationTest.teardown_method``.
+
+The timings of every instrumented request in the test session are collected in ``collected_request_timings``. If
+``dmtestutils.pytest_plugin`` is enabled, they are written at the end of the session to a JSON report (at the path
+given by ``--request-timing-report``, by default ``request-timings.json``) ranking the slowest endpoints and templates
+across the whole suite. Under ``pytest-xdist``, each worker writes the timings it collected to a report of its own,
+and the controller merges them into the one report.
+"""
+from collections import defaultdict
+import json
+import threading
+import time
+from typing import Dict, List, Optional
+from unittest.mock import CallableMixin, Mock, NonCallableMock
+
+
+class RequestTiming:
+    """The timing breakdown of a single request, in seconds"""
+    def __init__(self, method: str, path: str, test: Optional[str] = None):
+        self.method = method
+        self.path = path
+        self.test = test
+        self.endpoint: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.total = 0.0
+        self.templates: List[list] = []
+        self.api_calls: List[list] = []
+        self.session = 0.0
+        self._started = time.perf_counter()
+        self._template_starts: List[float] = []
+
+    @property
+    def rendering(self) -> float:
+        # templates can render other templates with render_template, so only count the outermost ones
+        return sum(duration for _, duration, depth in self.templates if depth == 0)
+
+    @property
+    def view(self) -> float:
+        """Time not spent rendering templates, in API calls or on the session, i.e. in view (and middleware) code"""
+        return max(self.total - self.rendering - self.api - self.session, 0.0)
+
+    @property
+    def api(self) -> float:
+        return sum(duration for _, duration in self.api_calls)
+
+    def as_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "endpoint": self.endpoint,
+            "statusCode": self.status_code,
+            "test": self.test,
+            "total": self.total,
+            "view": self.view,
+            "rendering": self.rendering,
+            "api": self.api,
+            "session": self.session,
+            "templateRenders": [
+                {"template": name, "duration": duration, "depth": depth} for name, duration, depth in self.templates
+            ],
+            "apiCalls": [{"method": name, "duration": duration} for name, duration in self.api_calls],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RequestTiming":
+        """Rebuild a timing from its ``as_dict``"""
+        timing = cls(data["method"], data["path"], data["test"])
+        timing.endpoint = data["endpoint"]
+        timing.status_code = data["statusCode"]
+        timing.total = data["total"]
+        timing.session = data["session"]
+        timing.templates = [[t["template"], t["duration"], t.get("depth", 0)] for t in data["templateRenders"]]
+        timing.api_calls = [[c["method"], c["duration"]] for c in data["apiCalls"]]
+        return timing
+
+
+# the timings of every instrumented request in this process
+collected_request_timings: List[RequestTiming] = []
+
+
+class _TimedSessionInterface:
+    """Wraps a Flask session interface, timing opening and saving sessions"""
+    def __init__(self, session_interface, instrumentation: "RequestInstrumentation"):
+        self._session_interface = session_interface
+        self._instrumentation = instrumentation
+
+    def _timed(self, method_name: str, *args):
+        start = time.perf_counter()
+        try:
+            return getattr(self._session_interface, method_name)(*args)
+        finally:
+            timing = self._instrumentation.current
+            if timing is not None:
+                timing.session += time.perf_counter() - start
+
+    def open_session(self, app, request):
+        return self._timed("open_session", app, request)
+
+    def save_session(self, app, session, response):
+        return self._timed("save_session", app, session, response)
+
+    def __getattr__(self, name):
+        return getattr(self._session_interface, name)
+
+
+def _wrap_mock_class(mock_class: type) -> List["RequestInstrumentation"]:
+    """
+    Wrap ``mock_class`` (every mock has its own class, so this only affects one mock) to time calls to it and to time
+    its methods in turn, for each of the instrumentations in the list returned. A class is only ever wrapped once, and
+    the list is kept on it as ``_timing_instrumentations``.
+    """
+    instrumentations: List[RequestInstrumentation] = []
+
+    if issubclass(mock_class, CallableMixin):
+        original_call = mock_class.__call__
+
+        def __call__(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original_call(self, *args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start
+                for instrumentation in instrumentations:
+                    instrumentation._record_api_call(self, duration)
+        mock_class.__call__ = __call__
+
+    original_get_child_mock = mock_class._get_child_mock
+
+    def _get_child_mock(self, **kwargs):
+        child = original_get_child_mock(self, **kwargs)
+        # only time methods, not calls on the mocks' return values
+        if kwargs.get("_new_parent") is self and "name" in kwargs and isinstance(child, NonCallableMock):
+            for instrumentation in list(instrumentations):
+                instrumentation._time_mock(child)
+        return child
+    mock_class._get_child_mock = _get_child_mock
+
+    mock_class._timing_instrumentations = instrumentations
+    return instrumentations
+
+
+class RequestInstrumentation:
+    timing_class = RequestTiming
+
+    def __init__(self, app, test: Optional[str] = None, collector: Optional[List[RequestTiming]] = None):
+        self.app = app
+        self.test = test
+        self.collector = collected_request_timings if collector is None else collector
+        self.timings: List[RequestTiming] = []
+        self._local = threading.local()
+        self._timed_session_interface: Optional[_TimedSessionInterface] = None
+        self._timed_mock_classes: List[type] = []
+
+    @property
+    def current(self) -> Optional[RequestTiming]:
+        """The timing of the request in progress on this thread, if any"""
+        return getattr(self._local, "timing", None)
+
+    def attach(self) -> "RequestInstrumentation":
+        from flask import signals
+
+        signals.request_started.connect(self._request_started, self.app)
+        signals.before_render_template.connect(self._before_render_template, self.app)
+        signals.template_rendered.connect(self._template_rendered, self.app)
+        signals.request_finished.connect(self._request_finished, self.app)
+        self._timed_session_interface = _TimedSessionInterface(self.app.session_interface, self)
+        self.app.session_interface = self._timed_session_interface
+        return self
+
+    def detach(self):
+        """Stop timing requests and API calls, unwrapping the app's session interface. Safe to call more than once."""
+        from flask import signals
+
+        signals.request_started.disconnect(self._request_started, self.app)
+        signals.before_render_template.disconnect(self._before_render_template, self.app)
+        signals.template_rendered.disconnect(self._template_rendered, self.app)
+        signals.request_finished.disconnect(self._request_finished, self.app)
+        if self._timed_session_interface is not None:
+            self._unwrap_session_interface()
+        self.stop_timing_api_calls()
+
+    def _unwrap_session_interface(self):
+        # another instrumentation may have wrapped ours since, so take ours out of the chain wherever it is
+        wrapped = self._timed_session_interface._session_interface
+        if self.app.session_interface is self._timed_session_interface:
+            self.app.session_interface = wrapped
+        else:
+            wrapper = self.app.session_interface
+            while isinstance(wrapper, _TimedSessionInterface):
+                if wrapper._session_interface is self._timed_session_interface:
+                    wrapper._session_interface = wrapped
+                    break
+                wrapper = wrapper._session_interface
+        self._timed_session_interface = None
+
+    def time_api_calls(self, *mocks: NonCallableMock):
+        """
+        Time all calls made to ``mocks`` and their methods during requests, whatever their side effects. Timing a mock
+        more than once has no further effect.
+        """
+        for mock_object in mocks:
+            self._time_mock(mock_object)
+
+    def stop_timing_api_calls(self):
+        for mock_class in self._timed_mock_classes:
+            mock_class._timing_instrumentations.remove(self)
+        self._timed_mock_classes = []
+
+    def _time_mock(self, mock_object: NonCallableMock):
+        mock_class = type(mock_object)
+        instrumentations = mock_class.__dict__.get("_timing_instrumentations")
+        if instrumentations is None:
+            instrumentations = _wrap_mock_class(mock_class)
+        if self in instrumentations:
+            return
+        instrumentations.append(self)
+        self._timed_mock_classes.append(mock_class)
+
+        for child in mock_object._mock_children.values():
+            if isinstance(child, NonCallableMock):
+                self._time_mock(child)
+
+    def _record_api_call(self, mock_object: Mock, duration: float):
+        timing = self.current
+        if timing is not None:
+            timing.api_calls.append([mock_object._extract_mock_name(), duration])
+
+    def _request_started(self, sender, **extra):
+        from flask import request
+
+        self._local.timing = self.timing_class(request.method, request.path, self.test)
+
+    def _before_render_template(self, sender, template, context, **extra):
+        timing = self.current
+        if timing is not None:
+            timing._template_starts.append(time.perf_counter())
+
+    def _template_rendered(self, sender, template, context, **extra):
+        timing = self.current
+        if timing is not None and timing._template_starts:
+            start = timing._template_starts.pop()
+            timing.templates.append([template.name, time.perf_counter() - start, len(timing._template_starts)])
+
+    def _request_finished(self, sender, response, **extra):
+        from flask import request
+
+        timing = self.current
+        if timing is None:
+            return
+        timing.total = time.perf_counter() - timing._started
+        timing.endpoint = request.endpoint
+        timing.status_code = response.status_code
+        self._local.timing = None
+        self.timings.append(timing)
+        self.collector.append(timing)
+
+
+def summarise(timings: List[RequestTiming], top: int = 20) -> dict:
+    """Rank the endpoints and templates in ``timings`` by the total time spent in them"""
+    endpoints: Dict[str, list] = defaultdict(list)
+    templates: Dict[str, list] = defaultdict(list)
+    for timing in timings:
+        endpoints[timing.endpoint or f"{timing.method} {timing.path}"].append(timing)
+        for name, duration, _ in timing.templates:
+            templates[name].append(duration)
+
+    def ranked(rows):
+        return sorted(rows, key=lambda row: row["total"], reverse=True)[:top]
+
+    return {
+        "requests": len(timings),
+        "slowestEndpoints": ranked([
+            {
+                "endpoint": endpoint,
+                "count": len(endpoint_timings),
+                "total": sum(t.total for t in endpoint_timings),
+                "max": max(t.total for t in endpoint_timings),
+                "view": sum(t.view for t in endpoint_timings),
+                "rendering": sum(t.rendering for t in endpoint_timings),
+                "api": sum(t.api for t in endpoint_timings),
+                "session": sum(t.session for t in endpoint_timings),
+                "slowestTest": max(endpoint_timings, key=lambda t: t.total).test,
+            }
+            for endpoint, endpoint_timings in endpoints.items()
+        ]),
+        "slowestTemplates": ranked([
+            {"template": name, "count": len(durations), "total": sum(durations), "max": max(durations)}
+            for name, durations in templates.items()
+        ]),
+    }
+
+
+def write_report(path: str, timings: Optional[List[RequestTiming]] = None):
+    """Write a JSON report of ``timings`` (by default, all those collected in this process) to ``path``"""
+    timings = collected_request_timings if timings is None else timings
+    with open(path, "w") as f:
+        json.dump({"summary": summarise(timings), "requests": [t.as_dict() for t in timings]}, f, indent=2)
+
+
+def read_report(path: str) -> List[RequestTiming]:
+    """Read back the timings in the JSON report at ``path``"""
+    with open(path) as f:
+        return [RequestTiming.from_dict(data) for data in json.load(f)["requests"]]
@@ -0,0 +1,178 @@
+"""
+A load harness for Flask apps under test, firing many requests at the app concurrently from a thread pool to shake out
+lock contention, slow middleware and thread-unsafe globals.
+
+Example usage:
+
+  from dmtestutils.load import LoadRequest, run_load
+
+  def test_catalogue_under_load(self):
+      self.data_api_client.find_services.return_value = ServiceStub().single_result_response()
+      report = run_load(
+          self.app,
+          ["/g-cloud/search?q=email", LoadRequest("/g-cloud/services/123", endpoint="service page")],
+          concurrency=8,
+          repeat=200,
+      )
+      report.assert_no_errors()
+      report.assert_latency_budget(p95=0.05, p99=0.2)
+
+Each worker thread gets its own ``app.test_client()``. Any patching of API clients must be done before calling
+``run_load``, as patches apply to all threads. Latencies are reported in seconds, per endpoint.
+"""
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+
+class LoadRequest(namedtuple("LoadRequest", ("path", "method", "kwargs", "endpoint"))):
+    """
+    A request to make under load. ``kwargs`` are passed on to the test client's ``open`` (e.g. ``data``, ``headers``),
+    and ``endpoint`` is the name the request's latencies are reported under - by default, the name of the app's
+    endpoint the path is routed to.
+    """
+    def __new__(cls, path: str, method: str = "GET", kwargs: Optional[dict] = None, endpoint: Optional[str] = None):
+        return super().__new__(cls, path, method, kwargs or {}, endpoint)
+
+
+EndpointStats = namedtuple("EndpointStats", ("count", "errors", "p50", "p95", "p99", "max"))
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """Return the nearest-rank ``percent`` percentile of the already sorted ``sorted_values``"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(-(-len(sorted_values) * percent // 100)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class LoadReport:
+    def __init__(
+        self,
+        durations: Dict[str, List[float]],
+        errors: Dict[str, int],
+        wall_time: float,
+        failures: Optional[Dict[str, Counter]] = None,
+    ):
+        self.wall_time = wall_time
+        # endpoint: how many times each kind of failure (e.g. "500 response" or "KeyError: 'services'") happened
+        self.failures: Dict[str, Counter] = failures or {}
+        self.endpoints: Dict[str, EndpointStats] = {}
+        for endpoint, endpoint_durations in durations.items():
+            endpoint_durations = sorted(endpoint_durations)
+            self.endpoints[endpoint] = EndpointStats(
+                count=len(endpoint_durations),
+                errors=errors.get(endpoint, 0),
+                p50=percentile(endpoint_durations, 50),
+                p95=percentile(endpoint_durations, 95),
+                p99=percentile(endpoint_durations, 99),
+                max=endpoint_durations[-1] if endpoint_durations else 0.0,
+            )
+
+    @property
+    def total_requests(self) -> int:
+        return sum(stats.count for stats in self.endpoints.values())
+
+    @property
+    def throughput(self) -> float:
+        """Requests per second, across all endpoints"""
+        return self.total_requests / self.wall_time if self.wall_time else 0.0
+
+    def assert_no_errors(self, max_failures_per_endpoint: int = 3):
+        failing = {endpoint: stats.errors for endpoint, stats in self.endpoints.items() if stats.errors}
+        assert not failing, "\n".join([
+            f"Requests failed under load: {failing}",
+            *(
+                f"  {endpoint}: {count} x {failure}"
+                for endpoint in failing
+                for failure, count in self.failures.get(endpoint, Counter()).most_common(max_failures_per_endpoint)
+            ),
+            str(self),
+        ])
+
+    def assert_latency_budget(
+        self,
+        *,
+        p50: Optional[float] = None,
+        p95: Optional[float] = None,
+        p99: Optional[float] = None,
+        endpoint: Optional[str] = None,
+    ):
+        """Assert that the given latency percentiles (in seconds) are within budget, for one or all endpoints"""
+        budgets = {"p50": p50, "p95": p95, "p99": p99}
+        over_budget = [
+            f"{name} {percentile_name} {getattr(stats, percentile_name) * 1000:.1f}ms > {budget * 1000:.1f}ms"
+            for name, stats in self.endpoints.items()
+            if endpoint is None or name == endpoint
+            for percentile_name, budget in budgets.items()
+            if budget is not None and getattr(stats, percentile_name) > budget
+        ]
+        assert not over_budget, "Latency over budget: " + ", ".join(over_budget) + f"\n{self}"
+
+    def __str__(self):
+        lines = [
+            f"{self.total_requests} requests in {self.wall_time:.2f}s ({self.throughput:.1f} requests/s)",
+            f"{'endpoint':<40} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+        ]
+        for endpoint, stats in sorted(self.endpoints.items()):
+            lines.append(
+                f"{endpoint:<40} {stats.count:>7} {stats.errors:>7} {stats.p50 * 1000:>9.1f} {stats.p95 * 1000:>9.1f} "
+                f"{stats.p99 * 1000:>9.1f} {stats.max * 1000:>9.1f}"
+            )
+        return "\n".join(lines)
+
+
+def _endpoint_name(app, request: LoadRequest) -> str:
+    if request.endpoint:
+        return request.endpoint
+    try:
+        endpoint, _ = app.url_map.bind("localhost").match(request.path.split("?")[0], method=request.method)
+        return endpoint
+    except Exception:
+        # not routable (so presumably a 404 or 405 is being tested for) or not a Flask app
+        return f"{request.method} {request.path}"
+
+
+def run_load(
+    app,
+    requests: Iterable[Union[str, LoadRequest]],
+    *,
+    concurrency: int = 8,
+    repeat: int = 1,
+) -> LoadReport:
+    """
+    Make each of ``requests`` (paths or ``LoadRequest`` s) to ``app`` ``repeat`` times, from ``concurrency`` threads
+    at once, and return a ``LoadReport`` of the latencies. Responses with a 5xx status, and requests raising an
+    exception, are counted as errors, and what went wrong is recorded in the report's ``failures``.
+    """
+    requests = [LoadRequest(r) if isinstance(r, str) else r for r in requests]
+    endpoints = [_endpoint_name(app, request) for request in requests]
+    thread_local = threading.local()
+    lock = threading.Lock()
+    durations: Dict[str, List[float]] = {endpoint: [] for endpoint in endpoints}
+    errors: Dict[str, int] = {}
+    failures: Dict[str, Counter] = {}
+
+    def make_request(i: int):
+        request, endpoint = requests[i % len(requests)], endpoints[i % len(requests)]
+        if not hasattr(thread_local, "client"):
+            thread_local.client = app.test_client()
+        start = time.perf_counter()
+        try:
+            status_code = thread_local.client.open(request.path, method=request.method, **request.kwargs).status_code
+            failure = f"{status_code} response" if status_code >= 500 else None
+        except Exception as e:
+            failure = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        duration = time.perf_counter() - start
+        with lock:
+            durations[endpoint].append(duration)
+            if failure is not None:
+                errors[endpoint] = errors.get(endpoint, 0) + 1
+                failures.setdefault(endpoint, Counter())[failure] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(make_request, range(len(requests) * repeat)))
+    return LoadReport(durations, errors, time.perf_counter() - start, failures)
@@ -1,8 +1,4 @@
-from flask import Blueprint
-from dmutils.user import User
-from flask_login import login_user
-
-login_for_tests = Blueprint('login_for_tests', __name__)
+import sys
 
 
 # Simplified example responses from the API
@@ -29,17 +25,43 @@ USERS = {
 }
 
 
-@login_for_tests.route('/auto-supplier-login')
 def auto_supplier_login():
+    from dmutils.user import User
+    from flask_login import login_user
+
     user_json = {"users": USERS['123']}
     user = User.from_json(user_json)
     login_user(user)
     return "OK"
 
 
-@login_for_tests.route('/auto-buyer-login')
 def auto_buyer_login():
+    from dmutils.user import User
+    from flask_login import login_user
+
     user_json = {"users": USERS['234']}
     user = User.from_json(user_json)
     login_user(user)
     return "OK"
+
+
+def _create_login_for_tests_blueprint():
+    from flask import Blueprint
+
+    blueprint = Blueprint('login_for_tests', __name__)
+    blueprint.add_url_rule('/auto-supplier-login', view_func=auto_supplier_login)
+    blueprint.add_url_rule('/auto-buyer-login', view_func=auto_buyer_login)
+    return blueprint
+
+
+# Flask, flask_login and dmutils are only imported when the ``login_for_tests`` blueprint is first used
+def __getattr__(name):
+    if name == 'login_for_tests':
+        blueprint = globals()[name] = _create_login_for_tests_blueprint()
+        return blueprint
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if sys.version_info < (3, 7):
+    # module-level __getattr__ (PEP 562) isn't supported, so create the blueprint up front
+    login_for_tests = _create_login_for_tests_blueprint()
@@ -36,7 +36,14 @@ Traceback (most recent call last):
     ...
 mocking.EggBottleException
 """
-from typing import Callable, Iterable
+from collections import Counter, defaultdict, namedtuple
+from contextlib import ContextDecorator
+from functools import lru_cache
+import inspect
+from itertools import islice
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Type, Union
+from unittest.mock import MagicMock, Mock, NonCallableMagicMock, _Call, create_autospec
 
 
 def assert_args_and_return(retval, *args, **kwargs) -> Callable:
@@ -87,3 +94,454 @@ def assert_args_and_return_iter_over(retval: Iterable, *args, **kwargs) -> Calla
         assert kwargs == inner_kwargs
         return iter(retval)
     return _inner
+
+
+class LazyPages:
+    """
+    A re-iterable of the items produced by ``factory`` (a callable, e.g. a generator function, returning an iterable),
+    fetched lazily ``page_size`` items at a time in the way ``dmapiclient``'s ``find_*_iter`` methods fetch pages from
+    the API. Each iteration calls ``factory`` afresh, and only one page of items is held at a time, so it can stand in
+    for iterating over millions of items in constant memory.
+
+    The number of pages fetched so far is counted in ``pages_fetched``, and if ``page_latency`` is given, fetching each
+    page sleeps for that many seconds.
+
+    >>> pages = LazyPages(lambda: range(250), page_size=100)
+    >>> sum(pages), pages.pages_fetched
+    (31125, 3)
+    """
+    def __init__(self, factory: Callable[[], Iterable], page_size: int = 100, page_latency: float = 0):
+        self.factory = factory
+        self.page_size = page_size
+        self.page_latency = page_latency
+        self.pages_fetched = 0
+
+    def _fetch_page(self, items: Iterator) -> list:
+        if self.page_latency:
+            time.sleep(self.page_latency)
+        page = list(islice(items, self.page_size))
+        if page:
+            self.pages_fetched += 1
+        return page
+
+    def __iter__(self) -> Iterator:
+        items = iter(self.factory())
+        page = self._fetch_page(items)
+        while page:
+            yield from page
+            if len(page) < self.page_size:
+                return
+            page = self._fetch_page(items)
+
+
+def assert_args_and_return_paged_iter(pages: Union[LazyPages, Callable[[], Iterable]], *args, **kwargs) -> Callable:
+    """
+    Given a ``LazyPages`` (or a factory for one, with the default page size) and an arbitrary set of arguments, returns
+    a callable which will return a fresh lazy iterator over ``pages`` when called with arguments matching those
+    specified here, otherwise will raise an ``AssertionError``.
+    """
+    if not isinstance(pages, LazyPages):
+        pages = LazyPages(pages)
+
+    def _inner(*inner_args, **inner_kwargs):
+        assert args == inner_args
+        assert kwargs == inner_kwargs
+        return iter(pages)
+    return _inner
+
+
+_Expectation = namedtuple("_Expectation", ("name", "args", "kwargs", "returns", "raises"))
+_CallGroup = namedtuple("_CallGroup", ("expectations", "ordered", "min_times", "max_times"))
+_CallSequenceState = Tuple[int, int]
+
+
+def _expectation(expected_call: _Call, returns=None, raises: Optional[Exception] = None) -> _Expectation:
+    name, args, kwargs = expected_call if len(expected_call) == 3 else ("", *expected_call)
+    return _Expectation(name, args, kwargs, returns, raises)
+
+
+def _format_call(name: str, args: tuple, kwargs: dict) -> str:
+    return f"{name or 'mock'}({', '.join([*map(repr, args), *(f'{k}={v!r}' for k, v in kwargs.items())])})"
+
+
+class CallSequenceBuilder:
+    """
+    Builds up a sequence of expected calls, each with its response, in groups which must be called in the order they
+    are added. See ``expect_sequence``.
+    """
+    def __init__(self):
+        self._groups: List[_CallGroup] = []
+
+    def then(self, expected_call: _Call, returns=None, *, raises: Optional[Exception] = None) -> "CallSequenceBuilder":
+        """Expect ``expected_call`` next, returning ``returns`` (or raising ``raises``)"""
+        self._groups.append(_CallGroup((_expectation(expected_call, returns, raises),), True, 1, 1))
+        return self
+
+    def unordered(self, *expected_calls_and_returns: Tuple[_Call, Any]) -> "CallSequenceBuilder":
+        """Expect each of the given ``(expected_call, returns)`` pairs next, once each, in any order"""
+        self._groups.append(_CallGroup(
+            tuple(_expectation(expected_call, returns) for expected_call, returns in expected_calls_and_returns),
+            False,
+            len(expected_calls_and_returns),
+            len(expected_calls_and_returns),
+        ))
+        return self
+
+    def repeated(
+        self,
+        expected_call: _Call,
+        returns=None,
+        *,
+        raises: Optional[Exception] = None,
+        min_times: int = 1,
+        max_times: Optional[int] = None,
+    ) -> "CallSequenceBuilder":
+        """Expect ``expected_call`` next, at least ``min_times`` and at most ``max_times`` (if given) times"""
+        self._groups.append(_CallGroup((_expectation(expected_call, returns, raises),), True, min_times, max_times))
+        return self
+
+    def compile(self) -> "CallSequence":
+        return CallSequence(self._groups)
+
+
+class CallSequence:
+    """
+    A compiled sequence of expected calls, as a (nondeterministic) finite state machine. A state is the position of the
+    current group in the sequence along with the progress through it: the number of calls made for a repeated group, or
+    a bitmask of the calls made for an unordered group.
+
+    A call can match more than one expectation - e.g. one made by a repeated group or by the group after it - so the
+    machine keeps the set of states it could be in, and the sequence is complete if any of them is. Where the matching
+    expectations respond differently, the one furthest along the sequence gives the response, and only the states
+    reached through expectations with the same response are kept.
+
+    The possible transitions out of each state are worked out when the state is first reached and cached, indexed by
+    method name, so each call only has to be compared with the (usually one) expected call of that name.
+    """
+    def __init__(self, groups: Sequence[_CallGroup]):
+        self._groups = tuple(groups)
+        self._transitions_cache: Dict[_CallSequenceState, Dict[str, list]] = {}
+        self.states: FrozenSet[_CallSequenceState] = frozenset({(0, 0)})
+
+    @property
+    def method_names(self) -> Set[str]:
+        return {expectation.name for group in self._groups for expectation in group.expectations}
+
+    def _is_satisfied(self, group_index: int, progress: int) -> bool:
+        group = self._groups[group_index]
+        if group.ordered:
+            return progress >= group.min_times
+        return progress == (1 << len(group.expectations)) - 1
+
+    def _group_transitions(self, group_index: int, progress: int) -> Iterator[Tuple[_Expectation, _CallSequenceState]]:
+        group = self._groups[group_index]
+        if group.ordered:
+            if group.max_times is None or progress < group.max_times:
+                next_progress = progress + 1
+                if group.max_times == next_progress:
+                    # nothing more can happen in this group, so move straight on to the next
+                    yield group.expectations[0], (group_index + 1, 0)
+                else:
+                    yield group.expectations[0], (group_index, next_progress)
+            return
+
+        for i, expectation in enumerate(group.expectations):
+            if not progress & (1 << i):
+                next_progress = progress | (1 << i)
+                if self._is_satisfied(group_index, next_progress):
+                    yield expectation, (group_index + 1, 0)
+                else:
+                    yield expectation, (group_index, next_progress)
+
+    def _transitions(self, state: _CallSequenceState) -> Dict[str, list]:
+        if state not in self._transitions_cache:
+            transitions = defaultdict(list)
+            group_index, progress = state
+            # calls can be for the current group or, once it's satisfied, any of the following groups until one that
+            # isn't satisfied without any calls
+            while group_index < len(self._groups):
+                for expectation, next_state in self._group_transitions(group_index, progress):
+                    transitions[expectation.name].append((expectation, next_state))
+                if not self._is_satisfied(group_index, progress):
+                    break
+                group_index, progress = group_index + 1, 0
+            self._transitions_cache[state] = dict(transitions)
+        return self._transitions_cache[state]
+
+    def _expected_calls_description(self) -> str:
+        expected = dict.fromkeys(
+            _format_call(expectation.name, expectation.args, expectation.kwargs)
+            for state in sorted(self.states)
+            for candidates in self._transitions(state).values()
+            for expectation, _ in candidates
+        )
+        return f"one of {', '.join(expected)}" if expected else "no more calls"
+
+    def advance(self, name: str, args: tuple, kwargs: dict):
+        """Move the state machine on for a call to method ``name``, returning (or raising) the call's response"""
+        matches = [
+            (expectation, next_state)
+            for state in self.states
+            for expectation, next_state in self._transitions(state).get(name, ())
+            if expectation.args == args and expectation.kwargs == kwargs
+        ]
+        if not matches:
+            raise AssertionError(
+                f"Unexpected call {_format_call(name, args, kwargs)}, expected {self._expected_calls_description()}"
+            )
+
+        response, _ = max(matches, key=lambda match: match[1])
+        self.states = frozenset(
+            next_state for expectation, next_state in matches
+            if (expectation.returns, expectation.raises) == (response.returns, response.raises)
+        )
+        if response.raises is not None:
+            raise response.raises
+        return response.returns
+
+    def __call__(self, *args, **kwargs):
+        return self.advance("", args, kwargs)
+
+    def install(self, mock_object: Mock) -> "CallSequence":
+        """Set the ``side_effect`` of each of ``mock_object``'s methods named in the sequence to advance the sequence"""
+        for name in self.method_names:
+            if name:
+                getattr(mock_object, name).side_effect = self._side_effect(name)
+            else:
+                mock_object.side_effect = self
+        return self
+
+    def _side_effect(self, name: str) -> Callable:
+        def _inner(*args, **kwargs):
+            return self.advance(name, args, kwargs)
+        return _inner
+
+    def _is_accepting(self, state: _CallSequenceState) -> bool:
+        group_index, progress = state
+        return all(
+            self._is_satisfied(i, progress if i == group_index else 0) for i in range(group_index, len(self._groups))
+        )
+
+    @property
+    def is_complete(self) -> bool:
+        return any(self._is_accepting(state) for state in self.states)
+
+    def assert_complete(self):
+        assert self.is_complete, f"Expected calls are outstanding: expected {self._expected_calls_description()}"
+
+
+def expect_sequence() -> CallSequenceBuilder:
+    """
+    Returns a builder for a sequence of expected calls to the methods of a mock (typically an API client), each with a
+    response. Once compiled, the sequence can be installed on the mock, and any call out of sequence or with the wrong
+    arguments raises an ``AssertionError`` at the offending call site.
+
+    >>> from unittest.mock import Mock, call, ANY
+    >>> data_api_client = Mock()
+    >>> sequence = (
+    ...     expect_sequence()
+    ...     .then(call.get_framework("g-cloud-10"), returns={"frameworks": {}})
+    ...     .unordered(
+    ...         (call.get_supplier(1234), {"suppliers": {}}),
+    ...         (call.find_briefs(user_id=1), {"briefs": []}),
+    ...     )
+    ...     .repeated(call.get_service(ANY), returns={"services": {}}, max_times=3)
+    ...     .compile()
+    ...     .install(data_api_client)
+    ... )
+    >>> data_api_client.get_framework("g-cloud-10")
+    {'frameworks': {}}
+    >>> data_api_client.find_briefs(user_id=1)
+    {'briefs': []}
+    >>> data_api_client.get_service("123")
+    Traceback (most recent call last):
+        ...
+    AssertionError: Unexpected call get_service('123'), expected one of get_supplier(1234)
+    >>> data_api_client.get_supplier(1234)
+    {'suppliers': {}}
+    >>> sequence.assert_complete()
+    Traceback (most recent call last):
+        ...
+    AssertionError: Expected calls are outstanding: expected one of get_service(<ANY>)
+    """
+    return CallSequenceBuilder()
+
+
+def _method_signature(spec_class: type, name: str) -> Optional[inspect.Signature]:
+    """Return the signature of ``spec_class``'s attribute ``name`` as called on an instance, or None if not callable"""
+    attribute = inspect.getattr_static(spec_class, name)
+    skip_first = True
+    if isinstance(attribute, staticmethod):
+        attribute, skip_first = attribute.__func__, False
+    elif isinstance(attribute, classmethod):
+        attribute = attribute.__func__
+    elif not inspect.isfunction(attribute):
+        return None
+    try:
+        signature = inspect.signature(attribute)
+    except (TypeError, ValueError):
+        return None
+    parameters = list(signature.parameters.values())
+    return signature.replace(parameters=parameters[1:] if skip_first else parameters)
+
+
+def _autospec_child(signature: inspect.Signature, **kwargs) -> MagicMock:
+    """Return a mock method which checks its calls against ``signature``, as ``create_autospec``'s methods do"""
+    child = MagicMock(**kwargs)
+    # the same (private) hooks create_autospec uses to check calls against the signature and to normalise recorded
+    # calls - _mock_internals_supported checks they still do
+    child._mock_check_sig = signature.bind
+    child.__dict__["_spec_signature"] = signature
+    return child
+
+
+class _CachedAutospecMock(NonCallableMagicMock):
+    # name: signature of each of the spec class's public attributes, None for those which aren't methods
+    _cached_signatures: Dict[str, Optional[inspect.Signature]] = {}
+
+    def _get_child_mock(self, **kwargs):
+        name = kwargs.get("name")
+        if kwargs.get("_new_parent") is not self or name not in self._cached_signatures:
+            return super()._get_child_mock(**kwargs)
+
+        signature = self._cached_signatures[name]
+        if signature is None:
+            return NonCallableMagicMock(**kwargs)
+        return _autospec_child(signature, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def _mock_internals_supported() -> bool:
+    """
+    Whether the private ``unittest.mock`` internals ``cached_autospec`` relies on are there and behave as expected in
+    this version of Python, found by trying them out on a throwaway mock
+    """
+    class Probe:
+        def method(self, a, *, b=None):
+            pass
+
+    try:
+        mock_instance = NonCallableMagicMock(spec=["method"])
+        mock_instance.__dict__["_spec_class"] = Probe
+        method = _autospec_child(_method_signature(Probe, "method"), name="method")
+        method(a=1)
+        method.assert_called_once_with(1)
+        try:
+            method(1, 2)
+        except TypeError:
+            return isinstance(mock_instance, Probe)
+        return False
+    except Exception:
+        return False
+
+
+@lru_cache(maxsize=None)
+def _cached_autospec_class(spec_class: type) -> Type[_CachedAutospecMock]:
+    signatures = {
+        name: _method_signature(spec_class, name)
+        for name in dir(spec_class)
+        if not name.startswith("__")
+    }
+    return type(f"{spec_class.__name__}Autospec", (_CachedAutospecMock,), {"_cached_signatures": signatures})
+
+
+def cached_autospec(spec_class: type, *, spec_set: bool = False) -> NonCallableMagicMock:
+    """
+    Returns a mock instance of ``spec_class``, like ``mock.create_autospec(spec_class, instance=True)`` but much
+    cheaper to create: the class is only introspected the first time, and the mock's methods are only created when
+    they are used. As with ``create_autospec``, accessing attributes ``spec_class`` doesn't have raises an
+    ``AttributeError``, and calling methods with arguments that don't fit their signatures raises a ``TypeError`` -
+    before any ``side_effect`` (e.g. one of the ``assert_args_and_*`` closures above) is called.
+
+    >>> class Client:
+    ...     def get_brief(self, brief_id, *, with_users=False):
+    ...         pass
+
+    >>> client = cached_autospec(Client)
+    >>> client.get_brief.side_effect = assert_args_and_return({"briefs": {}}, 1234)
+    >>> client.get_brief(1234)
+    {'briefs': {}}
+    >>> client.get_brief(1234, True)
+    Traceback (most recent call last):
+        ...
+    TypeError: too many positional arguments
+    >>> client.get_breif(1234)
+    Traceback (most recent call last):
+        ...
+    AttributeError: Mock object has no attribute 'get_breif'
+
+    Should the private ``unittest.mock`` internals this relies on change, it falls back to ``create_autospec``.
+    """
+    if not _mock_internals_supported():
+        return create_autospec(spec_class, spec_set=spec_set, instance=True)
+
+    mock_class = _cached_autospec_class(spec_class)
+    names = list(mock_class._cached_signatures)
+    mock_instance = mock_class(spec_set=names) if spec_set else mock_class(spec=names)
+    # makes isinstance(mock_instance, spec_class) true, as for a mock with spec_class as its spec
+    mock_instance.__dict__["_spec_class"] = spec_class
+    return mock_instance
+
+
+class api_call_budget(ContextDecorator):
+    """
+    A context manager (or decorator) which fails with an ``AssertionError`` if more than ``max_calls`` calls in total,
+    or more than ``max_calls_per_method`` calls to any one method, are made through ``mocks`` (typically mocked API
+    clients) within it, e.g. to catch views which call the API once for each item in a list:
+
+      with api_call_budget(self.data_api_client, max_calls=3, max_calls_per_method=1):
+          self.client.get("/suppliers/opportunities/1234/responses")
+
+    The failure message breaks the calls down by method and arguments. Calls are counted from the mocks' recorded
+    calls, so this works whatever ``side_effect`` the mocks have.
+    """
+    def __init__(self, *mocks: Mock, max_calls: Optional[int] = None, max_calls_per_method: Optional[int] = None):
+        self.mocks = mocks
+        self.max_calls = max_calls
+        self.max_calls_per_method = max_calls_per_method
+        self.calls: List[_Call] = []
+
+    @staticmethod
+    def _recorded_calls(mock_object: Mock) -> List[_Call]:
+        # calls to the mock itself (if it's a mocked function) and calls to its methods (if it's a mocked client)
+        return [_Call(("", *args)) for args in mock_object.call_args_list] + list(mock_object.method_calls)
+
+    def __enter__(self):
+        self._calls_before = [len(self._recorded_calls(mock_object)) for mock_object in self.mocks]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.calls = [
+            recorded_call
+            for mock_object, calls_before in zip(self.mocks, self._calls_before)
+            for recorded_call in self._recorded_calls(mock_object)[calls_before:]
+        ]
+        if exc_type is not None:
+            return False
+
+        calls_by_method = Counter(name for name, _, _ in self.calls)
+        over_budget = []
+        if self.max_calls is not None and len(self.calls) > self.max_calls:
+            over_budget.append(f"{len(self.calls)} API calls were made, more than the budget of {self.max_calls}")
+        if self.max_calls_per_method is not None:
+            over_budget.extend(
+                f"{count} calls were made to {name or 'mock'}, more than the budget of {self.max_calls_per_method}"
+                for name, count in calls_by_method.items()
+                if count > self.max_calls_per_method
+            )
+        assert not over_budget, "\n".join(over_budget + [self.breakdown()])
+
+    def breakdown(self, max_arguments_per_method: int = 5) -> str:
+        """Describe the calls made, by method and then by arguments, most frequent first"""
+        calls_by_method = Counter(name for name, _, _ in self.calls)
+        lines = []
+        for name, count in calls_by_method.most_common():
+            lines.append(f"  {count} x {name or 'mock'}")
+            calls_by_arguments = Counter(
+                _format_call(call_name, args, kwargs) for call_name, args, kwargs in self.calls if call_name == name
+            )
+            for formatted_call, call_count in calls_by_arguments.most_common(max_arguments_per_method):
+                lines.append(f"      {call_count} x {formatted_call}")
+            if len(calls_by_arguments) > max_arguments_per_method:
+                lines.append(f"      ... and {len(calls_by_arguments) - max_arguments_per_method} more")
+        return "\n".join(lines)
@@ -0,0 +1,175 @@
+"""
+A pytest plugin providing API model stubs which are built once and shared by every test in a session.
+
+Enable it in your app's top-level ``conftest.py`` with:
+
+  pytest_plugins = ["dmtestutils.pytest_plugin"]
+
+and then ask for one of the shared stub fixtures:
+
+  def test_framework_dashboard(shared_framework_stub):
+      data_api_client.get_framework.return_value = shared_framework_stub.single_result_response()
+      ...
+
+Because the stubs are shared, tests must not modify their response data. After each test using a shared stub, the
+stub's response data is checked against a snapshot taken when it was built. If it has changed, the stub is restored
+(so later tests aren't affected) and the test fails at teardown with an error naming it. The check serialises the
+response data with ``marshal`` and compares it with the snapshot's bytes, so it is cheap enough to leave on for every
+test.
+
+Shared stubs with other kwargs can be declared in a conftest with ``shared_stub_fixture``:
+
+  from dmtestutils.api_model_stubs import FrameworkStub
+  from dmtestutils.pytest_plugin import shared_stub_fixture
+
+  shared_dos_framework_stub = shared_stub_fixture(FrameworkStub, slug="digital-outcomes-and-specialists-4")
+
+The plugin also writes the report of any requests timed with ``BaseFrontendApplicationTest.instrument_requests`` at the
+end of the session - see ``dmtestutils.instrumentation``. Under ``pytest-xdist``, each worker writes its own report
+next to it (e.g. ``request-timings.worker-gw0.json``), which the controller merges into the one report and removes.
+"""
+from copy import deepcopy
+import glob
+import marshal
+import os
+import pickle
+from typing import Dict, List, Tuple, Type
+
+import pytest
+
+from . import instrumentation
+from .api_model_stubs import (
+    BaseAPIModelStub,
+    BriefResponseStub,
+    BriefStub,
+    FrameworkStub,
+    ServiceStub,
+    SupplierFrameworkStub,
+    SupplierStub,
+)
+
+
+def _serialise(data) -> bytes:
+    try:
+        # from version 3, marshal flags objects with more than one reference so as to write them only once, which
+        # would make merely holding a reference to part of the response data look like a modification
+        return marshal.dumps(data, 2)
+    except ValueError:
+        # response data containing types marshal doesn't support, e.g. datetimes
+        return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class SharedStub:
+    """A stub shared between tests, along with a snapshot of its response data to check it against"""
+    def __init__(self, stub: BaseAPIModelStub):
+        self.stub = stub
+        # some stubs add keys to their response data in single_result_response(), so add them before the snapshot is
+        # taken rather than treating tests calling it as having modified the stub
+        stub.single_result_response()
+        self._response_data = stub.response_data
+        self._pristine_response_data = deepcopy(stub.response_data)
+        self._snapshot = _serialise(stub.response_data)
+
+    def is_mutated(self) -> bool:
+        return self.stub.response_data is not self._response_data or _serialise(self._response_data) != self._snapshot
+
+    def mutated_keys(self):
+        pristine, current = self._pristine_response_data, self.stub.response_data
+        return sorted(k for k in pristine.keys() | current.keys() if k not in current or pristine.get(k) != current[k])
+
+    def restore(self):
+        self.stub.response_data = self._response_data = deepcopy(self._pristine_response_data)
+
+    def check(self, nodeid: str):
+        """Fail (naming ``nodeid`` as the culprit) if the stub's response data has been modified, restoring it"""
+        if not self.is_mutated():
+            return
+        mutated_keys = self.mutated_keys()
+        self.restore()
+        pytest.fail(
+            f"{nodeid} modified the response data of a shared {type(self.stub).__name__} "
+            f"(keys: {', '.join(mutated_keys) or 'none - the response data was replaced'}). "
+            f"Shared stubs must not be modified - use .evolve() or a stub of your own instead.",
+            pytrace=False,
+        )
+
+
+class SharedStubs:
+    """The session's shared stubs, built on first use"""
+    def __init__(self):
+        self._stubs: Dict[Tuple[Type[BaseAPIModelStub], str], SharedStub] = {}
+
+    def get(self, stub_class: Type[BaseAPIModelStub], **kwargs) -> SharedStub:
+        key = (stub_class, repr(sorted(kwargs.items())))
+        if key not in self._stubs:
+            self._stubs[key] = SharedStub(stub_class(**kwargs))
+        return self._stubs[key]
+
+
+@pytest.fixture(scope="session")
+def shared_stubs() -> SharedStubs:
+    return SharedStubs()
+
+
+def shared_stub_fixture(stub_class: Type[BaseAPIModelStub], **kwargs):
+    """Return a fixture providing a ``stub_class(**kwargs)`` shared by all the tests in the session"""
+    @pytest.fixture
+    def _shared_stub(request, shared_stubs):
+        shared = shared_stubs.get(stub_class, **kwargs)
+        yield shared.stub
+        shared.check(request.node.nodeid)
+    return _shared_stub
+
+
+shared_brief_stub = shared_stub_fixture(BriefStub)
+shared_brief_response_stub = shared_stub_fixture(BriefResponseStub)
+shared_framework_stub = shared_stub_fixture(FrameworkStub)
+shared_service_stub = shared_stub_fixture(ServiceStub)
+shared_supplier_framework_stub = shared_stub_fixture(SupplierFrameworkStub)
+shared_supplier_stub = shared_stub_fixture(SupplierStub)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--request-timing-report",
+        default="request-timings.json",
+        help="Where to write the timings of requests instrumented by dmtestutils (default: %(default)s)",
+    )
+
+
+def _request_timing_report_path(config) -> str:
+    return os.path.join(str(config.rootdir), config.getoption("request_timing_report"))
+
+
+def _worker_report_path(report_path: str, worker_id: str) -> str:
+    root, ext = os.path.splitext(report_path)
+    return f"{root}.worker-{worker_id}{ext}"
+
+
+def _worker_report_paths(report_path: str) -> List[str]:
+    return sorted(glob.glob(_worker_report_path(glob.escape(report_path), "*")))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session):
+    if not hasattr(session.config, "workerinput"):
+        # don't merge worker reports left behind by an earlier (interrupted) run into this one's
+        for path in _worker_report_paths(_request_timing_report_path(session.config)):
+            os.remove(path)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    report_path = _request_timing_report_path(session.config)
+    workerinput = getattr(session.config, "workerinput", None)
+    if workerinput is not None:
+        # a pytest-xdist worker: leave its timings for the controller to merge, as every worker shares the report path
+        if instrumentation.collected_request_timings:
+            instrumentation.write_report(_worker_report_path(report_path, workerinput["workerid"]))
+        return
+
+    timings = list(instrumentation.collected_request_timings)
+    for path in _worker_report_paths(report_path):
+        timings.extend(instrumentation.read_report(path))
+        os.remove(path)
+    if timings:
+        instrumentation.write_report(report_path, timings)
@@ -0,0 +1,246 @@
+"""
+Budgets for the cost of rendering a frontend page: the size of the response body, the number of templates loaded
+(the page, along with everything it includes, imports or extends) and the time spent rendering templates.
+
+Example usage, in a ``BaseFrontendApplicationTest`` subclass:
+
+  @pytest.mark.parametrize("brief_count", (10, 100, 1000))
+  def test_opportunities_page_scales_with_briefs(self, brief_count):
+      generator = StubGenerator(seed=1)
+      self.data_api_client.find_briefs.return_value = {
+          "briefs": [generator.brief(status="live").response() for _ in range(brief_count)],
+          "links": {},
+      }
+
+      with self.render_budget(max_bytes=20_000 + 2_000 * brief_count, max_template_loads=20, max_render_time=0.5):
+          self.client.get("/digital-outcomes-and-specialists/opportunities")
+
+Every request made in the ``with`` block is checked against the budget when it exits. If any are over budget, an
+``AssertionError`` is raised listing the largest contributors to whatever is over: the largest HTML elements, the most
+loaded templates or the slowest templates. Budgets for a whole test class can be set with its
+``response_size_budget``, ``template_loads_budget`` and ``render_time_budget`` attributes.
+
+Budgets which are a function of the amount of data a page is rendered with, as above, catch pages whose output grows
+faster than the number of services or briefs on them.
+"""
+from collections import Counter, defaultdict
+from html.parser import HTMLParser
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .instrumentation import RequestInstrumentation, RequestTiming
+
+
+# elements which have no end tag
+VOID_ELEMENTS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr",
+))
+
+# elements whose end tag can be left out, as another element of the same kind closes them
+_OPTIONAL_END_TAG_ELEMENTS = frozenset(("dd", "dt", "li", "option", "p", "td", "th", "tr"))
+
+# elements which make up (nearly) the whole of every page, so are never interesting as contributors
+_DOCUMENT_ELEMENTS = frozenset(("html", "head", "body"))
+
+
+def _selector(tag: str, attrs: List[Tuple[str, Optional[str]]]) -> str:
+    attrs_dict = dict(attrs)
+    selector = tag
+    if attrs_dict.get("id"):
+        selector += f"#{attrs_dict['id']}"
+    if attrs_dict.get("class"):
+        selector += "".join(f".{class_name}" for class_name in attrs_dict["class"].split())
+    return selector
+
+
+class _ElementSizeParser(HTMLParser):
+    """Totals the size of the markup of the elements in a document, grouped by selector"""
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=False)
+        self._html = html
+        self._line_offsets = [0] + [match.end() for match in re.finditer("\n", html)]
+        self._stack: List[Tuple[str, str, int]] = []
+        self._open_selectors: Counter = Counter()
+        self.sizes: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def _close_top(self, end: int):
+        _, selector, start = self._stack.pop()
+        self._open_selectors[selector] -= 1
+        self._add(selector, end - start)
+
+    def _add(self, selector: str, size: int):
+        # don't count elements nested inside others with the same selector twice
+        if not self._open_selectors[selector]:
+            self.sizes[selector][0] += 1
+            self.sizes[selector][1] += size
+
+    def handle_starttag(self, tag, attrs):
+        selector = _selector(tag, attrs)
+        if tag in VOID_ELEMENTS:
+            self._add(selector, len(self.get_starttag_text()))
+            return
+        if tag in _OPTIONAL_END_TAG_ELEMENTS and self._stack and self._stack[-1][0] == tag:
+            self._close_top(self._offset())
+        self._stack.append((tag, selector, self._offset()))
+        self._open_selectors[selector] += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._add(_selector(tag, attrs), len(self.get_starttag_text()))
+
+    def handle_endtag(self, tag):
+        # tolerate unclosed elements (e.g. <li> or <p> without an end tag) by closing them along with their parent
+        if not any(open_tag == tag for open_tag, _, _ in self._stack):
+            return
+        start = self._offset()
+        while self._stack[-1][0] != tag:
+            self._close_top(start)
+        self._close_top(start + len(f"</{tag}>"))
+
+    def close(self):
+        super().close()
+        while self._stack:
+            self._close_top(len(self._html))
+
+
+def largest_elements(html: str, top: int = 5) -> List[Tuple[str, int, int]]:
+    """
+    Return the ``top`` selectors whose elements make up most of ``html``, as ``(selector, count, size)`` tuples, where
+    ``size`` is the total length of their markup. Elements nested inside another with the same selector aren't counted
+    separately, and the html, head and body elements are left out.
+    """
+    parser = _ElementSizeParser(html)
+    parser.feed(html)
+    parser.close()
+    return sorted(
+        (
+            (selector, count, size)
+            for selector, (count, size) in parser.sizes.items()
+            if selector.split("#")[0].split(".")[0] not in _DOCUMENT_ELEMENTS
+        ),
+        key=lambda row: row[2],
+        reverse=True,
+    )[:top]
+
+
+def response_size_problems(body: bytes, max_bytes: Optional[int], top: int = 5) -> List[str]:
+    if max_bytes is None or len(body) <= max_bytes:
+        return []
+    return [f"response body of {len(body):,} bytes is over the budget of {max_bytes:,} bytes. Largest elements:"] + [
+        f"  {selector} x {count}: {size:,} characters"
+        for selector, count, size in largest_elements(body.decode("utf-8", "replace"), top)
+    ]
+
+
+class RenderCost(RequestTiming):
+    """The timing of a request along with its response body and the number of times it loaded each template"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.body = b""
+        self.template_loads: Counter = Counter()
+
+    def problems(
+        self,
+        max_bytes: Optional[int] = None,
+        max_template_loads: Optional[int] = None,
+        max_render_time: Optional[float] = None,
+        top: int = 5,
+    ) -> List[str]:
+        """Describe the ways in which this request is over the budget given, if any"""
+        problems = response_size_problems(self.body, max_bytes, top)
+
+        template_loads = sum(self.template_loads.values())
+        if max_template_loads is not None and template_loads > max_template_loads:
+            problems.append(f"{template_loads} template loads is over the budget of {max_template_loads}. Most loaded:")
+            problems.extend(f"  {name} x {count}" for name, count in self.template_loads.most_common(top))
+
+        if max_render_time is not None and self.rendering > max_render_time:
+            problems.append(
+                f"{self.rendering:.3f}s rendering templates is over the budget of {max_render_time:.3f}s. Slowest:"
+            )
+            problems.extend(
+                f"  {name}: {duration:.3f}s"
+                for name, duration, _ in sorted(self.templates, key=lambda t: t[1], reverse=True)[:top]
+            )
+
+        return problems
+
+
+class _RenderCostInstrumentation(RequestInstrumentation):
+    timing_class = RenderCost
+    _previous_get_template = None
+
+    def attach(self) -> "_RenderCostInstrumentation":
+        super().attach()
+        jinja_env = self.app.jinja_env
+        get_template = jinja_env.get_template
+        # an app (or another budget) may have set get_template on the environment itself, which detach puts back
+        self._previous_get_template = jinja_env.__dict__.get("get_template")
+
+        # includes, imports and extends all load templates through the environment as the page is rendered
+        def counting_get_template(name, *args, **kwargs):
+            timing = self.current
+            if timing is not None:
+                timing.template_loads[getattr(name, "name", name)] += 1
+            return get_template(name, *args, **kwargs)
+        jinja_env.get_template = counting_get_template
+        return self
+
+    def detach(self):
+        super().detach()
+        if self._previous_get_template is None:
+            self.app.jinja_env.__dict__.pop("get_template", None)
+        else:
+            self.app.jinja_env.get_template = self._previous_get_template
+
+    def _request_finished(self, sender, response, **extra):
+        timing = self.current
+        if timing is not None and not response.direct_passthrough:
+            timing.body = response.get_data()
+        super()._request_finished(sender, response, **extra)
+
+
+class RenderBudget:
+    """A context manager checking the cost of every request made to ``app`` inside it against a budget"""
+    def __init__(
+        self,
+        app,
+        max_bytes: Optional[int] = None,
+        max_template_loads: Optional[int] = None,
+        max_render_time: Optional[float] = None,
+        top: int = 5,
+    ):
+        self.max_bytes = max_bytes
+        self.max_template_loads = max_template_loads
+        self.max_render_time = max_render_time
+        self.top = top
+        self._instrumentation = _RenderCostInstrumentation(app, collector=[])
+
+    @property
+    def costs(self) -> List[RenderCost]:
+        return self._instrumentation.timings
+
+    def __enter__(self) -> "RenderBudget":
+        self._instrumentation.attach()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._instrumentation.detach()
+        if exc_type is None:
+            self.check()
+
+    def check(self):
+        if not self.costs:
+            raise AssertionError("No requests were made to check against the render budget")
+
+        failures = []
+        for cost in self.costs:
+            problems = cost.problems(self.max_bytes, self.max_template_loads, self.max_render_time, self.top)
+            if problems:
+                failures.append(f"{cost.method} {cost.path} is over its render budget:")
+                failures.extend(f"  {problem}" for problem in problems)
+        if failures:
+            raise AssertionError("\n".join(failures))
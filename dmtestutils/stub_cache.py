@@ -0,0 +1,218 @@
+"""
+A persistent, content-addressed on-disk cache for large corpora of API model stub responses, allowing e.g. all the
+workers of a ``pytest-xdist`` run to share a single copy of the corpus rather than each building it from scratch.
+
+Example usage:
+
+  from dmtestutils.api_model_stubs import ServiceStub
+  from dmtestutils.stub_cache import cached_stub_corpus
+
+  @pytest.fixture(scope="session")
+  def lots_of_services():
+      return cached_stub_corpus(ServiceStub, [{"service_id": i, "lot": "cloud-hosting"} for i in range(10000)])
+
+The first process to ask for a given corpus builds and stores it; any processes asking for the same corpus at the same
+time wait for it to be written and then load it with a memory-mapped read. Entries are keyed on the stub class, the
+list of kwargs and the version of this package, so there is no need to clear the cache when the stubs change.
+
+As the cache is made of pickles, the default cache directory is private to the current user. A lock left behind by a
+builder which crashed is reclaimed once its process has gone (or, for a builder on another host sharing the cache
+directory, once the lock is older than ``stale_lock_age``).
+"""
+import getpass
+from hashlib import sha256
+import mmap
+import os
+import pickle
+import shutil
+import socket
+import stat
+import sys
+import tempfile
+import time
+from typing import List, Mapping, Optional, Sequence, Type
+import uuid
+
+from . import __version__
+from .api_model_stubs import BaseAPIModelStub
+
+
+CACHE_DIR_ENV_VAR = "DMTESTUTILS_STUB_CACHE_DIR"
+
+
+def _user_id() -> str:
+    return str(os.getuid()) if hasattr(os, "getuid") else getpass.getuser()
+
+
+def default_cache_dir() -> str:
+    return os.environ.get(CACHE_DIR_ENV_VAR) or os.path.join(
+        tempfile.gettempdir(), f"dmtestutils-stub-cache-{_user_id()}"
+    )
+
+
+def _make_private_dir(path: str):
+    """Create the directory at ``path`` if needed, checking that only the current user can write to it"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not hasattr(os, "getuid"):
+        return
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise PermissionError(f"Stub cache directory {path} can be written to by other users, so can't be trusted")
+
+
+def _pid_is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # it's running, as someone else
+        pass
+    return True
+
+
+def _stale_lock_inode(lock_path: str, stale_lock_age: float) -> Optional[int]:
+    """Return the inode of the lock at ``lock_path`` if it's stale, or None if it's still held (or has gone)"""
+    try:
+        with open(lock_path) as f:
+            owner = f.read()
+            st = os.fstat(f.fileno())
+    except FileNotFoundError:
+        # it's just been released
+        return None
+    host, _, pid = owner.partition(":")
+    # os.kill doesn't just check for a process on windows
+    if os.name == "posix" and host == socket.gethostname() and pid.isdigit():
+        stale = not _pid_is_running(int(pid))
+    else:
+        stale = time.time() - st.st_mtime > stale_lock_age
+    return st.st_ino if stale else None
+
+
+def _remove_lock(lock_path: str, inode: int) -> bool:
+    """
+    Remove the lock at ``lock_path`` if it's still the file with ``inode``, returning whether it was. The lock is first
+    renamed to a name of our own, which only one process can do, so a lock another process has taken since is put back
+    rather than removed.
+    """
+    removing_path = f"{lock_path}.{uuid.uuid4().hex}.removing"
+    try:
+        os.rename(lock_path, removing_path)
+    except FileNotFoundError:
+        return False
+    try:
+        if os.stat(removing_path).st_ino == inode:
+            return True
+        try:
+            os.link(removing_path, lock_path)
+        except FileExistsError:
+            # yet another process has taken the lock in the meantime
+            pass
+        return False
+    finally:
+        os.unlink(removing_path)
+
+
+def stub_corpus_key(
+    stub_class: Type[BaseAPIModelStub],
+    kwargs_list: Sequence[Mapping],
+    response_method: str = "response",
+) -> str:
+    return sha256(repr((
+        stub_class.__module__,
+        stub_class.__qualname__,
+        response_method,
+        [dict(kwargs) for kwargs in kwargs_list],
+        __version__,
+        sys.version_info[:2],
+        pickle.HIGHEST_PROTOCOL,
+    )).encode("utf-8")).hexdigest()
+
+
+def _load_corpus(path: str) -> List[dict]:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return pickle.loads(mapped)
+
+
+def _store_corpus(path: str, corpus: List[dict]):
+    # write to a temporary file and atomically move it into place so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(corpus, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _acquire_lock(lock_path: str, stale_lock_age: float) -> Optional[int]:
+    """Return a file descriptor for the newly taken lock, or None if it's held by a builder which is still alive"""
+    try:
+        lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        stale_inode = _stale_lock_inode(lock_path, stale_lock_age)
+        if stale_inode is None:
+            return None
+        _remove_lock(lock_path, stale_inode)
+        return _acquire_lock(lock_path, stale_lock_age)
+    os.write(lock_fd, f"{socket.gethostname()}:{os.getpid()}".encode("utf-8"))
+    return lock_fd
+
+
+def cached_stub_corpus(
+    stub_class: Type[BaseAPIModelStub],
+    kwargs_list: Sequence[Mapping],
+    *,
+    response_method: str = "response",
+    cache_dir: Optional[str] = None,
+    timeout: float = 60.0,
+    poll_interval: float = 0.05,
+    stale_lock_age: float = 600.0,
+) -> List[dict]:
+    """
+    Return a list of ``stub_class(**kwargs).<response_method>()`` for each of ``kwargs_list``, loading it from the
+    on-disk cache if another process has already built it.
+
+    If another process is part way through building the same corpus, waits up to ``timeout`` seconds for it to finish
+    before giving up and building the corpus without caching it. Locks left by builders which have died are reclaimed
+    rather than waited on.
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    _make_private_dir(cache_dir)
+    path = os.path.join(cache_dir, stub_corpus_key(stub_class, kwargs_list, response_method) + ".pickle")
+    lock_path = path + ".lock"
+
+    def build():
+        return [getattr(stub_class(**kwargs), response_method)() for kwargs in kwargs_list]
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return _load_corpus(path)
+        except FileNotFoundError:
+            pass
+
+        lock_fd = _acquire_lock(lock_path, stale_lock_age)
+        if lock_fd is None:
+            # someone else is building this corpus
+            if time.monotonic() > deadline:
+                return build()
+            time.sleep(poll_interval)
+            continue
+
+        try:
+            # the builder holding the lock may have finished between our load attempt and acquiring the lock
+            if os.path.exists(path):
+                return _load_corpus(path)
+            corpus = build()
+            _store_corpus(path, corpus)
+            return corpus
+        finally:
+            # only remove the lock if it's still ours, and hasn't been reclaimed as stale and taken by someone else
+            _remove_lock(lock_path, os.fstat(lock_fd).st_ino)
+            os.close(lock_fd)
+
+
+def clear_stub_cache(cache_dir: Optional[str] = None):
+    shutil.rmtree(cache_dir or default_cache_dir(), ignore_errors=True)
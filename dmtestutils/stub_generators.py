@@ -0,0 +1,221 @@
+"""
+A seeded generator of randomised API model stubs, for fuzz-style and stress tests which need many varied examples
+rather than the single fixed example each stub gives by default.
+
+Random values are only ever chosen for a stub's kwargs - the stubs themselves are then constructed as normal, so any
+derived fields (e.g. status-dependent timestamps on ``BriefStub``, lots derived from a ``FrameworkStub``'s slug) are
+always consistent with the chosen values. Generators with the same seed produce the same sequence of stubs.
+
+Example usage:
+
+  from dmtestutils.stub_generators import StubGenerator
+
+  def test_brief_page_renders_for_any_brief():
+      generator = StubGenerator(seed=1234)
+      for _ in range(1000):
+          brief = generator.brief(framework_slug="digital-outcomes-and-specialists-4")
+          ...
+
+Any kwargs given to a generator method override the randomly chosen values.
+"""
+from datetime import datetime, timedelta
+import random
+from typing import Iterator, Optional, Type, Union
+
+from .api_model_stubs import (
+    AuditEventStub,
+    BaseAPIModelStub,
+    BriefResponseStub,
+    BriefStub,
+    FrameworkStub,
+    ServiceStub,
+    SupplierFrameworkStub,
+    SupplierStub,
+)
+from .api_model_stubs.framework_catalogue import FRAMEWORK_CATALOGUE, FRAMEWORKS_BY_SLUG, framework_details
+from .api_model_stubs.lot import cloud_lots, dos_lots
+
+
+G_CLOUD_SLUGS = tuple(framework.slug for framework in FRAMEWORK_CATALOGUE if framework.family == "g-cloud")
+DOS_SLUGS = tuple(
+    framework.slug for framework in FRAMEWORK_CATALOGUE if framework.family == "digital-outcomes-and-specialists"
+)
+
+FRAMEWORK_STATUSES = ("coming", "open", "pending", "standstill", "live", "expired")
+BRIEF_STATUSES = ("draft", "live", "closed", "awarded", "cancelled", "unsuccessful", "withdrawn")
+BRIEF_RESPONSE_STATUSES = ("draft", "submitted", "pending-awarded", "awarded")
+SERVICE_STATUSES = ("published", "enabled", "disabled")
+DECLARATION_STATUSES = ("unstarted", "started", "complete")
+ORGANISATION_SIZES = ("micro", "small", "medium", "large")
+AUDIT_EVENT_TYPES = (
+    ("update_brief_response", "BriefResponse"),
+    ("update_service", "Service"),
+    ("update_supplier", "Supplier"),
+    ("update_brief", "Brief"),
+    ("create_user", "User"),
+)
+
+_g_cloud_lots_by_slug = {slug: FRAMEWORKS_BY_SLUG[slug].lots for slug in G_CLOUD_SLUGS}
+_brief_lots = tuple(lot for lot in dos_lots() if lot["allowsBrief"])
+
+_words = (
+    "agile", "analysis", "api", "assessment", "backend", "cloud", "content", "data", "delivery", "design", "digital",
+    "discovery", "frontend", "hosting", "infrastructure", "migration", "platform", "portal", "research", "security",
+    "service", "software", "specialist", "support", "testing", "transformation", "user", "website",
+)
+_epoch = datetime(2015, 1, 1)
+_timestamp_range_seconds = int((datetime(2021, 1, 1) - _epoch).total_seconds())
+
+
+class StubGenerator:
+    def __init__(self, seed: Optional[Union[int, str]] = None):
+        self.random = random.Random(seed)
+
+    def _id(self) -> int:
+        return self.random.randint(1, 9999999)
+
+    def text(self, min_words: int = 2, max_words: int = 8) -> str:
+        word_count = self.random.randint(min_words, max_words)
+        return " ".join(self.random.choice(_words) for _ in range(word_count)).capitalize()
+
+    def _timestamp(self) -> str:
+        return (
+            _epoch + timedelta(seconds=self.random.randrange(_timestamp_range_seconds))
+        ).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    def _email(self) -> str:
+        return f"{self.random.choice(_words)}.{self._id()}@example.com"
+
+    def framework(self, **kwargs) -> FrameworkStub:
+        generated = {
+            "id": self._id(),
+            "slug": self.random.choice(G_CLOUD_SLUGS + DOS_SLUGS),
+            "status": self.random.choice(FRAMEWORK_STATUSES),
+            "clarification_questions_open": self.random.random() < 0.5,
+        }
+        generated.update(kwargs)
+        return FrameworkStub(**generated)
+
+    def brief(self, **kwargs) -> BriefStub:
+        lot = self.random.choice(_brief_lots)
+        generated = {
+            "id": self._id(),
+            "title": self.text(),
+            "status": self.random.choice(BRIEF_STATUSES),
+            "framework_slug": self.random.choice(DOS_SLUGS),
+            "lot_slug": lot["slug"],
+            "lot_name": lot["name"],
+            "user_id": self._id(),
+        }
+        generated.update(kwargs)
+        if generated["status"] != "draft":
+            generated.setdefault("clarification_questions_closed", self.random.random() < 0.5)
+        return BriefStub(**generated)
+
+    def brief_response(self, **kwargs) -> BriefResponseStub:
+        generated = {
+            "id": self._id(),
+            "brief_id": self._id(),
+            "supplier_id": self._id(),
+            "supplierName": self.text(1, 3),
+            "supplierOrganisationSize": self.random.choice(ORGANISATION_SIZES),
+            "status": self.random.choice(BRIEF_RESPONSE_STATUSES),
+            "framework_slug": self.random.choice(DOS_SLUGS),
+            "essentialRequirementsMet": self.random.random() < 0.8,
+            "respondToEmailAddress": self._email(),
+            "createdAt": self._timestamp(),
+        }
+        generated.update(kwargs)
+        return BriefResponseStub(**generated)
+
+    def service(self, **kwargs) -> ServiceStub:
+        framework_slug = kwargs.get("framework_slug", self.random.choice(G_CLOUD_SLUGS))
+        lot = self.random.choice(_g_cloud_lots_by_slug.get(framework_slug) or cloud_lots())
+        generated = {
+            "service_id": str(self.random.randint(10 ** 14, 10 ** 15 - 1)),
+            "framework_slug": framework_slug,
+            "lot": lot["slug"],
+            "lot_slug": lot["slug"],
+            "lot_name": lot["name"],
+            "service_name": self.text(),
+            "status": self.random.choice(SERVICE_STATUSES),
+            "supplier_id": self._id(),
+            "supplier_name": self.text(1, 3),
+            "created_at": self._timestamp(),
+            "updated_at": self._timestamp(),
+        }
+        generated.update(kwargs)
+        return ServiceStub(**generated)
+
+    def supplier(self, **kwargs) -> SupplierStub:
+        generated = {
+            "id": self._id(),
+            "contact_id": self._id(),
+            "name": self.text(1, 3),
+            "description": self.text(5, 30),
+            "dunsNumber": str(self.random.randint(10 ** 8, 10 ** 9 - 1)),
+            "organisationSize": self.random.choice(ORGANISATION_SIZES),
+            "company_details_confirmed": self.random.random() < 0.8,
+        }
+        if self.random.random() < 0.1:
+            generated["other_company_registration_number"] = str(self.random.randint(1000, 999999))
+        generated.update(kwargs)
+        return SupplierStub(**generated)
+
+    def supplier_framework(self, **kwargs) -> SupplierFrameworkStub:
+        framework_slug = kwargs.get("framework_slug", self.random.choice(G_CLOUD_SLUGS + DOS_SLUGS))
+        family = framework_details(framework_slug).family
+        generated = {
+            "supplier_id": self._id(),
+            "supplierName": self.text(1, 3),
+            "framework_slug": framework_slug,
+            "frameworkFamily": family,
+            "frameworkFramework": family,
+            "on_framework": self.random.random() < 0.5,
+        }
+        # these kwargs are only removed from the stub's response when truthy, so only include them when they are
+        if self.random.random() < 0.7:
+            generated["with_declaration"] = True
+            generated["declaration_status"] = self.random.choice(DECLARATION_STATUSES)
+        if self.random.random() < 0.3:
+            generated["with_agreement"] = True
+        if self.random.random() < 0.2:
+            generated["agreed_variations"] = True
+        generated.update(kwargs)
+        return SupplierFrameworkStub(**generated)
+
+    def audit_event(self, **kwargs) -> AuditEventStub:
+        audit_type, object_type = self.random.choice(AUDIT_EVENT_TYPES)
+        generated = {
+            "id": self._id(),
+            "type": audit_type,
+            "objectType": object_type,
+            "objectId": self._id(),
+            "acknowledged": self.random.random() < 0.5,
+            "user": self._email(),
+            "createdAt": self._timestamp(),
+        }
+        generated.update(kwargs)
+        return AuditEventStub(**generated)
+
+    def stubs(self, stub_class: Type[BaseAPIModelStub], count: Optional[int] = None, **kwargs) -> Iterator:
+        """
+        Yield ``count`` (or, if not given, endlessly many) randomised stubs of ``stub_class``, each constructed with
+        ``kwargs`` overriding the random values.
+        """
+        method = getattr(self, _generator_methods[stub_class])
+        generated = 0
+        while count is None or generated < count:
+            yield method(**kwargs)
+            generated += 1
+
+
+_generator_methods = {
+    AuditEventStub: "audit_event",
+    BriefResponseStub: "brief_response",
+    BriefStub: "brief",
+    FrameworkStub: "framework",
+    ServiceStub: "service",
+    SupplierFrameworkStub: "supplier_framework",
+    SupplierStub: "supplier",
+}
@@ -1,5 +1,8 @@
 # Minimal tests to make sure stub overrides work
+import abc
 from datetime import datetime as dt
+from unittest import mock
+
 import pytest
 from dmtestutils.api_model_stubs import (
     BaseAPIModelStub,
@@ -16,7 +19,8 @@ from dmtestutils.api_model_stubs import (
     SupplierStub,
     SupplierFrameworkStub
 )
-from dmtestutils.api_model_stubs.lot import dos_lots
+from dmtestutils.api_model_stubs.framework_catalogue import FRAMEWORK_CATALOGUE, framework_details
+from dmtestutils.api_model_stubs.lot import as_a_service_lots, cloud_lots, dos_lots
 
 
 class TestBaseAPIModelStub:
@@ -37,6 +41,89 @@ class TestBaseAPIModelStub:
         APIModelStub.default_data["dict"]["a"] = 97
         assert api_model_stub.response()["dict"]["a"] == 1
 
+    def test_evolve_is_equivalent_to_constructing_with_updated_kwargs(self):
+        brief = BriefStub(framework_slug="digital-outcomes-and-specialists-3", user_id=5)
+        for status in ("draft", "live", "withdrawn", "cancelled"):
+            variant = brief.evolve(status=status)
+            assert type(variant) is BriefStub
+            assert variant.response() == BriefStub(
+                framework_slug="digital-outcomes-and-specialists-3", user_id=5, status=status
+            ).response()
+            assert variant.single_result_response() == BriefStub(
+                framework_slug="digital-outcomes-and-specialists-3", user_id=5, status=status
+            ).single_result_response()
+
+        assert brief.response() == BriefStub(framework_slug="digital-outcomes-and-specialists-3", user_id=5).response()
+
+    def test_evolve_shares_unchanged_subtrees(self):
+        framework = FrameworkStub(slug="g-cloud-9")
+        variant = framework.evolve(status="live")
+
+        assert variant.response()["status"] == "live"
+        assert framework.response()["status"] == "open"
+        assert variant.response() is not framework.response()
+        assert variant.response()["lots"] is framework.response()["lots"]
+        assert variant.response()["frameworkAgreementDetails"] is framework.response()["frameworkAgreementDetails"]
+
+    def test_evolve_partially_shares_changed_subtrees(self):
+        brief_response = BriefResponseStub(supplier_id=1)
+        variant = brief_response.evolve(supplier_id=2)
+
+        assert variant.response()["links"]["supplier"] == "http://localhost:5000/supplier/2"
+        assert brief_response.response()["links"]["supplier"] == "http://localhost:5000/supplier/1"
+        assert variant.response()["links"]["brief"] is brief_response.response()["links"]["brief"]
+        assert variant.response()["brief"] is brief_response.response()["brief"]
+
+    def test_evolve_doesnt_modify_the_original_stub_or_kwargs(self):
+        brief = {"id": 1, "framework": {"slug": "digital-outcomes-and-specialists-3"}}
+        brief_response = BriefResponseStub(brief=brief)
+        variant = brief_response.evolve(framework_slug="digital-outcomes-and-specialists-4")
+
+        assert variant.response()["brief"]["framework"]["slug"] == "digital-outcomes-and-specialists-4"
+        assert brief_response.response()["brief"]["framework"]["slug"] == "digital-outcomes-and-specialists-3"
+        assert brief_response.evolve().response()["brief"]["framework"]["slug"] == "digital-outcomes-and-specialists-3"
+
+    @pytest.mark.parametrize("stub, changes", (
+        (AuditEventStub(acknowledged=True), {"include_user": True}),
+        (BriefStub(status="live", framework_slug="digital-outcomes-and-specialists-3"), {"lot_name": "Specialists"}),
+        (BriefResponseStub(brief_id=1, status="awarded"), {"supplierName": "My Other Company"}),
+        (ArchivedServiceStub(service_id="123"), {"service_name": "Another service", "lot": "cloud-hosting"}),
+        (DraftServiceStub(id=5, framework_slug="g-cloud-9"), {"supplierName": "Kev's Other Pies"}),
+        (ServiceStub(service_id="123"), {"status": "published"}),
+        (SupplierFrameworkStub(with_agreement=True), {"on_framework": True}),
+    ))
+    def test_evolve_applies_underived_changes_without_rebuilding_the_stub(self, stub, changes):
+        expected = type(stub)(**{**stub._stub_kwargs, **changes}).response()
+
+        with mock.patch.object(type(stub), "__init__", side_effect=AssertionError("rebuilt")):
+            variant = stub.evolve(**changes)
+
+        assert variant.response() == expected
+        for key, value in stub.response().items():
+            if isinstance(value, (dict, list)):
+                assert variant.response()[key] is value
+
+    @pytest.mark.parametrize("stub, changes", (
+        (BriefStub(status="live"), {"status": "withdrawn"}),
+        (BriefStub(lot_name="Specialists"), {"lot_name": None}),
+        (BriefResponseStub(supplier_id=1), {"supplierId": 2}),
+        (ServiceStub(service_id="123"), {"serviceId": "456"}),
+        (SupplierStub(), {"companyName": "Another Company"}),
+        (BriefStub(), {"scale": 1}),
+    ))
+    def test_evolve_rebuilds_the_stub_when_changes_affect_derived_keys(self, stub, changes):
+        variant = stub.evolve(**changes)
+
+        assert variant.response() == type(stub)(**{**stub._stub_kwargs, **changes}).response()
+
+    def test_evolve_chains(self):
+        service = ServiceStub(service_id="123", framework_slug="g-cloud-9")
+        variant = service.evolve(framework_slug="g-cloud-11").evolve(lot="cloud-hosting")
+
+        assert variant.response()["frameworkName"] == "G-Cloud 11"
+        assert variant.response()["lot"] == "cloud-hosting"
+        assert variant.response()["id"] == "123"
+
 
 class TestArchivedServiceStub:
 
@@ -216,6 +303,14 @@ class TestBriefStub:
 
 class TestBriefResponseStub:
 
+    def test_doesnt_modify_or_deep_copy_the_given_brief(self):
+        brief = BriefStub(framework_slug="digital-outcomes-and-specialists-3", scale=10).response()
+        brief_response = BriefResponseStub(brief=brief, framework_slug="digital-outcomes-and-specialists-4")
+
+        assert brief_response.response()["brief"]["framework"]["slug"] == "digital-outcomes-and-specialists-4"
+        assert brief["framework"]["slug"] == "digital-outcomes-and-specialists-3"
+        assert brief_response.response()["brief"]["clarificationQuestions"] is brief["clarificationQuestions"]
+
     def test_brief_response_stub_default_values(self):
         assert BriefResponseStub().response() == {
             "availability": "25/01/2017",
@@ -416,6 +511,26 @@ class TestFrameworkStub:
         assert framework["framework"] == family
         assert framework["family"] == family
 
+    @pytest.mark.parametrize(
+        ("slug", "name", "lots", "has_direct_award"), (
+            ("g-cloud-4", "G-Cloud 4", as_a_service_lots(), True),
+            ("g-cloud-13", "G-Cloud 13", cloud_lots(), True),
+            ("g-cloud-14", "G-Cloud 14", cloud_lots(), True),
+            ("digital-outcomes-and-specialists-6", "Digital Outcomes and Specialists 6", dos_lots(), False),
+            ("g-cloud-next", "G Cloud Next", [], True),
+        )
+    )
+    def test_slug_kwarg_changes_name_lots_and_flags(self, slug, name, lots, has_direct_award):
+        framework = FrameworkStub(slug=slug).response()
+
+        assert framework["name"] == name
+        assert framework["lots"] == lots
+        assert framework["hasDirectAward"] is has_direct_award
+
+    def test_lots_are_not_shared_between_stubs(self):
+        FrameworkStub().response()["lots"][0]["name"] = "Changed"
+        assert FrameworkStub().response()["lots"] == cloud_lots()
+
     def test_dos_slug_kwarg_changes_all_related_framework_details(self):
         expected = FrameworkStub().response()
         expected.update({
@@ -707,6 +822,20 @@ class TestSupplierFrameworkStub:
             "supplierName": "Kev's Pies"
         }
 
+    @pytest.mark.parametrize(
+        ("kwargs", "family"), (
+            ({"framework_slug": "digital-outcomes-and-specialists-5"}, "digital-outcomes-and-specialists"),
+            ({"frameworkSlug": "g-cloud-12"}, "g-cloud"),
+            ({"framework_slug": "my-amazing-framework"}, "my-amazing-framework"),
+            ({"framework_slug": "my-amazing-framework", "frameworkFamily": "amazing"}, "amazing"),
+        )
+    )
+    def test_framework_family_derived_from_slug(self, kwargs, family):
+        response = SupplierFrameworkStub(**kwargs).response()
+        assert response["frameworkFamily"] == family
+        if "frameworkFamily" not in kwargs:
+            assert response["frameworkFramework"] == family
+
     def test_supplier_framework_stub_with_options(self):
         sf = SupplierFrameworkStub(
             agreed_variations=True,
@@ -767,3 +896,129 @@ class TestSupplierFrameworkStub:
             "supplierId": 1234,
             "supplierName": "Kev's Pies"
         }
+
+
+class TestFrameworkCatalogue:
+
+    def test_catalogue_covers_g_cloud_and_dos_frameworks(self):
+        assert [(framework.family, framework.iteration) for framework in FRAMEWORK_CATALOGUE] == [
+            *(("g-cloud", i) for i in range(4, 14)),
+            *(("digital-outcomes-and-specialists", i) for i in range(1, 7)),
+        ]
+
+    def test_catalogue_frameworks_are_looked_up_by_slug(self):
+        for framework in FRAMEWORK_CATALOGUE:
+            assert framework_details(framework.slug) is framework
+
+    @pytest.mark.parametrize(
+        ("slug", "family", "iteration", "name"), (
+            ("g-cloud-14", "g-cloud", 14, "G-Cloud 14"),
+            ("g-cloud", "g-cloud", None, "G-Cloud"),
+            ("digital-outcomes-and-specialists-7", "digital-outcomes-and-specialists", 7,
+                "Digital Outcomes and Specialists 7"),
+            ("my-amazing-framework-2", "my-amazing-framework", 2, "My Amazing Framework 2"),
+            ("Not_A_Slug", "Not_A_Slug", None, "Not_A_Slug"),
+        )
+    )
+    def test_details_of_other_slugs_are_derived_from_the_slug(self, slug, family, iteration, name):
+        framework = framework_details(slug)
+        assert (framework.slug, framework.family, framework.iteration, framework.name) == (
+            slug, family, iteration, name,
+        )
+        assert framework_details(slug) is framework
+
+
+class TestScaledStubs:
+
+    @pytest.mark.parametrize(
+        ("cls", "list_keys", "text_keys"), (
+            (BriefStub, ("essentialRequirements", "niceToHaveRequirements", "clarificationQuestions"), ()),
+            (BriefResponseStub, ("essentialRequirements", "niceToHaveRequirements"), ()),
+            (SupplierStub, ("contactInformation",), ("description",)),
+            (ServiceStub, ("serviceFeatures", "serviceBenefits"), ("serviceDescription",)),
+            (DraftServiceStub, ("serviceFeatures", "serviceBenefits"), ("serviceDescription",)),
+        )
+    )
+    def test_scale_fills_list_and_text_fields(self, cls, list_keys, text_keys):
+        response = cls(scale=7).response()
+        for key in list_keys:
+            assert len(response[key]) == 7
+        for key in text_keys:
+            assert response[key].count(".") == 7
+        assert "scale" not in response and "seed" not in response
+
+    def test_scaled_stubs_are_deterministic(self):
+        assert BriefStub(scale=5).response() == BriefStub(scale=5).response()
+        assert BriefStub(scale=5).response() != BriefStub(scale=5, seed=1).response()
+        assert ServiceStub(scale=5, seed="a").evolve(status="published").response()["serviceDescription"] == \
+            ServiceStub(scale=5, seed="a").response()["serviceDescription"]
+
+    def test_scaled_brief_response_has_evidence_for_each_requirement(self):
+        brief = {"id": 1, "framework": {"slug": "digital-outcomes-and-specialists-4"}}
+        response = BriefResponseStub(brief=brief, scale=3).response()
+        assert len(response["brief"]["essentialRequirements"]) == len(response["essentialRequirements"]) == 3
+        assert [requirement["yesNo"] for requirement in response["niceToHaveRequirements"]] == [True, False, True]
+        # the brief given isn't modified
+        assert "essentialRequirements" not in brief
+
+    def test_scaled_supplier_contacts(self):
+        contacts = SupplierStub(id=1, contact_id=10, scale=3).response()["contactInformation"]
+        assert [contact["id"] for contact in contacts] == [10, 11, 12]
+        assert contacts[2]["links"]["self"] == "http://localhost:5000/suppliers/1/contact-information/12"
+
+    @pytest.mark.parametrize("contact_information", ([], None))
+    def test_scaled_supplier_without_contacts(self, contact_information):
+        contacts = SupplierStub(id=1, contactInformation=contact_information, scale=2).response()["contactInformation"]
+        assert [contact["id"] for contact in contacts] == [4321, 4322]
+        assert contacts[0]["email"] == "mre@company.com"
+        assert contacts[1]["links"]["self"] == "http://localhost:5000/suppliers/1/contact-information/4322"
+
+    def test_scale_is_applied_once_after_construction(self):
+        class CountingServiceStub(ServiceStub):
+            scale_count = 0
+
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.response_data["serviceFeatures"] = []
+
+            def _scale_response_data(self, scale, text):
+                CountingServiceStub.scale_count += 1
+                super()._scale_response_data(scale, text)
+
+        assert len(CountingServiceStub(scale=4).response()["serviceFeatures"]) == 4
+        assert CountingServiceStub.scale_count == 1
+        assert CountingServiceStub().response()["serviceFeatures"] == []
+        assert CountingServiceStub.scale_count == 1
+
+    def test_stubs_can_be_mixed_with_classes_with_their_own_metaclass(self):
+        class Describable(abc.ABC):
+            @abc.abstractmethod
+            def describe(self):
+                pass
+
+        class DescribableServiceStub(ServiceStub, Describable):
+            def describe(self):
+                return self.response()["serviceName"]
+
+        stub = DescribableServiceStub(service_name="A service", scale=3)
+        assert stub.describe() == "A service"
+        assert len(stub.response()["serviceFeatures"]) == 3
+
+    def test_scale_is_applied_after_a_mixins_init(self):
+        class NoFeaturesMixin:
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.response_data["serviceFeatures"] = []
+
+        class NoFeaturesServiceStub(NoFeaturesMixin, ServiceStub):
+            pass
+
+        assert len(NoFeaturesServiceStub(scale=4).response()["serviceFeatures"]) == 4
+        assert NoFeaturesServiceStub().response()["serviceFeatures"] == []
+        # the mixin's rules aren't declared, so variants are rebuilt
+        assert NoFeaturesServiceStub().evolve(serviceFeatures=["a"]).response()["serviceFeatures"] == []
+
+    def test_stubs_without_scaled_fields_reject_scale(self):
+        with pytest.raises(TypeError, match="FrameworkStub doesn't support scale"):
+            FrameworkStub(scale=10)
+        assert not FrameworkStub.scalable and ServiceStub.scalable
@@ -0,0 +1,191 @@
+from datetime import datetime
+from unittest import mock
+
+import pytest
+
+from dmtestutils.api_model_stubs import FrameworkStub, ServiceStub
+from dmtestutils.cassettes import CassettePlayer, CassetteRecorder, call_signature_digest
+from dmtestutils.fake_api_clients import FakeDataAPIClient
+
+
+class TestCallSignatureDigest:
+    def test_digest_depends_on_method_and_arguments(self):
+        digests = {
+            call_signature_digest("get_service", ("1",), {}),
+            call_signature_digest("get_service", ("2",), {}),
+            call_signature_digest("get_brief", ("1",), {}),
+            call_signature_digest("get_service", (), {"service_id": "1"}),
+        }
+        assert len(digests) == 4
+
+    def test_digest_ignores_kwarg_order(self):
+        assert (
+            call_signature_digest("find_services", (), {"supplier_id": 1, "framework": "g-cloud-10"})
+            == call_signature_digest("find_services", (), {"framework": "g-cloud-10", "supplier_id": 1})
+        )
+
+    def test_digest_of_non_json_arguments_is_stable(self):
+        assert call_signature_digest("f", ({3, 1, 2}, datetime(2020, 1, 1)), {}) == call_signature_digest(
+            "f", ({2, 3, 1}, datetime(2020, 1, 1)), {}
+        )
+
+    def test_arguments_with_unstable_reprs_are_rejected(self):
+        with pytest.raises(TypeError, match=r"repr differs between runs"):
+            call_signature_digest("f", (object(),), {})
+
+
+class RecordedError(Exception):
+    pass
+
+
+class APIError(Exception):
+    """Built from a response, like dmapiclient's errors"""
+    def __init__(self, response, message=None):
+        self.response = response
+        self.message = message or response.json()["error"]
+
+    @property
+    def status_code(self):
+        return self.response.status_code
+
+
+class FlakyClient:
+    def get_thing(self, thing_id):
+        raise RecordedError(f"no thing {thing_id}", 404)
+
+    def get_other_thing(self, thing_id):
+        response = mock.Mock(status_code=410)
+        response.json.return_value = {"error": "gone"}
+        raise APIError(response)
+
+
+class TestCassettes:
+    def setup_method(self, method):
+        self.client = FakeDataAPIClient(page_size=2)
+        self.client.add_frameworks(FrameworkStub(slug="g-cloud-10").response())
+        self.client.add_services(*(
+            ServiceStub(service_id=str(i), framework_slug="g-cloud-10", supplier_id=i % 2).response()
+            for i in range(5)
+        ))
+
+    def record(self, path):
+        with CassetteRecorder(self.client, path) as recorder:
+            assert recorder.get_service("1") == self.client.get_service("1")
+            recorder.get_framework("g-cloud-10")
+            recorder.find_services(supplier_id=1)
+            recorder.find_services(supplier_id=1, page=2)
+            assert len(list(recorder.find_services_iter(framework="g-cloud-10"))) == 5
+
+    def test_replays_recorded_responses(self, tmp_path):
+        path = str(tmp_path / "test.dmcassette")
+        self.record(path)
+
+        with CassettePlayer(path) as player:
+            assert len(player) == 5
+            assert player.get_service("1") == self.client.get_service("1")
+            assert player.get_framework("g-cloud-10") == self.client.get_framework("g-cloud-10")
+            assert player.find_services(supplier_id=1, page=2) == self.client.find_services(supplier_id=1, page=2)
+            assert player.find_services(supplier_id=1) == self.client.find_services(supplier_id=1)
+            assert list(player.find_services_iter(framework="g-cloud-10")) == list(
+                self.client.find_services_iter(framework="g-cloud-10")
+            )
+
+    def test_replayed_responses_are_independent_copies(self, tmp_path):
+        path = str(tmp_path / "test.dmcassette")
+        self.record(path)
+
+        with CassettePlayer(path) as player:
+            player.get_service("1")["services"]["id"] = "mutated"
+            assert player.get_service("1")["services"]["id"] == "1"
+
+    def test_unrecorded_call_raises(self, tmp_path):
+        path = str(tmp_path / "test.dmcassette")
+        self.record(path)
+
+        with CassettePlayer(path) as player:
+            with pytest.raises(AssertionError, match=r"No recorded response for get_service"):
+                player.get_service("2")
+
+    def test_repeated_calls_replay_in_order(self, tmp_path):
+        path = str(tmp_path / "test.dmcassette")
+        with CassetteRecorder(self.client, path) as recorder:
+            recorder.get_service("1")
+            self.client.services.get("1")["status"] = "disabled"
+            recorder.get_service("1")
+
+        with CassettePlayer(path) as player:
+            assert player.get_service("1")["services"]["status"] == "not-submitted"
+            assert player.get_service("1")["services"]["status"] == "disabled"
+            # the last recording is repeated once they run out
+            assert player.get_service("1")["services"]["status"] == "disabled"
+
+    def test_not_a_cassette(self, tmp_path):
+        path = tmp_path / "test.json"
+        path.write_bytes(b"{" + b" " * 40 + b"}")
+        with pytest.raises(ValueError):
+            CassettePlayer(str(path))
+
+    def test_not_a_cassette_closes_the_file(self, tmp_path, monkeypatch):
+        import mmap
+
+        mapped = []
+        real_mmap = mmap.mmap
+
+        def recording_mmap(*args, **kwargs):
+            mapped.append(real_mmap(*args, **kwargs))
+            return mapped[-1]
+        monkeypatch.setattr(mmap, "mmap", recording_mmap)
+        path = tmp_path / "test.json"
+        path.write_bytes(b"{" + b" " * 40 + b"}")
+        with pytest.raises(ValueError):
+            CassettePlayer(str(path))
+        assert mapped[0].closed
+
+    def test_exceptions_are_recorded_and_reraised(self, tmp_path):
+        path = str(tmp_path / "test.dmcassette")
+        with CassetteRecorder(FlakyClient(), path) as recorder:
+            with pytest.raises(RecordedError):
+                recorder.get_thing(1)
+            with pytest.raises(APIError):
+                recorder.get_other_thing(1)
+
+        with CassettePlayer(path) as player:
+            with pytest.raises(RecordedError) as exc_info:
+                player.get_thing(1)
+            assert exc_info.value.args == ("no thing 1", 404)
+
+            with pytest.raises(APIError) as exc_info:
+                player.get_other_thing(1)
+            assert (exc_info.value.status_code, exc_info.value.message) == (410, "gone")
+
+    @pytest.mark.parametrize("recorded_type", ("os:system", "builtins:print", "dmtestutils.cassettes:mock.Mock"))
+    def test_only_exception_types_are_raised_from_cassettes(self, tmp_path, recorded_type):
+        path = str(tmp_path / "test.dmcassette")
+        with CassetteRecorder(FlakyClient(), path) as recorder:
+            with pytest.raises(RecordedError):
+                with mock.patch(
+                    "dmtestutils.cassettes._describe_exception",
+                    return_value={"type": recorded_type, "args": ["echo PWNED"]},
+                ):
+                    recorder.get_thing(1)
+
+        with CassettePlayer(path) as player:
+            with mock.patch("os.system") as system, mock.patch("builtins.print") as print_:
+                with pytest.raises(AssertionError, match="doesn't record an exception type"):
+                    player.get_thing(1)
+        assert not system.called
+        assert not print_.called
+
+    def test_http_errors_are_recorded_and_reraised(self, tmp_path):
+        pytest.importorskip("dmapiclient")
+        from dmapiclient import HTTPError
+
+        path = str(tmp_path / "test.dmcassette")
+        with CassetteRecorder(self.client, path) as recorder:
+            with pytest.raises(HTTPError):
+                recorder.get_service("missing")
+
+        with CassettePlayer(path) as player:
+            with pytest.raises(HTTPError) as exc_info:
+                player.get_service("missing")
+        assert exc_info.value.status_code == 404
@@ -1,6 +1,33 @@
 import re
 
-from dmtestutils.comparisons import RestrictedAny, AnySupersetOf, AnyStringMatching, ExactIdentity
+from datetime import datetime, timedelta, timezone
+import json
+import random
+import time
+from unittest import mock
+
+import pytest
+
+from dmtestutils.comparisons import (
+    AllOf,
+    AnyDatetimeBetween,
+    AnyDatetimeNear,
+    AnyIn,
+    AnyInstanceOf,
+    AnyJSONBytesSupersetOf,
+    AnyListContaining,
+    AnyOf,
+    AnyPermutationOf,
+    AnyStringMatching,
+    AnySupersetOf,
+    ExactIdentity,
+    Not,
+    RestrictedAny,
+    parse_datestamp,
+)
+
+
+matchers_test_object = object()
 
 
 class TestRestrictedAny:
@@ -10,11 +37,36 @@ class TestRestrictedAny:
         assert (4, 9, 6,) == (4, any_odd, 6,)
         assert not (4, 9, 6,) == (4, any_odd, any_odd,)
 
+    def test_hashable(self):
+        def condition(x):
+            return x % 2
+
+        assert hash(RestrictedAny(condition)) == hash(RestrictedAny(condition))
+        assert len({RestrictedAny(condition), RestrictedAny(condition), RestrictedAny(lambda x: x % 2)}) == 2
+
+    def test_matchers_compare_by_what_they_match(self):
+        assert AnyStringMatching(r"abc") == AnyStringMatching(r"abc")
+        assert AnyStringMatching(r"abc") != AnyStringMatching(r"abc", flags=re.I)
+        assert AnySupersetOf({"a": [1, {"b": 2}]}) == AnySupersetOf({"a": [1, {"b": 2}]})
+        assert AnySupersetOf({"a": [1]}) != AnySupersetOf({"a": (1,)})
+        assert AnyInstanceOf(int, str) == AnyInstanceOf(str, int)
+        assert AnyIn([1, 2]) != AnyInstanceOf(int)
+
+        matchers = [AnySupersetOf({"a": [1, {"b": 2}]}), AnyIn([{"a": 1}]), ExactIdentity(matchers_test_object)]
+        assert {m: i for i, m in enumerate(matchers * 2)} == {m: i + len(matchers) for i, m in enumerate(matchers)}
+
 
 class TestAnySupersetOf:
     def test_superset(self):
         assert [{"a": 123, "b": 456, "less": "predictabananas"}, 789] == [AnySupersetOf({"a": 123, "b": 456}), 789]
 
+    def test_non_mappings(self):
+        assert 5 != AnySupersetOf({"a": 1})
+        assert None != AnySupersetOf({"a": 1})  # noqa: E711
+        assert [("a", 1)] != AnySupersetOf({"a": 1})
+        assert [5, {"a": 1}] != [AnyOf("x", AnySupersetOf({"a": 1}))] * 2
+        assert ["x", {"a": 1}] == [AnyOf("x", AnySupersetOf({"a": 1}))] * 2
+
 
 class TestStringMatching:
     def test_string_matching(self):
@@ -68,3 +120,296 @@ class TestExactIdentity:
         x = []
         assert (7, ExactIdentity(x),) == (7, x,)
         assert not (7, ExactIdentity(x),) == (7, [],)
+
+
+class TestAnyInstanceOf:
+    def test_any_instance_of(self):
+        assert {"a": 123, "b": "c", "c": b"d"} == {
+            "a": AnyInstanceOf(int), "b": AnyInstanceOf(str, bytes), "c": AnyInstanceOf(str, bytes),
+        }
+        assert 123 != AnyInstanceOf(str)
+
+
+class TestAnyIn:
+    def test_any_in(self):
+        assert ("draft", 2) == (AnyIn({"draft", "live"}), AnyIn(range(5)))
+        assert "closed" != AnyIn({"draft", "live"})
+
+    def test_unhashable(self):
+        assert {"a": 1} == AnyIn([{"a": 1}, {"b": 2}])
+        assert {"a": 1} != AnyIn({"a", "b"})
+
+    def test_iterators(self):
+        assert 5 == AnyIn(x for x in [5, 6])
+        assert 5 == AnyIn(x for x in [5, [1]])
+        assert [1] == AnyIn(iter([5, [1]]))
+
+
+class TestCombinators:
+    def test_all_of(self):
+        matcher = AllOf(AnyInstanceOf(str), AnyStringMatching(r"a+b"), Not(AnyIn({"ab", "aab"})))
+        assert "aaab" == matcher
+        assert "ab" != matcher
+        assert b"aaab" != matcher
+
+    def test_any_of(self):
+        matcher = AnyOf("live", AnyStringMatching(r"clos"), AnyInstanceOf(int))
+        assert ["live", "closed", 3] == [matcher] * 3
+        assert "draft" != matcher
+
+    def test_not(self):
+        assert {"a": "b"} == {"a": Not(AnyInstanceOf(int))}
+        assert {"a": 1} != {"a": Not(AnyInstanceOf(int))}
+        assert "x" == Not("y")
+
+    def test_operators(self):
+        is_str, short = AnyInstanceOf(str), RestrictedAny(lambda s: len(s) < 5)
+        assert is_str & short == AllOf(is_str, short)
+        assert is_str | short == AnyOf(is_str, short)
+        assert "x" | is_str == AnyOf("x", is_str)
+        assert ~is_str == Not(is_str)
+        assert ~~is_str is is_str
+        assert "abc" == is_str & short
+        assert "abcdef" != is_str & short
+        assert 5 == ~is_str
+
+    def test_flattened_and_deduplicated(self):
+        a, b, c = AnyInstanceOf(str), AnyStringMatching(r"x"), AnyIn({"y"})
+        assert ((a & b) & (c & a))._matchers == (a, c, b)
+        assert (a | (b | c) | AnyInstanceOf(str))._matchers == (a, c, b)
+        # different combinations aren't flattened into each other
+        assert ((a | b) & c)._matchers == (c, a | b)
+
+    def test_cheap_matchers_evaluated_first(self):
+        expensive = mock.Mock(side_effect=lambda x: True)
+        matcher = RestrictedAny(expensive) & AnySupersetOf({"a": 1}) & AnyInstanceOf(str) & ExactIdentity(None)
+        assert [type(m) for m in matcher._matchers] == [ExactIdentity, AnyInstanceOf, RestrictedAny, AnySupersetOf]
+
+        assert "abc" != matcher
+        assert expensive.called is False
+
+        any_matcher = AnySupersetOf({"a": 1}) | RestrictedAny(expensive) | AnyInstanceOf(dict)
+        assert {"a": 1} == any_matcher
+        assert expensive.called is False
+
+    @pytest.mark.parametrize("matcher", (
+        AnyInstanceOf(str) & AnyStringMatching(r"x"),
+        AnyInstanceOf(str) | AnyIn({1, 2}),
+        ~AnyIn([1, 2]),
+    ))
+    def test_combinations_hashable(self, matcher):
+        assert hash(matcher) == hash(matcher)
+        assert len({matcher, matcher}) == 1
+
+
+class TestAnyListContaining:
+    def test_any_list_containing(self):
+        assert ["a", {"id": 2, "b": "c"}, 3, "a"] == AnyListContaining(["a", AnySupersetOf({"id": 2}), "a"])
+        assert ("a", {"id": 2}) == AnyListContaining([{"id": 2}])
+        assert ["a", {"id": 2}, 3] != AnyListContaining(["a", "a"])
+        assert ["a", 3] != AnyListContaining(["a", AnyInstanceOf(str)])
+        assert "abc" != AnyListContaining(["a"])
+        assert {"a": 1} != AnyListContaining(["a"])
+
+    def test_unhashable_and_nested_items(self):
+        assert [[1, {"a": [2]}], {3}] == AnyListContaining([{3}, [1, {"a": [2]}]])
+        assert [[1, {"a": 2}]] == AnyListContaining([[1, {"a": AnyInstanceOf(int)}]])
+        assert [[1, {"a": 2}]] != AnyListContaining([[1, {"a": AnyInstanceOf(str)}]])
+        assert [[1]] != AnyListContaining([(1,)])
+        assert [{3}] == AnyListContaining([frozenset({3})])
+
+    def test_needs_augmenting_paths(self):
+        # a greedy assignment would pair AnyInstanceOf(str) with "b" and leave nothing for AnyIn
+        matcher = AnyListContaining([AnyInstanceOf(str), AnyIn({"b"})])
+        assert ["b", "c"] == matcher
+        assert ["b", 1] != matcher
+
+    def test_equal_values_taken_by_a_matcher(self):
+        # True is equal to (and hashes the same as) 1, so could be counted against the 1 leaving nothing for the matcher
+        assert [True, 1] == AnyListContaining([1, AnyInstanceOf(bool)])
+        assert [1, True] == AnyListContaining([1, AnyInstanceOf(bool)])
+        assert [True, True] == AnyListContaining([1, AnyInstanceOf(bool)])
+        assert [1, 1] != AnyListContaining([1, AnyInstanceOf(bool)])
+
+    @pytest.mark.parametrize("matcher", (
+        AnySupersetOf({"a": 1}),
+        AnySupersetOf({"a": AnyInstanceOf(int)}),
+    ))
+    def test_superset_matchers_against_non_dicts(self, matcher):
+        assert ["a", 5, {"a": 1}] == AnyListContaining([matcher])
+        assert ["a", 5] != AnyListContaining([matcher])
+        assert ["a", 5, None] != AnyListContaining(["a", matcher])
+
+    def test_superset_matchers_nested_in_other_matchers_against_non_dicts(self):
+        matcher = AnyOf("x", AnySupersetOf({"a": 1}))
+        assert [5, {"a": 1}] == AnyListContaining([matcher])
+        assert [5, "x"] == AnyListContaining([matcher])
+        assert [5, 6] != AnyListContaining([matcher])
+
+    def test_falling_back_to_full_matching_keeps_the_pairs_already_found(self):
+        probes = []
+        string_matcher = RestrictedAny(lambda other: probes.append(other) or isinstance(other, str))
+        # the multiset pairs the 1 with True, leaving AnyInstanceOf(bool) unpaired until the full matching re-pairs it
+        assert [True, 1, "s"] == AnyListContaining([1, string_matcher, AnyInstanceOf(bool)])
+        assert sorted(map(repr, probes)) == sorted(set(map(repr, probes)))
+
+    def test_indexed_superset_matchers(self):
+        items = [{"a": 1, "b": 2}, {"a": 1, "b": {3}}, {"b": 2, "a": 2}, {"a": 1}, "x"]
+        assert items == AnyListContaining([
+            AnySupersetOf({"a": 1, "b": 2}), AnySupersetOf({"b": 2, "a": 2}), AnySupersetOf({"b": frozenset({3})}),
+        ])
+        assert items != AnyListContaining([AnySupersetOf({"a": 1, "b": 2}), AnySupersetOf({"b": 2, "a": 1})])
+
+    def test_hashable(self):
+        assert AnyListContaining([1, AnyInstanceOf(str), 1]) == AnyListContaining([AnyInstanceOf(str), 1, 1])
+        assert AnyListContaining([1, 1]) != AnyListContaining([1])
+        assert len({AnyListContaining([1, 2]), AnyListContaining([2, 1]), AnyPermutationOf([1, 2])}) == 2
+
+
+class TestAnyPermutationOf:
+    def test_any_permutation_of(self):
+        assert [3, "b", {"id": 1, "a": 2}] == AnyPermutationOf([AnySupersetOf({"id": 1}), 3, "b"])
+        assert [3, "b", "b"] != AnyPermutationOf([AnyInstanceOf(str), 3])
+        assert [3, "b", "b"] != AnyPermutationOf(["b", 3])
+        assert [3, "b"] != AnyPermutationOf(["b", 3, 3])
+        assert [] == AnyPermutationOf([])
+        assert [True, 1] == AnyPermutationOf([1, AnyInstanceOf(bool)])
+        assert (3, "b") == AnyPermutationOf(iter(["b", 3]))
+
+    def test_repr(self):
+        assert repr(AnyPermutationOf(["b", 3])) == "AnyPermutationOf(['b', 3])"
+        assert repr(AnyListContaining(("b", 3))) == "AnyListContaining(['b', 3])"
+
+    def test_large_lists(self):
+        rng = random.Random(1)
+        services = [{"id": i, "serviceName": f"Service {i}", "lot": rng.choice(("a", "b"))} for i in range(10000)]
+        shuffled = rng.sample(services, len(services))
+
+        start = time.perf_counter()
+        assert shuffled == AnyPermutationOf(services)
+        assert shuffled[1:] != AnyPermutationOf(services)
+        assert shuffled == AnyListContaining(AnySupersetOf({"id": i}) for i in range(0, 10000, 2))
+        assert time.perf_counter() - start < 5
+
+
+class TestParseDatestamp:
+    @pytest.mark.parametrize("datestamp", (
+        "2020-06-01T12:34:56.789012Z",
+        "2020-06-01T12:34:56.7Z",
+        "1999-12-31T23:59:59.000000Z",
+    ))
+    def test_same_as_strptime(self, datestamp):
+        assert parse_datestamp(datestamp) == datetime.strptime(datestamp, "%Y-%m-%dT%H:%M:%S.%fZ")
+
+    @pytest.mark.parametrize("value", (
+        "2020-06-01T12:34:56Z",
+        "2020-06-01 12:34:56.000000Z",
+        "2020-13-01T12:34:56.000000Z",
+        "2020-06-01T12:34:56.000000",
+        "2020-06-01T12:34:56.1234567Z",
+        "２020-06-01T12:34:56.000000Z",
+    ))
+    def test_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_datestamp(value)
+
+
+class TestAnyDatetimeBetween:
+    def test_any_datetime_between(self):
+        matcher = AnyDatetimeBetween(datetime(2020, 1, 1), "2020-12-31T00:00:00.000000Z")
+        assert "2020-06-01T12:00:00.000000Z" == matcher
+        assert datetime(2020, 6, 1) == matcher
+        assert datetime(2020, 1, 1) == matcher
+        assert "2021-06-01T12:00:00.000000Z" != matcher
+        assert "2020-06-01" != matcher
+        assert 1234 != matcher
+        assert None != matcher  # noqa: E711
+
+    def test_open_ended(self):
+        assert datetime(3000, 1, 1) == AnyDatetimeBetween(datetime(2020, 1, 1), None)
+        assert datetime(1000, 1, 1) == AnyDatetimeBetween(None, datetime(2020, 1, 1))
+
+    def test_aware_datetimes_are_converted_to_utc(self):
+        plus_one = timezone(timedelta(hours=1))
+        assert datetime(2020, 6, 1, 12, 30, tzinfo=plus_one) == AnyDatetimeBetween(
+            "2020-06-01T11:00:00.000000Z", "2020-06-01T11:59:59.000000Z",
+        )
+
+
+class TestAnyDatetimeNear:
+    def test_near_now(self):
+        now = datetime.utcnow()
+        assert now.strftime("%Y-%m-%dT%H:%M:%S.%fZ") == AnyDatetimeNear(tolerance=5)
+        assert now - timedelta(seconds=10) != AnyDatetimeNear(tolerance=5)
+        assert now - timedelta(seconds=10) == AnyDatetimeNear()
+
+    def test_near_reference(self):
+        matcher = AnyDatetimeNear("2020-06-01T12:00:00.000000Z", timedelta(hours=1))
+        assert ["2020-06-01T12:59:00.000000Z", datetime(2020, 6, 1, 11, 30)] == [matcher, matcher]
+        assert "2020-06-01T13:01:00.000000Z" != matcher
+
+    def test_hashable(self):
+        assert AnyDatetimeNear(datetime(2020, 1, 1), 60) == AnyDatetimeNear("2020-01-01T00:00:00.000000Z")
+        assert len({AnyDatetimeNear(), AnyDatetimeNear(), AnyDatetimeBetween(None, None)}) == 2
+
+
+class TestAnyJSONBytesSupersetOf:
+    document = json.dumps({
+        "services": {
+            "id": "123",
+            "serviceName": 'A "quoted" name with {braces}, [brackets] and a \\ backslash',
+            "lots": [{"slug": "cloud-hosting"}, {"slug": "cloud-support"}],
+            "price": 1.5,
+            "enabled": True,
+            "nothing": None,
+        },
+        "links": {"self": "http://localhost/services/123"},
+        "meta": {"total": 1},
+    }, indent=2).encode("utf-8")
+
+    @pytest.mark.parametrize("subset", (
+        {},
+        {"meta": {"total": 1}},
+        {"links": AnySupersetOf({"self": AnyStringMatching(r"http://")})},
+        {"services": AnySupersetOf({"id": "123", "enabled": True, "nothing": None})},
+        {"services": AnySupersetOf({"price": 1.5, "lots": AnyListContaining([{"slug": "cloud-support"}])})},
+        {"services": AnySupersetOf({"lots": [{"slug": "cloud-hosting"}, {"slug": "cloud-support"}]}),
+         "meta": AnySupersetOf({"total": 1})},
+        {"services": AnySupersetOf({"serviceName": AnyStringMatching(r'A "quoted" name with \{braces\}, .* \\ ')})},
+    ))
+    def test_matches_same_as_decoding(self, subset):
+        assert json.loads(self.document) == AnySupersetOf(subset)
+        assert self.document == AnyJSONBytesSupersetOf(subset)
+        assert self.document.decode("utf-8") == AnyJSONBytesSupersetOf(subset)
+
+    @pytest.mark.parametrize("subset", (
+        {"missing": 1},
+        {"meta": {}},
+        {"services": AnySupersetOf({"id": 123})},
+        {"services": AnySupersetOf({"missing": None})},
+        {"services": {"id": "123"}},
+        {"meta": {"total": 1}, "links": AnySupersetOf({"self": "http://localhost/services/124"})},
+    ))
+    def test_doesnt_match_same_as_decoding(self, subset):
+        assert json.loads(self.document) != AnySupersetOf(subset)
+        assert self.document != AnyJSONBytesSupersetOf(subset)
+
+    def test_escaped_keys(self):
+        assert b'{"a\\u0062": 1, "\\"": 2}' == AnyJSONBytesSupersetOf({"ab": 1, '"': 2})
+
+    @pytest.mark.parametrize("other", (b"[]", b"", b"not json", b'{"a": ', 123, {"a": 1}))
+    def test_not_json_objects(self, other):
+        assert other != AnyJSONBytesSupersetOf({"a": 1})
+
+    def test_stops_reading_once_matched(self):
+        assert b'{"a": {"b": 1, "c": 2}, "d": ' + b"not json" * 1000 == AnyJSONBytesSupersetOf({
+            "a": AnySupersetOf({"b": 1}),
+        })
+        assert b'{"a": 1, "b": ' + b"[" * 1000 == AnyJSONBytesSupersetOf({"a": 1})
+        assert b'{"a": 2, "b": ' + b"[" * 1000 != AnyJSONBytesSupersetOf({"a": 1, "b": None})
+
+    def test_only_decodes_needed_values(self):
+        with mock.patch("dmtestutils.comparisons.json.loads", wraps=json.loads) as loads:
+            assert self.document == AnyJSONBytesSupersetOf({"meta": AnySupersetOf({"total": 1})})
+        decoded = [call[0][0] for call in loads.call_args_list]
+        assert decoded == [b"1"]
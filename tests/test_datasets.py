@@ -0,0 +1,132 @@
+from collections import defaultdict
+import io
+import json
+import os
+
+import pytest
+
+from dmtestutils.datasets import MarketplaceDataset
+
+
+@pytest.fixture(scope="module")
+def records():
+    dataset = MarketplaceDataset(seed=7, supplier_count=60, brief_count=40)
+    by_type = defaultdict(list)
+    for record_type, data in dataset.iter_records():
+        by_type[record_type].append(data)
+    return by_type
+
+
+class TestMarketplaceDataset:
+    def test_all_record_types_generated(self, records):
+        assert len(records["framework"]) == 5
+        assert len(records["supplier"]) == 60
+        assert len(records["brief"]) == 40
+        assert records["supplier_framework"]
+        assert records["service"]
+        assert records["brief_response"]
+
+    def test_ids_unique(self, records):
+        for record_type in ("framework", "supplier", "brief", "service", "brief_response"):
+            ids = [data["id"] for data in records[record_type]]
+            assert len(ids) == len(set(ids)), record_type
+
+    def test_services_consistent_with_suppliers_and_frameworks(self, records):
+        suppliers = {supplier["id"]: supplier for supplier in records["supplier"]}
+        frameworks = {framework["slug"]: framework for framework in records["framework"]}
+        on_framework = {
+            (sf["supplierId"], sf["frameworkSlug"]) for sf in records["supplier_framework"] if sf["onFramework"]
+        }
+
+        for service in records["service"]:
+            assert service["supplierName"] == suppliers[service["supplierId"]]["name"]
+            assert (service["supplierId"], service["frameworkSlug"]) in on_framework
+            framework = frameworks[service["frameworkSlug"]]
+            assert service["frameworkName"] == framework["name"]
+            assert service["lotSlug"] in {lot["slug"] for lot in framework["lots"]}
+            assert service["links"]["self"].endswith(service["id"])
+
+    def test_supplier_frameworks_consistent(self, records):
+        suppliers = {supplier["id"]: supplier for supplier in records["supplier"]}
+        frameworks = {framework["slug"]: framework for framework in records["framework"]}
+        for sf in records["supplier_framework"]:
+            assert sf["supplierName"] == suppliers[sf["supplierId"]]["name"]
+            assert sf["frameworkFamily"] == frameworks[sf["frameworkSlug"]]["family"]
+
+    def test_brief_responses_consistent_with_briefs_and_suppliers(self, records):
+        briefs = {brief["id"]: brief for brief in records["brief"]}
+        suppliers = {supplier["id"]: supplier for supplier in records["supplier"]}
+        on_framework = {
+            (sf["supplierId"], sf["frameworkSlug"]) for sf in records["supplier_framework"] if sf["onFramework"]
+        }
+
+        for brief_response in records["brief_response"]:
+            brief = briefs[brief_response["briefId"]]
+            assert brief["status"] != "draft"
+            assert brief_response["brief"]["id"] == brief["id"]
+            assert brief_response["brief"]["framework"]["slug"] == brief["frameworkSlug"]
+            assert brief_response["links"]["brief"].endswith(f"/{brief['id']}")
+            assert brief_response["supplierName"] == suppliers[brief_response["supplierId"]]["name"]
+            assert (brief_response["supplierId"], brief["frameworkSlug"]) in on_framework
+
+    def test_deterministic_and_sliceable(self):
+        dataset = MarketplaceDataset(seed=3, supplier_count=20, brief_count=10)
+        same_dataset = MarketplaceDataset(seed=3, supplier_count=20, brief_count=10)
+        assert list(dataset.iter_records()) == list(same_dataset.iter_records())
+        assert list(dataset.iter_supplier_records()) == (
+            list(dataset.iter_supplier_records(0, 7)) + list(dataset.iter_supplier_records(7))
+        )
+        assert list(dataset.iter_brief_records()) == (
+            list(dataset.iter_brief_records(0, 3)) + list(dataset.iter_brief_records(3))
+        )
+
+    def test_write_jsonl(self):
+        dataset = MarketplaceDataset(seed=3, supplier_count=5, brief_count=5)
+        f = io.StringIO()
+
+        count = dataset.write_jsonl(f)
+
+        lines = f.getvalue().splitlines()
+        assert len(lines) == count
+        assert [(line["type"], line["data"]) for line in map(json.loads, lines)] == list(dataset.iter_records())
+
+    def test_briefs_need_dos_framework(self):
+        with pytest.raises(ValueError):
+            MarketplaceDataset(framework_slugs=("g-cloud-12",), brief_count=1)
+        assert MarketplaceDataset(framework_slugs=("g-cloud-12",), brief_count=0, supplier_count=1)
+        # a framework the catalogue doesn't know of yet is still recognised by its family
+        assert MarketplaceDataset(framework_slugs=("digital-outcomes-and-specialists-7",), brief_count=1)
+
+
+class TestShardedGeneration:
+    @pytest.mark.parametrize("shard_count", (1, 3, 50))
+    def test_shards_cover_dataset_in_order(self, shard_count):
+        dataset = MarketplaceDataset(seed=5, supplier_count=11, brief_count=7)
+        sharded = [record for shard in dataset.shards(shard_count) for record in dataset.iter_shard_records(shard)]
+        assert sharded == list(dataset.iter_records())
+
+    def test_shards_of_empty_dataset(self):
+        dataset = MarketplaceDataset(supplier_count=0, brief_count=0)
+        sharded = [record for shard in dataset.shards(4) for record in dataset.iter_shard_records(shard)]
+        assert sharded == list(dataset.iter_records())
+
+    def test_write_jsonl_parts(self, tmp_path):
+        dataset = MarketplaceDataset(seed=5, supplier_count=10, brief_count=10)
+
+        paths = dataset.write_jsonl_parts(str(tmp_path), shard_count=3, max_workers=2)
+
+        assert len(paths) == 6
+        lines = [line for path in paths for line in open(path).read().splitlines()]
+        assert [(line["type"], line["data"]) for line in map(json.loads, lines)] == list(dataset.iter_records())
+
+    @pytest.mark.parametrize("shard_count,max_workers", ((1, 1), (4, 2), (13, 3)))
+    def test_write_jsonl_file_same_as_write_jsonl(self, tmp_path, shard_count, max_workers):
+        dataset = MarketplaceDataset(seed=5, supplier_count=20, brief_count=15)
+        expected = io.StringIO()
+        dataset.write_jsonl(expected)
+
+        path = str(tmp_path / "dataset.jsonl")
+        dataset.write_jsonl_file(path, shard_count=shard_count, max_workers=max_workers)
+
+        assert open(path).read() == expected.getvalue()
+        assert os.listdir(str(tmp_path)) == ["dataset.jsonl"]
@@ -0,0 +1,243 @@
+import pytest
+
+from dmtestutils.api_model_stubs import (
+    BriefResponseStub,
+    BriefStub,
+    FrameworkStub,
+    ServiceStub,
+    SupplierFrameworkStub,
+    SupplierStub,
+)
+from dmtestutils.fake_api_clients import FakeDataAPIClient, FakeSearchAPIClient, IndexedStore, SearchIndex
+
+
+class TestIndexedStore:
+    def setup_method(self, method):
+        self.store = IndexedStore(lambda r: r["id"], {"colour": lambda r: r["colour"], "tags": lambda r: r["tags"]})
+        for id_, colour, tags in (
+            (1, "red", ["a"]),
+            (2, "blue", ["a", "b"]),
+            (3, "red", ["b"]),
+            (4, "green", []),
+        ):
+            self.store.add({"id": id_, "colour": colour, "tags": tags})
+
+    def test_get(self):
+        assert self.store.get(2)["colour"] == "blue"
+        assert self.store.get("2")["colour"] == "blue"
+        assert self.store.get(5) is None
+
+    def test_find(self):
+        assert [r["id"] for r in self.store.find()] == [1, 2, 3, 4]
+        assert [r["id"] for r in self.store.find(colour="red")] == [1, 3]
+        assert [r["id"] for r in self.store.find(colour="red", tags="b")] == [3]
+        assert [r["id"] for r in self.store.find(colour="red,blue", tags=None)] == [1, 2, 3]
+        assert [r["id"] for r in self.store.find(colour=("green", "blue"))] == [2, 4]
+        assert [r["id"] for r in self.store.find(tags="a")] == [1, 2]
+        assert self.store.find(colour="purple") == []
+
+    def test_readding_replaces_and_reindexes(self):
+        self.store.add({"id": 1, "colour": "blue", "tags": []})
+
+        assert len(self.store) == 4
+        assert [r["id"] for r in self.store.find(colour="red")] == [3]
+        assert [r["id"] for r in self.store.find(colour="blue")] == [2, 1]
+        assert [r["id"] for r in self.store.find(tags="a")] == [2]
+
+    def test_counts(self):
+        assert self.store.counts("colour") == {"red": 2, "blue": 1, "green": 1}
+        self.store.remove(2)
+        assert self.store.counts("colour") == {"red": 2, "green": 1}
+
+    def test_remove(self):
+        self.store.remove(3)
+        assert self.store.get(3) is None
+        assert [r["id"] for r in self.store.find(colour="red")] == [1]
+
+
+class TestFakeDataAPIClient:
+    def setup_method(self, method):
+        self.client = FakeDataAPIClient(page_size=10)
+
+    def test_get_framework(self):
+        self.client.add_frameworks(FrameworkStub(slug="g-cloud-11"), FrameworkStub(slug="g-cloud-12").response())
+
+        assert self.client.get_framework("g-cloud-12")["frameworks"]["name"] == "G-Cloud 12"
+        assert [f["slug"] for f in self.client.find_frameworks()["frameworks"]] == ["g-cloud-11", "g-cloud-12"]
+
+    def test_find_services_pagination(self):
+        self.client.add_services(*(
+            ServiceStub(service_id=str(i), supplier_id=i % 3, lot_slug="cloud-hosting" if i % 2 else "cloud-software")
+            for i in range(25)
+        ))
+
+        first_page = self.client.find_services(supplier_id=1)
+        assert [s["id"] for s in first_page["services"]] == [str(i) for i in range(1, 25, 3)]
+        assert first_page["meta"] == {"total": 8}
+        assert "next" not in first_page["links"]
+
+        first_page = self.client.find_services()
+        assert len(first_page["services"]) == 10
+        assert first_page["meta"] == {"total": 25}
+        assert first_page["links"]["next"] == "http://localhost:5000/services?page=2"
+        assert first_page["links"]["last"] == "http://localhost:5000/services?page=3"
+        assert "prev" not in first_page["links"]
+
+        last_page = self.client.find_services(page=3)
+        assert [s["id"] for s in last_page["services"]] == [str(i) for i in range(20, 25)]
+        assert last_page["links"]["prev"] == "http://localhost:5000/services?page=2"
+
+        assert [s["id"] for s in self.client.find_services_iter(lot="cloud-hosting")] == [
+            str(i) for i in range(1, 25, 2)
+        ]
+
+    def test_get_service(self):
+        self.client.add_services(ServiceStub(service_id="1234"))
+        assert self.client.get_service("1234")["services"]["id"] == "1234"
+        assert self.client.get_service("4321") is None
+
+    def test_find_briefs(self):
+        self.client.add_briefs(
+            BriefStub(id=1, status="live", user_id=10),
+            BriefStub(id=2, status="closed", user_id=10, framework_slug="digital-outcomes-and-specialists-4"),
+            BriefStub(id=3, status="live", user_id=11, framework_slug="digital-outcomes-and-specialists-4"),
+        )
+
+        assert [b["id"] for b in self.client.find_briefs(user_id=10)["briefs"]] == [1, 2]
+        assert [b["id"] for b in self.client.find_briefs(status="live,closed")["briefs"]] == [1, 2, 3]
+        assert [
+            b["id"] for b in self.client.find_briefs(framework="digital-outcomes-and-specialists-4", status="live")
+            ["briefs"]
+        ] == [3]
+        assert [b["id"] for b in self.client.find_briefs_iter(framework="digital-outcomes-and-specialists-4")] == [2, 3]
+        assert self.client.get_brief(2)["briefs"]["clarificationQuestions"] == []
+
+    def test_find_brief_responses(self):
+        self.client.add_brief_responses(
+            BriefResponseStub(id=1, brief_id=100, supplier_id=1),
+            BriefResponseStub(id=2, brief_id=100, supplier_id=2, status="draft"),
+            BriefResponseStub(id=3, brief_id=200, supplier_id=1),
+        )
+
+        assert [br["id"] for br in self.client.find_brief_responses(brief_id=100)["briefResponses"]] == [1, 2]
+        assert [
+            br["id"] for br in self.client.find_brief_responses(supplier_id=1, status="submitted")["briefResponses"]
+        ] == [1, 3]
+        assert self.client.get_brief_response(3)["briefResponses"]["briefId"] == 200
+
+    def test_supplier_frameworks(self):
+        self.client.add_suppliers(SupplierStub(id=1, name="Abc"), SupplierStub(id=2, name="Bcd"))
+        self.client.add_supplier_frameworks(
+            SupplierFrameworkStub(supplier_id=1, framework_slug="g-cloud-11"),
+            SupplierFrameworkStub(supplier_id=1, framework_slug="g-cloud-12", with_agreement=True),
+            SupplierFrameworkStub(supplier_id=2, framework_slug="g-cloud-12"),
+        )
+
+        assert self.client.get_supplier_framework_info(1, "g-cloud-12")["frameworkInterest"]["agreementReturned"]
+        assert self.client.get_supplier_framework_info("2", "g-cloud-12")["frameworkInterest"]["supplierId"] == 2
+        assert [
+            sf["frameworkSlug"] for sf in self.client.get_supplier_frameworks(1)["frameworkInterest"]
+        ] == ["g-cloud-11", "g-cloud-12"]
+        assert [
+            sf["supplierId"] for sf in self.client.find_framework_suppliers("g-cloud-12")["supplierFrameworks"]
+        ] == [1, 2]
+        assert [
+            sf["supplierId"] for sf in self.client.find_framework_suppliers(
+                "g-cloud-12", agreement_returned=False
+            )["supplierFrameworks"]
+        ] == [2]
+        assert [s["id"] for s in self.client.find_suppliers(framework="g-cloud-11")["suppliers"]] == [1]
+        assert [s["id"] for s in self.client.find_suppliers(prefix="b")["suppliers"]] == [2]
+        assert self.client.get_supplier(2)["suppliers"]["name"] == "Bcd"
+
+    def test_not_found(self):
+        dmapiclient = pytest.importorskip("dmapiclient")
+
+        with pytest.raises(dmapiclient.HTTPError) as e:
+            self.client.get_brief(1)
+        assert e.value.status_code == 404
+
+
+class TestSearchIndex:
+    def setup_method(self, method):
+        self.index = SearchIndex(("name", "features"), ("lot",))
+        self.index.add({"id": 1, "name": "Cloud hosting", "features": ["Hosting hosting"], "lot": "a", "colour": "red"})
+        self.index.add({"id": 2, "name": "Cloud software", "features": ["Support"], "lot": "b", "colour": "blue"})
+        self.index.add({"id": 3, "name": "More hosting", "features": [], "lot": "b", "colour": "red"})
+
+    def test_query(self):
+        assert [d["id"] for d in self.index.query()] == [1, 2, 3]
+        assert [d["id"] for d in self.index.query("hosting")] == [1, 3]
+        assert [d["id"] for d in self.index.query("CLOUD")] == [1, 2]
+        assert [d["id"] for d in self.index.query("cloud hosting")] == [1]
+        assert [d["id"] for d in self.index.query("cloud", lot="b")] == [2]
+        assert [d["id"] for d in self.index.query(colour="red")] == [1, 3]
+        assert [d["id"] for d in self.index.query("nothing")] == []
+
+    def test_query_ranks_by_occurrences(self):
+        self.index.add({"id": 4, "name": "Hosting hosting hosting", "features": ["hosting"], "lot": "a"})
+        assert [d["id"] for d in self.index.query("hosting")] == [4, 1, 3]
+
+    def test_readding_reindexes(self):
+        self.index.add({"id": 1, "name": "Software", "features": [], "lot": "b"})
+        assert [d["id"] for d in self.index.query("hosting")] == [3]
+        assert [d["id"] for d in self.index.query("software")] == [2, 1]
+
+    def test_aggregate(self):
+        assert self.index.aggregate(["lot"]) == {"lot": {"a": 1, "b": 2}}
+        assert self.index.aggregate(["lot", "colour"], self.index.query("hosting")) == {
+            "lot": {"a": 1, "b": 1},
+            "colour": {"red": 2},
+        }
+
+
+class TestFakeSearchAPIClient:
+    def setup_method(self, method):
+        self.client = FakeSearchAPIClient(page_size=5)
+        self.client.add_services(
+            *(
+                ServiceStub(
+                    service_id=str(i),
+                    service_name=f"Service {i} {'email' if i % 2 else 'hosting'}",
+                    lot_slug="cloud-support" if i % 3 else "cloud-hosting",
+                    lot="cloud-support" if i % 3 else "cloud-hosting",
+                )
+                for i in range(12)
+            ),
+            index="g-cloud-12",
+        )
+
+    def test_search(self):
+        response = self.client.search("g-cloud-12", "services", q="email")
+        assert [d["id"] for d in response["documents"]] == ["1", "3", "5", "7", "9"]
+        assert response["meta"]["total"] == 6
+        assert response["links"]["next"] == "http://localhost:5000/g-cloud-12/services/search?q=email&page=2"
+
+        response = self.client.search("g-cloud-12", "services", q="email", page=2)
+        assert [d["id"] for d in response["documents"]] == ["11"]
+
+        response = self.client.search("g-cloud-12", "services", q="email", filter_lot="cloud-hosting")
+        assert [d["id"] for d in response["documents"]] == ["3", "9"]
+
+    def test_aggregate(self):
+        assert self.client.aggregate("g-cloud-12", "services", aggregations=["lot"]) == {
+            "aggregations": {"lot": {"cloud-hosting": 4, "cloud-support": 8}},
+            "meta": {"total": 12},
+        }
+        assert self.client.aggregate("g-cloud-12", "services", aggregations=["lot"], q="hosting") == {
+            "aggregations": {"lot": {"cloud-hosting": 2, "cloud-support": 4}},
+            "meta": {"total": 6},
+        }
+
+    def test_index_and_delete(self):
+        self.client.index("g-cloud-12", "100", {"serviceName": "Brand new", "lot": "cloud-hosting"})
+        assert [d["id"] for d in self.client.search("g-cloud-12", q="new")["documents"]] == ["100"]
+
+        self.client.delete("g-cloud-12", "100")
+        assert self.client.search("g-cloud-12", q="new")["documents"] == []
+
+    def test_unknown_index(self):
+        dmapiclient = pytest.importorskip("dmapiclient")
+
+        with pytest.raises(dmapiclient.HTTPError):
+            self.client.search("g-cloud-4", "services")
@@ -0,0 +1,136 @@
+import io
+import tracemalloc
+
+import pytest
+
+from dmtestutils import fixtures
+from dmtestutils.fixtures import (
+    LazyValidFile,
+    file_signature_bytes,
+    file_signature_file,
+    file_signature_view,
+    get_file_signature,
+    iter_valid_file_chunks,
+    register_file_signature,
+    registered_file_extensions,
+    valid_file_mmap,
+    valid_odt_bytes,
+    valid_pdf_bytes,
+)
+
+
+class TestIterValidFileChunks:
+    @pytest.mark.parametrize("size,chunk_size", [(8, 3), (100, 7), (100, 64 * 1024), (79, 79)])
+    def test_chunks_make_up_file(self, size, chunk_size):
+        header = valid_odt_bytes if size >= len(valid_odt_bytes) else valid_pdf_bytes
+        chunks = list(iter_valid_file_chunks(header, size, chunk_size=chunk_size))
+
+        assert all(len(chunk) <= chunk_size for chunk in chunks)
+        content = b"".join(chunks)
+        assert len(content) == size
+        assert content.startswith(header)
+        assert set(content[len(header):]) <= {0xff}
+
+    def test_size_smaller_than_header(self):
+        with pytest.raises(ValueError):
+            list(iter_valid_file_chunks(valid_pdf_bytes, 3))
+
+    def test_memory_does_not_depend_on_size(self):
+        tracemalloc.start()
+        try:
+            for _ in iter_valid_file_chunks(valid_pdf_bytes, 50 * 1024 * 1024):
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak < 1024 * 1024
+
+
+class TestLazyValidFile:
+    def test_read_whole_file(self):
+        f = LazyValidFile(valid_odt_bytes, 1000, name="test.odt")
+        content = f.read()
+
+        assert len(content) == len(f) == 1000
+        assert content.startswith(valid_odt_bytes)
+        assert set(content[len(valid_odt_bytes):]) == {0xff}
+        assert f.read() == b""
+        assert f.name == "test.odt"
+
+    def test_partial_reads_and_seek(self):
+        f = LazyValidFile(valid_pdf_bytes, 200 * 1024)
+        assert f.read(2) == valid_pdf_bytes[:2]
+        assert f.read(4) == valid_pdf_bytes[2:6]
+
+        f.seek(-10, io.SEEK_END)
+        assert f.read(100) == b"\xff" * 10
+
+        f.seek(0)
+        assert b"".join(iter(lambda: f.read(12345), b"")) == (
+            valid_pdf_bytes + b"\xff" * (200 * 1024 - len(valid_pdf_bytes))
+        )
+
+    def test_buffered_reader(self):
+        f = io.BufferedReader(LazyValidFile(valid_pdf_bytes, 100))
+        assert f.read(4) == b"%PDF"
+
+
+class TestValidFileMmap:
+    def test_mmap(self):
+        with valid_file_mmap(valid_pdf_bytes, 10 * 1024 * 1024) as mapped:
+            assert len(mapped) == 10 * 1024 * 1024
+            assert mapped[:len(valid_pdf_bytes)] == valid_pdf_bytes
+            assert mapped[-1] == 0
+
+
+class TestFileSignatureRegistry:
+    def test_matches_handwritten_pdf_fixture(self):
+        assert file_signature_bytes("pdf") == valid_pdf_bytes
+        assert file_signature_bytes("application/pdf") == valid_pdf_bytes
+
+    @pytest.mark.parametrize("extension", registered_file_extensions())
+    def test_signatures_are_at_their_offsets(self, extension):
+        content = file_signature_bytes(extension)
+        for offset, signature in get_file_signature(extension).signatures:
+            assert content[offset:offset + len(signature)] == signature
+
+    def test_odt_signature(self):
+        content = file_signature_bytes("application/vnd.oasis.opendocument.text")
+        assert content[:4] == valid_odt_bytes[:4]
+        assert content[30:77] == valid_odt_bytes[30:77]
+
+    def test_views_share_buffer(self):
+        view = file_signature_view("png")
+        assert view.readonly
+        assert view.obj is file_signature_bytes("png")
+        assert view.obj is file_signature_view("image/png").obj
+
+    def test_file(self):
+        f = file_signature_file("jpeg")
+        assert f.name == "test.jpeg"
+        assert f.read() == file_signature_bytes("jpeg")
+        assert not f.writable()
+        assert file_signature_file("jpeg").read(3) == b"\xff\xd8\xff"
+
+    def test_padded_file(self):
+        content = file_signature_file("gif", size=1000).read()
+        assert len(content) == 1000
+        assert content.startswith(b"GIF89a")
+
+    def test_register_hex_and_bytes_signatures(self, monkeypatch):
+        # register into copies of the registry, so the test type isn't left behind for other tests
+        monkeypatch.setattr(fixtures, "_file_signatures_by_extension", dict(fixtures._file_signatures_by_extension))
+        monkeypatch.setattr(fixtures, "_file_signatures_by_mime", dict(fixtures._file_signatures_by_mime))
+
+        register_file_signature("test-type", "application/x-test", (2, "01 02"), (6, b"ab"))
+        assert file_signature_bytes("test-type") == b"\xff\xff\x01\x02\xff\xffab\xff\xff\xff\xff"
+        assert "test-type" in registered_file_extensions()
+
+        monkeypatch.undo()
+        assert "test-type" not in registered_file_extensions()
+        with pytest.raises(KeyError):
+            file_signature_bytes("application/x-test")
+
+    def test_unregistered(self):
+        with pytest.raises(KeyError):
+            file_signature_bytes("application/x-unheard-of")
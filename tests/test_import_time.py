@@ -0,0 +1,63 @@
+# Guards against regressions in the import cost of dmtestutils, which is paid by every xdist worker and every test
+# collection. Each import is done in a fresh interpreter.
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+pytestmark = pytest.mark.skipif(sys.version_info < (3, 7), reason="-X importtime and lazy imports need python 3.7+")
+
+HEAVY_PACKAGES = ("flask", "flask_login", "dmutils", "dmapiclient", "markupsafe", "werkzeug", "jinja2")
+
+
+def _run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def _modules_imported_by(statement):
+    result = _run_python("-c", f"{statement}\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))")
+    return set(json.loads(result.stdout))
+
+
+def _cumulative_import_times(statement):
+    """Return a dict of module name -> cumulative import time in microseconds, as reported by -X importtime"""
+    times = {}
+    for line in _run_python("-X", "importtime", "-c", statement).stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", ("dmtestutils.api_model_stubs", "dmtestutils.login", "dmtestutils.frontend"))
+def test_import_does_not_pull_in_heavy_modules(module):
+    imported = _modules_imported_by(f"import {module}")
+
+    assert module in imported
+    assert not {name for name in imported if name.split(".")[0] in HEAVY_PACKAGES}
+
+
+def test_api_model_stubs_are_imported_lazily():
+    imported = _modules_imported_by("from dmtestutils.api_model_stubs import BriefStub")
+
+    assert {
+        name for name in imported if name.startswith("dmtestutils.api_model_stubs.")
+    } == {
+        "dmtestutils.api_model_stubs.base",
+        "dmtestutils.api_model_stubs.brief",
+    }
+
+
+@pytest.mark.parametrize("module", ("dmtestutils.api_model_stubs", "dmtestutils.comparisons", "dmtestutils.mocking"))
+def test_import_time_budget(module):
+    # a deliberately generous budget: this is here to catch something heavy being imported, not small slowdowns
+    assert _cumulative_import_times(f"import {module}")[module] < 500000
@@ -0,0 +1,211 @@
+import json
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from dmtestutils.frontend import BaseFrontendApplicationTest
+from dmtestutils.instrumentation import RequestInstrumentation, RequestTiming, read_report, summarise, write_report
+from dmtestutils.mocking import assert_args_and_return, cached_autospec
+
+
+class SlowClient:
+    def get_brief(self, brief_id):
+        pass
+
+
+def _timing(endpoint, total, templates=(), api_calls=(), test=None):
+    timing = RequestTiming("GET", f"/{endpoint}", test=test)
+    timing.endpoint, timing.total = endpoint, total
+    timing.templates = [list(t) for t in templates]
+    timing.api_calls = [list(c) for c in api_calls]
+    return timing
+
+
+class TestRequestTiming:
+    def test_breakdown(self):
+        timing = _timing(
+            "view", 1.0,
+            templates=[("include.html", 0.1, 1), ("page.html", 0.4, 0)],
+            api_calls=[("mock.get_brief", 0.2), ("mock.find_services", 0.1)],
+        )
+        timing.session = 0.05
+        assert timing.rendering == pytest.approx(0.4)
+        assert timing.api == pytest.approx(0.3)
+        assert timing.view == pytest.approx(0.25)
+        assert timing.as_dict()["templateRenders"][0] == {"template": "include.html", "duration": 0.1, "depth": 1}
+
+
+class TestTimeAPICalls:
+    def test_times_calls_during_requests(self):
+        client = Mock()
+        client.get_brief.side_effect = lambda brief_id: time.sleep(0.01)
+        instrumentation = RequestInstrumentation(app=None, collector=[])
+        instrumentation.time_api_calls(client)
+        # side effects set after instrumenting are timed too
+        client.find_services.side_effect = assert_args_and_return({"services": []}, supplier_id=1)
+
+        client.get_brief(1)
+        assert not instrumentation.timings
+
+        instrumentation._local.timing = timing = RequestTiming("GET", "/")
+        client.get_brief(1)
+        assert client.find_services(supplier_id=1) == {"services": []}
+        client.get_brief.return_value.json()
+
+        assert [name for name, _ in timing.api_calls] == ["mock.get_brief", "mock.find_services"]
+        assert timing.api_calls[0][1] >= 0.01
+
+    def test_autospec_mocks(self):
+        client = cached_autospec(SlowClient)
+        instrumentation = RequestInstrumentation(app=None, collector=[])
+        instrumentation.time_api_calls(client)
+        instrumentation._local.timing = timing = RequestTiming("GET", "/")
+        client.get_brief(1)
+        with pytest.raises(TypeError):
+            client.get_brief()
+        assert [name for name, _ in timing.api_calls] == ["mock.get_brief", "mock.get_brief"]
+
+    def test_timing_a_mock_again_doesnt_wrap_it_again(self):
+        client = Mock()
+        client.get_brief(1)
+        instrumentation = RequestInstrumentation(app=None, collector=[])
+        instrumentation.time_api_calls(client)
+        wrapped_call = type(client.get_brief).__call__
+        instrumentation.time_api_calls(client)
+        assert type(client.get_brief).__call__ is wrapped_call
+
+        instrumentation._local.timing = timing = RequestTiming("GET", "/")
+        client.get_brief(1)
+        assert [name for name, _ in timing.api_calls] == ["mock.get_brief"]
+
+        # nor does timing it with another instrumentation, though both record the call
+        other_instrumentation = RequestInstrumentation(app=None, collector=[])
+        other_instrumentation.time_api_calls(client)
+        assert type(client.get_brief).__call__ is wrapped_call
+        other_instrumentation._local.timing = other_timing = RequestTiming("GET", "/")
+        client.get_brief(1)
+        assert (len(timing.api_calls), len(other_timing.api_calls)) == (2, 1)
+
+    def test_stop_timing_api_calls(self):
+        client = Mock()
+        instrumentation = RequestInstrumentation(app=None, collector=[])
+        instrumentation.time_api_calls(client)
+        instrumentation._local.timing = timing = RequestTiming("GET", "/")
+        client.get_brief(1)
+        instrumentation.stop_timing_api_calls()
+        client.get_brief(2)
+        client.find_services()
+        assert [name for name, _ in timing.api_calls] == ["mock.get_brief"]
+
+        instrumentation.time_api_calls(client)
+        client.find_services()
+        assert [name for name, _ in timing.api_calls] == ["mock.get_brief", "mock.find_services"]
+
+
+def test_summarise_and_write_report(tmp_path):
+    timings = [
+        _timing("fast", 0.01, templates=[("page.html", 0.005, 0)], test="test_a"),
+        _timing("slow", 0.5, templates=[("page.html", 0.2, 0), ("big.html", 0.25, 0)], test="test_b"),
+        _timing("slow", 0.3, test="test_c"),
+    ]
+    summary = summarise(timings)
+    assert summary["requests"] == 3
+    assert [row["endpoint"] for row in summary["slowestEndpoints"]] == ["slow", "fast"]
+    assert summary["slowestEndpoints"][0]["count"] == 2
+    assert summary["slowestEndpoints"][0]["slowestTest"] == "test_b"
+    assert [row["template"] for row in summary["slowestTemplates"]] == ["big.html", "page.html"]
+
+    path = tmp_path / "report.json"
+    write_report(str(path), timings)
+    report = json.loads(path.read_text())
+    assert report["summary"] == json.loads(json.dumps(summary))
+    assert len(report["requests"]) == 3
+
+    read_timings = read_report(str(path))
+    assert [t.as_dict() for t in read_timings] == [t.as_dict() for t in timings]
+    assert summarise(read_timings) == summary
+
+
+def test_flask_requests_are_instrumented():
+    flask = pytest.importorskip("flask")
+    jinja2 = pytest.importorskip("jinja2")
+    pytest.importorskip("blinker")
+
+    data_api_client = Mock()
+    data_api_client.get_brief.return_value = {"briefs": {"title": "A brief"}}
+
+    app = flask.Flask(__name__)
+    app.secret_key = "secret"
+    app.jinja_loader = jinja2.DictLoader({
+        "brief.html": "<h1>{{ brief.title }}</h1>{% include 'footer.html' %}",
+        "footer.html": "<footer></footer>",
+    })
+
+    @app.route("/briefs/<int:brief_id>")
+    def brief(brief_id):
+        flask.session["seen"] = brief_id
+        return flask.render_template("brief.html", brief=data_api_client.get_brief(brief_id)["briefs"])
+
+    class TestBriefPage(BaseFrontendApplicationTest):
+        pass
+
+    test = TestBriefPage()
+    test.app, test.client = app, app.test_client()
+    collected = []
+    instrumentation = test.instrument_requests(data_api_client)
+    instrumentation.collector = collected
+
+    assert test.client.get("/briefs/1").status_code == 200
+    instrumentation.detach()
+    test.client.get("/briefs/2")
+
+    assert len(collected) == len(instrumentation.timings) == 1
+    timing = collected[0]
+    assert (timing.method, timing.path, timing.endpoint, timing.status_code) == ("GET", "/briefs/1", "brief", 200)
+    assert "test_flask_requests_are_instrumented" in timing.test
+    assert [name for name, _, _ in timing.templates] == ["brief.html"]
+    assert [name for name, _ in timing.api_calls] == ["mock.get_brief"]
+    assert timing.session > 0
+    assert timing.total >= timing.rendering + timing.api + timing.session
+
+
+def test_flask_instrumentation_is_detached_at_teardown():
+    flask = pytest.importorskip("flask")
+    pytest.importorskip("blinker")
+
+    data_api_client = Mock()
+    app = flask.Flask(__name__)
+    app.secret_key = "secret"
+    original_session_interface = app.session_interface
+    receivers = set(flask.signals.request_started.receivers_for(app))
+
+    @app.route("/")
+    def index():
+        data_api_client.get_brief(1)
+        return ""
+
+    class TestIndexPage(BaseFrontendApplicationTest):
+        pass
+
+    for _ in range(3):
+        test = TestIndexPage()
+        test.app, test.client = app, app.test_client()
+        instrumentation = test.instrument_requests(data_api_client)
+        instrumentation.collector = []
+        test.client.get("/")
+        test.teardown_method(None)
+
+        assert app.session_interface is original_session_interface
+        assert len(instrumentation.timings) == 1
+        assert [name for name, _ in instrumentation.timings[0].api_calls] == ["mock.get_brief"]
+        assert set(flask.signals.request_started.receivers_for(app)) == receivers
+        assert type(data_api_client.get_brief)._timing_instrumentations == []
+
+    # detaching out of order leaves the other instrumentation's wrapper in place
+    first = RequestInstrumentation(app, collector=[]).attach()
+    second = RequestInstrumentation(app, collector=[]).attach()
+    first.detach()
+    assert app.session_interface._session_interface is original_session_interface
+    second.detach()
+    assert app.session_interface is original_session_interface
@@ -0,0 +1,111 @@
+from collections import Counter
+import threading
+import time
+
+import pytest
+
+from dmtestutils.frontend import BaseFrontendApplicationTest
+from dmtestutils.load import LoadReport, LoadRequest, percentile, run_load
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class FakeApp:
+    """Just enough of a Flask app for the harness: a ``test_client()`` whose ``open`` returns a status code"""
+    def __init__(self):
+        self.clients = []
+        self.requests = Counter()
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def test_client(self):
+        self.clients.append(threading.get_ident())
+        return self
+
+    def open(self, path, method="GET", **kwargs):
+        with self.lock:
+            self.requests[method, path] += 1
+            self.threads.add(threading.get_ident())
+        if path == "/slow":
+            time.sleep(0.02)
+        if path == "/broken":
+            return FakeResponse(500)
+        if path == "/raises":
+            raise RuntimeError("oops")
+        return FakeResponse(200)
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([7], 99) == 7
+    assert percentile([], 99) == 0.0
+
+
+class TestRunLoad:
+    def test_makes_each_request_repeat_times(self):
+        app = FakeApp()
+        report = run_load(app, ["/a", LoadRequest("/b", method="POST", kwargs={"data": {}})], concurrency=4, repeat=25)
+
+        assert app.requests == {("GET", "/a"): 25, ("POST", "/b"): 25}
+        assert report.total_requests == 50
+        assert set(report.endpoints) == {"GET /a", "POST /b"}
+        assert report.endpoints["GET /a"].count == 25
+        assert report.throughput > 0
+        # each thread has its own client
+        assert len(app.clients) == len(set(app.clients)) <= 4
+
+    def test_errors(self):
+        report = run_load(FakeApp(), ["/a", "/broken", "/raises"], repeat=3)
+        assert report.endpoints["GET /a"].errors == 0
+        assert report.endpoints["GET /broken"].errors == 3
+        assert report.endpoints["GET /raises"].errors == 3
+        with pytest.raises(AssertionError, match=r"Requests failed under load: .*GET /broken") as exc_info:
+            report.assert_no_errors()
+        assert "  GET /broken: 3 x 500 response\n" in str(exc_info.value)
+        assert "  GET /raises: 3 x RuntimeError: oops\n" in str(exc_info.value)
+        assert report.failures == {
+            "GET /broken": Counter({"500 response": 3}),
+            "GET /raises": Counter({"RuntimeError: oops": 3}),
+        }
+
+    def test_latency_budget(self):
+        report = run_load(FakeApp(), [LoadRequest("/slow", endpoint="slow page"), "/fast"], concurrency=2, repeat=5)
+        assert report.endpoints["slow page"].p50 >= 0.02
+
+        report.assert_latency_budget(p99=0.015, endpoint="GET /fast")
+        with pytest.raises(AssertionError, match=r"Latency over budget: slow page p95"):
+            report.assert_latency_budget(p95=0.015)
+
+    def test_report_str(self):
+        report = LoadReport({"a": [0.001, 0.002], "b": [0.01]}, {"b": 1}, wall_time=0.5)
+        assert str(report).splitlines()[0] == "3 requests in 0.50s (6.0 requests/s)"
+        assert str(report).splitlines()[2].split() == ["a", "2", "0", "1.0", "2.0", "2.0", "2.0"]
+
+
+def test_frontend_run_load():
+    class TestFrontend(BaseFrontendApplicationTest):
+        app = FakeApp()
+
+    report = TestFrontend().run_load(["/a"], repeat=3)
+    assert report.endpoints["GET /a"].count == 3
+
+
+def test_flask_app_endpoint_names():
+    flask = pytest.importorskip("flask")
+    app = flask.Flask(__name__)
+
+    @app.route("/services/<service_id>")
+    def service(service_id):
+        return service_id
+
+    report = run_load(app, ["/services/1", "/services/2", "/missing"], repeat=2)
+    assert report.endpoints["service"].count == 4
+    assert report.endpoints["GET /missing"].count == 2
+    report.assert_no_errors()
@@ -1,12 +1,20 @@
-from unittest.mock import Mock
+import time
+from unittest import mock
+from unittest.mock import ANY, Mock, call
 
 import pytest
 
+from dmtestutils import mocking
 from dmtestutils.mocking import (
+    api_call_budget,
     assert_args_and_raise,
     assert_args_and_return,
     assert_args_and_return_or_raise,
     assert_args_and_return_iter_over,
+    assert_args_and_return_paged_iter,
+    cached_autospec,
+    expect_sequence,
+    LazyPages,
 )
 
 
@@ -62,3 +70,411 @@ def test_assert_args_and_return_iter_over():
 
     with pytest.raises(AssertionError):
         mymock('two battles', yards=50)
+
+
+class ExampleAPIClient:
+    base_url = "http://localhost"
+
+    def get_brief(self, brief_id, *, with_users=False):
+        pass
+
+    def find_briefs(self, user_id=None, status=None, page=None):
+        pass
+
+    @staticmethod
+    def build_url(path):
+        pass
+
+    @classmethod
+    def from_app(cls, app):
+        pass
+
+    @property
+    def auth_token(self):
+        pass
+
+
+class TestCachedAutospec:
+    def test_signatures_are_checked(self):
+        client = cached_autospec(ExampleAPIClient)
+        client.get_brief(1234, with_users=True)
+        client.find_briefs(status="live")
+        client.build_url("/briefs")
+        client.from_app(None)
+
+        for bad_call in (
+            lambda: client.get_brief(),
+            lambda: client.get_brief(1234, True),
+            lambda: client.find_briefs(framework="g-cloud-10"),
+            lambda: client.build_url(),
+            lambda: client.from_app(None, None),
+        ):
+            with pytest.raises(TypeError):
+                bad_call()
+
+    def test_checked_before_side_effect(self):
+        client = cached_autospec(ExampleAPIClient)
+        client.get_brief.side_effect = assert_args_and_return({"briefs": {}}, 1234)
+        assert client.get_brief(1234) == {"briefs": {}}
+        with pytest.raises(AssertionError):
+            client.get_brief(4321)
+        with pytest.raises(TypeError):
+            client.get_brief(1234, 5678)
+
+    def test_attributes_are_restricted_to_spec(self):
+        client = cached_autospec(ExampleAPIClient)
+        with pytest.raises(AttributeError):
+            client.get_breif(1234)
+        client.not_in_spec = 1
+
+        strict_client = cached_autospec(ExampleAPIClient, spec_set=True)
+        with pytest.raises(AttributeError):
+            strict_client.not_in_spec = 1
+
+    def test_non_callable_attributes(self):
+        client = cached_autospec(ExampleAPIClient)
+        with pytest.raises(TypeError):
+            client.base_url()
+        with pytest.raises(TypeError):
+            client.auth_token()
+
+    def test_isinstance(self):
+        assert isinstance(cached_autospec(ExampleAPIClient), ExampleAPIClient)
+
+    def test_recorded_calls_are_normalised_by_signature(self):
+        client = cached_autospec(ExampleAPIClient)
+        client.get_brief(1234)
+        client.get_brief.assert_called_once_with(brief_id=1234)
+
+    def test_fresh_mocks_are_independent(self):
+        client_a, client_b = cached_autospec(ExampleAPIClient), cached_autospec(ExampleAPIClient)
+        client_a.get_brief.return_value = "a"
+        client_a.get_brief(1)
+        assert client_b.get_brief(1) != "a"
+        assert client_b.get_brief.call_count == 1
+
+    def test_private_mock_internals_are_supported(self):
+        # if this fails, cached_autospec is falling back to create_autospec with this version of Python
+        assert mocking._mock_internals_supported()
+
+    def test_changed_private_mock_internals_are_detected(self, monkeypatch):
+        monkeypatch.setattr(mocking, "_autospec_child", lambda signature, **kwargs: mock.MagicMock(**kwargs))
+        assert not mocking._mock_internals_supported.__wrapped__()
+
+    def test_falls_back_to_create_autospec(self, monkeypatch):
+        monkeypatch.setattr(mocking, "_mock_internals_supported", lambda: False)
+        client = cached_autospec(ExampleAPIClient)
+        assert isinstance(client, ExampleAPIClient)
+        assert not isinstance(client, mocking._CachedAutospecMock)
+
+        client.get_brief(1234)
+        client.get_brief.assert_called_once_with(brief_id=1234)
+        with pytest.raises(TypeError):
+            client.get_brief(1234, True)
+        with pytest.raises(AttributeError):
+            client.get_breif(1234)
+        with pytest.raises(AttributeError):
+            cached_autospec(ExampleAPIClient, spec_set=True).not_in_spec = 1
+
+    def test_cheaper_than_create_autospec(self):
+        big_client_class = type("BigClient", (), {
+            f"method_{i}": (lambda self, a, b=None: None) for i in range(300)
+        })
+        cached_autospec(big_client_class)
+
+        start = time.perf_counter()
+        for _ in range(10):
+            cached_autospec(big_client_class).method_1(1)
+        cached_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(10):
+            mock.create_autospec(big_client_class, instance=True).method_1(1)
+        autospec_duration = time.perf_counter() - start
+
+        assert cached_duration * 5 < autospec_duration
+
+
+class TestLazyPages:
+    def test_fetches_pages_lazily(self):
+        produced = []
+
+        def factory():
+            for i in range(25):
+                produced.append(i)
+                yield i
+
+        pages = LazyPages(factory, page_size=10)
+        items = iter(pages)
+        assert pages.pages_fetched == 0
+        assert next(items) == 0
+        assert pages.pages_fetched == 1
+        assert len(produced) == 10
+        assert list(items) == list(range(1, 25))
+        assert pages.pages_fetched == 3
+
+    def test_reiterable(self):
+        pages = LazyPages(lambda: range(20), page_size=10)
+        assert list(pages) == list(pages) == list(range(20))
+        assert pages.pages_fetched == 4
+
+    def test_page_latency(self):
+        pages = LazyPages(lambda: range(3), page_size=1, page_latency=0.01)
+        start = time.monotonic()
+        assert list(pages) == [0, 1, 2]
+        assert time.monotonic() - start >= 0.03
+
+    def test_empty(self):
+        pages = LazyPages(lambda: (), page_size=10)
+        assert list(pages) == []
+        assert pages.pages_fetched == 0
+
+
+def test_assert_args_and_return_paged_iter():
+    pages = LazyPages(lambda: ({"id": i} for i in range(1000000)), page_size=100)
+    mymock = Mock()
+    mymock.side_effect = assert_args_and_return_paged_iter(pages, framework="g-cloud-10")
+
+    rows = mymock(framework="g-cloud-10")
+    assert next(rows) == {"id": 0}
+    assert pages.pages_fetched == 1
+    assert sum(1 for _ in rows) == 999999
+    assert pages.pages_fetched == 10000
+
+    with pytest.raises(AssertionError):
+        mymock(framework="g-cloud-11")
+
+    mymock.side_effect = assert_args_and_return_paged_iter(lambda: iter("abc"))
+    assert list(mymock()) == ["a", "b", "c"]
+
+
+class TestExpectSequence:
+    def test_ordered(self):
+        mymock = Mock()
+        mymock.side_effect = expect_sequence().then(call("a"), returns=1).then(call("b", c=2), returns=2).compile()
+
+        with pytest.raises(AssertionError, match=r"Unexpected call mock\('b', c=2\), expected one of mock\('a'\)"):
+            mymock("b", c=2)
+        assert mymock("a") == 1
+        assert mymock("b", c=2) == 2
+        with pytest.raises(AssertionError, match=r"expected no more calls"):
+            mymock("a")
+
+    def test_methods_of_a_client(self):
+        client = Mock()
+        sequence = (
+            expect_sequence()
+            .then(call.get_framework("g-cloud-10"), returns="framework")
+            .then(call.get_supplier(1), returns="supplier")
+            .compile()
+            .install(client)
+        )
+        assert sequence.method_names == {"get_framework", "get_supplier"}
+        assert client.get_framework("g-cloud-10") == "framework"
+        with pytest.raises(AssertionError):
+            client.get_framework("g-cloud-10")
+        assert client.get_supplier(1) == "supplier"
+        assert sequence.is_complete
+
+    def test_unordered(self):
+        client = Mock()
+        sequence = (
+            expect_sequence()
+            .unordered((call.a(1), "a1"), (call.a(2), "a2"), (call.b(), "b"))
+            .then(call.c(), returns="c")
+            .compile()
+            .install(client)
+        )
+        assert client.a(2) == "a2"
+        with pytest.raises(AssertionError):
+            client.a(2)
+        with pytest.raises(AssertionError):
+            client.c()
+        assert client.b() == "b"
+        assert client.a(1) == "a1"
+        assert not sequence.is_complete
+        assert client.c() == "c"
+        sequence.assert_complete()
+
+    def test_repeated(self):
+        client = Mock()
+        sequence = (
+            expect_sequence()
+            .then(call.find_services(), returns="page")
+            .repeated(call.get_service(ANY), returns="service", min_times=2, max_times=3)
+            .repeated(call.get_brief(ANY), returns="brief", min_times=0)
+            .then(call.done(), returns="done")
+            .compile()
+            .install(client)
+        )
+        client.find_services()
+        assert client.get_service("1") == "service"
+        with pytest.raises(AssertionError):
+            client.done()
+        assert client.get_service("2") == "service"
+        assert client.get_service("3") == "service"
+        with pytest.raises(AssertionError, match=r"expected one of get_brief\(<ANY>\), done\(\)"):
+            client.get_service("4")
+        with pytest.raises(AssertionError, match=r"Expected calls are outstanding"):
+            sequence.assert_complete()
+        assert client.done() == "done"
+        sequence.assert_complete()
+
+    def test_repeated_group_overlapping_the_next_expectation(self):
+        client = Mock()
+        sequence = (
+            expect_sequence()
+            .repeated(call.get_service(ANY))
+            .then(call.get_service("last"))
+            .compile()
+            .install(client)
+        )
+        client.get_service("a")
+        client.get_service("last")
+        assert sequence.is_complete
+
+        # "last" might have been one of the repeated calls, so more can follow
+        client.get_service("b")
+        assert not sequence.is_complete
+        client.get_service("last")
+        sequence.assert_complete()
+
+    def test_optional_group_overlapping_the_next_expectation(self):
+        client = Mock()
+        sequence = (
+            expect_sequence()
+            .repeated(call.find_services(ANY), returns="page", min_times=0, max_times=1)
+            .then(call.find_services(1), returns="page")
+            .then(call.done())
+            .compile()
+            .install(client)
+        )
+        assert client.find_services(1) == "page"
+        assert client.find_services(1) == "page"
+        client.done()
+        sequence.assert_complete()
+
+        sequence = (
+            expect_sequence()
+            .repeated(call.get_brief(ANY), min_times=0)
+            .unordered((call.get_brief(1), None), (call.get_supplier(2), None))
+            .compile()
+            .install(client)
+        )
+        client.get_brief(1)
+        client.get_supplier(2)
+        sequence.assert_complete()
+        # the first get_brief(1) might have been the repeated one, in which case the unordered one is still to come
+        with pytest.raises(AssertionError, match=r"Unexpected call get_supplier\(2\), expected one of get_brief\(1\)$"):
+            client.get_supplier(2)
+        client.get_brief(1)
+        sequence.assert_complete()
+
+    def test_overlapping_expectations_with_different_responses(self):
+        client = Mock()
+        sequence = (
+            expect_sequence()
+            .repeated(call.find_services(page=ANY), returns="page")
+            .then(call.find_services(page=3), returns="last page")
+            .compile()
+            .install(client)
+        )
+        assert client.find_services(page=1) == "page"
+        assert client.find_services(page=3) == "last page"
+        sequence.assert_complete()
+        with pytest.raises(AssertionError, match=r"expected no more calls"):
+            client.find_services(page=4)
+
+    def test_raises(self):
+        mymock = Mock()
+        mymock.side_effect = (
+            expect_sequence()
+            .then(call(1), raises=EggBottleException())
+            .repeated(call(2), raises=EggBottleException())
+            .compile()
+        )
+        with pytest.raises(EggBottleException):
+            mymock(1)
+        for _ in range(3):
+            with pytest.raises(EggBottleException):
+                mymock(2)
+
+    def test_long_sequence(self):
+        builder = expect_sequence()
+        for i in range(10000):
+            builder.then(call(i), returns=i)
+        sequence = builder.compile()
+        for i in range(10000):
+            assert sequence(i) == i
+        assert sequence.is_complete
+
+
+class TestAPICallBudget:
+    def test_within_budget(self):
+        client = Mock()
+        client.get_brief(1)
+        with api_call_budget(client, max_calls=2, max_calls_per_method=1) as budget:
+            client.get_brief(1)
+            client.find_services(supplier_id=2)
+        assert budget.calls == [call.get_brief(1), call.find_services(supplier_id=2)]
+
+    def test_over_total_budget(self):
+        client = Mock()
+        with pytest.raises(AssertionError) as exc_info:
+            with api_call_budget(client, max_calls=2):
+                client.get_framework("g-cloud-10")
+                for service_id in ("1", "2", "1"):
+                    client.get_service(service_id)
+        assert str(exc_info.value) == "\n".join((
+            "4 API calls were made, more than the budget of 2",
+            "  3 x get_service",
+            "      2 x get_service('1')",
+            "      1 x get_service('2')",
+            "  1 x get_framework",
+            "      1 x get_framework('g-cloud-10')",
+        ))
+
+    def test_over_per_method_budget(self):
+        client = Mock()
+        with pytest.raises(AssertionError, match=r"^12 calls were made to get_service, more than the budget of 1\n"):
+            with api_call_budget(client, max_calls_per_method=1) as budget:
+                client.get_framework("g-cloud-10")
+                for service_id in range(12):
+                    client.get_service(service_id)
+        assert budget.breakdown().splitlines()[5:7] == ["      1 x get_service(4)", "      ... and 7 more"]
+
+    def test_several_mocks_and_mocked_functions(self):
+        client, search_client, get_user = Mock(), Mock(), Mock()
+        with pytest.raises(AssertionError, match=r"3 API calls were made"):
+            with api_call_budget(client, search_client, get_user, max_calls=2):
+                client.get_brief(1)
+                search_client.search("g-cloud")
+                get_user(email_address="a@b.com")
+
+    def test_with_side_effects(self):
+        client = cached_autospec(ExampleAPIClient)
+        client.get_brief.side_effect = assert_args_and_return({"briefs": {}}, 1)
+        client.find_briefs.side_effect = assert_args_and_raise(EggBottleException, status="live")
+        with api_call_budget(client, max_calls=2) as budget:
+            client.get_brief(1)
+            with pytest.raises(EggBottleException):
+                client.find_briefs(status="live")
+        assert len(budget.calls) == 2
+
+    def test_decorator(self):
+        client = Mock()
+
+        @api_call_budget(client, max_calls=1)
+        def view():
+            client.get_brief(1)
+            client.get_brief(2)
+
+        with pytest.raises(AssertionError):
+            view()
+
+    def test_exceptions_propagate(self):
+        client = Mock()
+        with pytest.raises(EggBottleException):
+            with api_call_budget(client, max_calls=0):
+                client.get_brief(1)
+                raise EggBottleException()
@@ -0,0 +1,190 @@
+import json
+
+import pytest
+
+from dmtestutils import pytest_plugin
+from dmtestutils.api_model_stubs import BriefStub, FrameworkStub, SupplierStub
+from dmtestutils.instrumentation import RequestTiming
+from dmtestutils.pytest_plugin import SharedStub, SharedStubs
+
+
+pytest_plugins = ["pytester"]
+
+
+class TestSharedStub:
+    def test_unmodified_stub_passes_check(self):
+        shared = SharedStub(FrameworkStub())
+        shared.stub.single_result_response()
+        shared.stub.evolve(status="expired")
+        assert not shared.is_mutated()
+        shared.check("test_nothing")
+
+    def test_holding_references_to_response_data_isnt_a_modification(self):
+        shared = SharedStub(FrameworkStub())
+        lots = shared.stub.response()["lots"]
+        lot = lots[0]
+        assert not shared.is_mutated()
+        assert lot in lots
+
+    @pytest.mark.parametrize("mutate", (
+        lambda data: data.update(status="expired"),
+        lambda data: data["lots"][0].update(slug="something-else"),
+        lambda data: data["lots"].pop(),
+        lambda data: data.pop("status"),
+        lambda data: data.update(newKey=1),
+    ))
+    def test_modified_stub_fails_check_and_is_restored(self, mutate):
+        stub = FrameworkStub()
+        shared = SharedStub(stub)
+        mutate(stub.response_data)
+        assert shared.is_mutated()
+
+        with pytest.raises(pytest.fail.Exception, match=r"test_something modified the response data of a shared"):
+            shared.check("test_something")
+
+        assert stub.response_data == FrameworkStub().response_data
+        assert not shared.is_mutated()
+
+    def test_replaced_response_data_fails_check(self):
+        stub = SupplierStub()
+        shared = SharedStub(stub)
+        stub.response_data = dict(stub.response_data)
+        with pytest.raises(pytest.fail.Exception, match=r"the response data was replaced"):
+            shared.check("test_something")
+        assert not shared.is_mutated()
+
+    @pytest.mark.parametrize("stub_class", (BriefStub, FrameworkStub, SupplierStub))
+    def test_single_result_response_isnt_a_modification(self, stub_class):
+        shared = SharedStub(stub_class())
+        shared.stub.single_result_response()
+        assert not shared.is_mutated()
+
+    def test_mutated_keys(self):
+        stub = FrameworkStub()
+        shared = SharedStub(stub)
+        stub.response_data["status"] = "expired"
+        stub.response_data["lots"].append({})
+        del stub.response_data["slug"]
+        assert shared.mutated_keys() == ["lots", "slug", "status"]
+
+
+class TestSharedStubs:
+    def test_stubs_are_shared_by_class_and_kwargs(self):
+        shared_stubs = SharedStubs()
+        assert shared_stubs.get(FrameworkStub) is shared_stubs.get(FrameworkStub)
+        assert shared_stubs.get(FrameworkStub, slug="g-cloud-11") is shared_stubs.get(FrameworkStub, slug="g-cloud-11")
+        assert shared_stubs.get(FrameworkStub, slug="g-cloud-11") is not shared_stubs.get(FrameworkStub)
+        assert shared_stubs.get(SupplierStub) is not shared_stubs.get(FrameworkStub)
+
+
+def test_plugin_names_test_that_modified_a_shared_stub(pytester):
+    pytester.makeconftest('pytest_plugins = ["dmtestutils.pytest_plugin"]')
+    pytester.makepyfile("""
+        def test_reads(shared_framework_stub):
+            assert shared_framework_stub.response()["status"] == "open"
+
+        def test_modifies(shared_framework_stub):
+            shared_framework_stub.response_data["status"] = "expired"
+
+        def test_reads_again(shared_framework_stub, shared_stubs):
+            assert shared_framework_stub.response()["status"] == "open"
+    """)
+    result = pytester.runpytest("-p", "no:cacheprovider")
+    result.assert_outcomes(passed=3, errors=1)
+    result.stdout.fnmatch_lines([
+        "*test_modifies*modified the response data of a shared FrameworkStub (keys: status)*",
+    ])
+
+
+def test_plugin_allows_tests_to_keep_references_to_shared_stubs(pytester):
+    pytester.makeconftest('pytest_plugins = ["dmtestutils.pytest_plugin"]')
+    pytester.makepyfile("""
+        first_lot = None
+
+        def test_reads_lots(shared_framework_stub):
+            global first_lot
+            lots = shared_framework_stub.response()["lots"]
+            first_lot = shared_framework_stub.response()["lots"][0]
+            assert first_lot in lots
+
+        def test_reads_lots_again(shared_framework_stub):
+            assert shared_framework_stub.response()["lots"][0] is first_lot
+    """)
+    pytester.runpytest("-p", "no:cacheprovider").assert_outcomes(passed=2)
+
+
+def test_plugin_shared_brief_and_supplier_stubs(pytester):
+    pytester.makeconftest('pytest_plugins = ["dmtestutils.pytest_plugin"]')
+    pytester.makepyfile("""
+        def test_brief(shared_brief_stub):
+            assert shared_brief_stub.single_result_response()["briefs"]["clarificationQuestions"] == []
+
+        def test_brief_again(shared_brief_stub):
+            assert shared_brief_stub.single_result_response()["briefs"]["users"][0]["role"] == "buyer"
+
+        def test_supplier(shared_supplier_stub):
+            assert shared_supplier_stub.single_result_response()["suppliers"]["service_counts"]
+
+        def test_supplier_again(shared_supplier_stub):
+            assert shared_supplier_stub.response()["name"] == "My Little Company"
+    """)
+    pytester.runpytest("-p", "no:cacheprovider").assert_outcomes(passed=4)
+
+
+def test_plugin_writes_request_timing_report(pytester, monkeypatch):
+    monkeypatch.setattr("dmtestutils.instrumentation.collected_request_timings", [])
+    pytester.makeconftest('pytest_plugins = ["dmtestutils.pytest_plugin"]')
+    pytester.makepyfile("""
+        from dmtestutils.instrumentation import RequestTiming, collected_request_timings
+
+        def test_request():
+            collected_request_timings.append(RequestTiming("GET", "/"))
+    """)
+    pytester.runpytest("--request-timing-report=timings.json").assert_outcomes(passed=1)
+    report = json.loads((pytester.path / "timings.json").read_text())
+    assert report["summary"]["requests"] == 1
+
+
+def test_plugin_doesnt_write_empty_request_timing_report(pytester, monkeypatch):
+    monkeypatch.setattr("dmtestutils.instrumentation.collected_request_timings", [])
+    pytester.makeconftest('pytest_plugins = ["dmtestutils.pytest_plugin"]')
+    pytester.makepyfile("def test_nothing(): pass")
+    pytester.runpytest().assert_outcomes(passed=1)
+    assert not (pytester.path / "request-timings.json").exists()
+
+
+class FakeConfig:
+    def __init__(self, rootdir, workerinput=None):
+        self.rootdir = rootdir
+        if workerinput is not None:
+            self.workerinput = workerinput
+
+    def getoption(self, name):
+        return {"request_timing_report": "timings.json"}[name]
+
+
+class FakeSession:
+    def __init__(self, rootdir, worker_id=None):
+        self.config = FakeConfig(rootdir, None if worker_id is None else {"workerid": worker_id})
+
+
+def test_xdist_workers_request_timing_reports_are_merged(tmp_path, monkeypatch):
+    controller = FakeSession(tmp_path)
+    (tmp_path / "timings.worker-gw7.json").write_text("left behind by an earlier run")
+    pytest_plugin.pytest_sessionstart(controller)
+    assert not list(tmp_path.iterdir())
+
+    for worker_id, path in (("gw0", "/a"), ("gw1", "/b"), ("gw2", None)):
+        worker = FakeSession(tmp_path, worker_id)
+        pytest_plugin.pytest_sessionstart(worker)
+        collected = [RequestTiming("GET", path)] if path else []
+        monkeypatch.setattr("dmtestutils.instrumentation.collected_request_timings", collected)
+        pytest_plugin.pytest_sessionfinish(worker, 0)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["timings.worker-gw0.json", "timings.worker-gw1.json"]
+
+    monkeypatch.setattr("dmtestutils.instrumentation.collected_request_timings", [])
+    pytest_plugin.pytest_sessionfinish(controller, 0)
+    assert [p.name for p in tmp_path.iterdir()] == ["timings.json"]
+    report = json.loads((tmp_path / "timings.json").read_text())
+    assert report["summary"]["requests"] == 2
+    assert sorted(request["path"] for request in report["requests"]) == ["/a", "/b"]
@@ -0,0 +1,167 @@
+from collections import Counter
+
+import pytest
+
+from dmtestutils.frontend import BaseFrontendApplicationTest
+from dmtestutils.render_budget import RenderCost, largest_elements, response_size_problems
+
+
+def _page(result_count):
+    results = "".join(
+        f'<li class="search-result"><h2>Service {i}</h2><p>A description of service {i}<br>'
+        f'<img src="/{i}.png"/></li>\n'
+        for i in range(result_count)
+    )
+    return f"<html><head><title>Search</title></head><body><main id=content><ul>{results}</ul></main></body></html>"
+
+
+class TestLargestElements:
+    def test_groups_elements_by_selector(self):
+        html = _page(10)
+        rows = largest_elements(html, top=10)
+
+        assert rows[0] == ("main#content", 1, len(html) - html.index("<main") - len("</body></html>"))
+        assert rows[1][0] == "ul"
+        assert rows[2][:2] == ("li.search-result", 10)
+        assert rows[2][2] == sum(len(line) for line in html[html.index("<li"):html.index("</ul>")].splitlines())
+        assert ("img", 10, 10 * len('<img src="/0.png"/>') - 10 + sum(len(str(i)) for i in range(10))) in rows
+        assert not {"html", "head", "body"} & {selector for selector, _, _ in rows}
+
+    def test_nested_elements_with_the_same_selector_are_counted_once(self):
+        assert largest_elements("<div><div><div>hello</div></div></div><div>world</div>") == [("div", 2, 54)]
+
+    def test_unclosed_elements(self):
+        assert sorted(largest_elements("<ul><li>one<li>two</ul><p>unclosed")) == [
+            ("li", 2, 14), ("p", 1, 11), ("ul", 1, 23),
+        ]
+
+
+def test_response_size_problems():
+    body = _page(100).encode()
+    assert response_size_problems(body, None) == []
+    assert response_size_problems(body, len(body)) == []
+
+    problems = response_size_problems(body, 1000, top=2)
+    assert problems[0] == f"response body of {len(body):,} bytes is over the budget of 1,000 bytes. Largest elements:"
+    assert problems[1].startswith("  main#content x 1: ")
+    assert problems[2].startswith("  ul x 1: ")
+    assert len(problems) == 3
+
+
+def test_render_cost_problems():
+    cost = RenderCost("GET", "/search")
+    cost.body = _page(3).encode()
+    cost.template_loads = Counter({"search.html": 1, "result.html": 3})
+    cost.templates = [["result.html", 0.01, 1], ["search.html", 0.2, 0]]
+
+    assert cost.problems(max_bytes=10000, max_template_loads=4, max_render_time=0.2) == []
+    assert cost.problems(max_template_loads=3, max_render_time=0.1, top=1) == [
+        "4 template loads is over the budget of 3. Most loaded:",
+        "  result.html x 3",
+        "0.200s rendering templates is over the budget of 0.100s. Slowest:",
+        "  search.html: 0.200s",
+    ]
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def get_data(self):
+        return self.body
+
+
+def test_assert_response_size():
+    class TestSearchPage(BaseFrontendApplicationTest):
+        response_size_budget = 1000
+
+    test = TestSearchPage()
+    test.assert_response_size(FakeResponse(_page(1).encode()))
+    test.assert_response_size(FakeResponse(_page(100).encode()), max_bytes=100000)
+    with pytest.raises(AssertionError, match=r"over the budget of 1,000 bytes(.|\n)*li\.search-result x 100"):
+        test.assert_response_size(FakeResponse(_page(100).encode()))
+
+
+def test_flask_render_budget():
+    flask = pytest.importorskip("flask")
+    jinja2 = pytest.importorskip("jinja2")
+    pytest.importorskip("blinker")
+
+    app = flask.Flask(__name__)
+    app.jinja_loader = jinja2.DictLoader({
+        "search.html": "<ul>{% for i in range(count) %}{% include 'result.html' %}{% endfor %}</ul>",
+        "result.html": '<li class="search-result">Service {{ i }}</li>',
+    })
+
+    @app.route("/search/<int:count>")
+    def search(count):
+        return flask.render_template("search.html", count=count)
+
+    class TestSearchPage(BaseFrontendApplicationTest):
+        template_loads_budget = 20
+
+    test = TestSearchPage()
+    test.app, test.client = app, app.test_client()
+
+    with test.render_budget(max_bytes=2000, max_render_time=1) as budget:
+        test.client.get("/search/10")
+    assert [sum(cost.template_loads.values()) for cost in budget.costs] == [11]
+    assert budget.costs[0].body.startswith(b'<ul><li class="search-result">')
+    assert [name for name, _, _ in budget.costs[0].templates] == ["search.html"]
+
+    with pytest.raises(AssertionError) as exc_info:
+        with test.render_budget(max_bytes=2000):
+            test.client.get("/search/5")
+            test.client.get("/search/50")
+    assert str(exc_info.value).splitlines() == [
+        "GET /search/50 is over its render budget:",
+        "  response body of 2,049 bytes is over the budget of 2,000 bytes. Largest elements:",
+        "    ul x 1: 2,049 characters",
+        f"    li.search-result x 50: {2049 - len('<ul></ul>'):,} characters",
+        "  51 template loads is over the budget of 20. Most loaded:",
+        "    result.html x 50",
+        "    search.html x 1",
+    ]
+
+    with pytest.raises(AssertionError, match="No requests were made"):
+        with test.render_budget():
+            pass
+
+    # the environment is left as it was
+    assert "get_template" not in app.jinja_env.__dict__
+    test.client.get("/search/1")
+
+
+def test_flask_render_budget_restores_get_template():
+    flask = pytest.importorskip("flask")
+    jinja2 = pytest.importorskip("jinja2")
+    pytest.importorskip("blinker")
+
+    app = flask.Flask(__name__)
+    app.jinja_loader = jinja2.DictLoader({"page.html": "<p>{{ text }}</p>"})
+    loaded = []
+
+    def get_template(name, *args, **kwargs):
+        loaded.append(name)
+        return jinja2.Environment.get_template(app.jinja_env, name, *args, **kwargs)
+    app.jinja_env.get_template = get_template
+
+    @app.route("/")
+    def page():
+        return flask.render_template("page.html", text="hello")
+
+    class TestPage(BaseFrontendApplicationTest):
+        pass
+
+    test = TestPage()
+    test.app, test.client = app, app.test_client()
+    with test.render_budget(max_template_loads=1) as outer_budget:
+        with test.render_budget(max_template_loads=1) as inner_budget:
+            test.client.get("/")
+        assert app.jinja_env.get_template is not get_template
+        test.client.get("/")
+
+    assert app.jinja_env.get_template is get_template
+    assert [sum(cost.template_loads.values()) for cost in outer_budget.costs] == [1, 1]
+    assert [sum(cost.template_loads.values()) for cost in inner_budget.costs] == [1]
+    assert loaded == ["page.html", "page.html"]
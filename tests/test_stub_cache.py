@@ -0,0 +1,167 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from unittest import mock
+
+from dmtestutils.api_model_stubs import ServiceStub, SupplierStub
+import pytest
+
+from dmtestutils import stub_cache
+from dmtestutils.stub_cache import cached_stub_corpus, clear_stub_cache, default_cache_dir, stub_corpus_key
+
+
+class CountingServiceStub(ServiceStub):
+    constructed = 0
+    _lock = threading.Lock()
+
+    def __init__(self, **kwargs):
+        with self._lock:
+            CountingServiceStub.constructed += 1
+        super().__init__(**kwargs)
+
+
+class TestStubCorpusKey:
+    def test_key_depends_on_class_kwargs_and_method(self):
+        keys = {
+            stub_corpus_key(ServiceStub, [{"service_id": 1}]),
+            stub_corpus_key(ServiceStub, [{"service_id": 2}]),
+            stub_corpus_key(SupplierStub, [{"service_id": 1}]),
+            stub_corpus_key(ServiceStub, [{"service_id": 1}], response_method="single_result_response"),
+        }
+        assert len(keys) == 4
+        assert stub_corpus_key(ServiceStub, [{"service_id": 1}]) == stub_corpus_key(ServiceStub, [{"service_id": 1}])
+
+    def test_key_depends_on_version(self):
+        key = stub_corpus_key(ServiceStub, [{}])
+        with mock.patch("dmtestutils.stub_cache.__version__", "0.0.0"):
+            assert stub_corpus_key(ServiceStub, [{}]) != key
+
+
+class TestCachedStubCorpus:
+    def setup_method(self, method):
+        CountingServiceStub.constructed = 0
+
+    def test_builds_once_then_loads(self, tmp_path):
+        kwargs_list = [{"service_id": i} for i in range(20)]
+        expected = [ServiceStub(**kwargs).response() for kwargs in kwargs_list]
+
+        assert cached_stub_corpus(CountingServiceStub, kwargs_list, cache_dir=str(tmp_path)) == expected
+        assert CountingServiceStub.constructed == 20
+
+        assert cached_stub_corpus(CountingServiceStub, kwargs_list, cache_dir=str(tmp_path)) == expected
+        assert CountingServiceStub.constructed == 20
+        assert not any(name.endswith((".lock", ".tmp")) for name in os.listdir(tmp_path))
+
+    def test_response_method(self, tmp_path):
+        corpus = cached_stub_corpus(
+            SupplierStub, [{"id": 1}], response_method="single_result_response", cache_dir=str(tmp_path),
+        )
+        assert corpus == [SupplierStub(id=1).single_result_response()]
+
+    def test_concurrent_callers_build_once(self, tmp_path):
+        kwargs_list = [{"service_id": i} for i in range(500)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: cached_stub_corpus(CountingServiceStub, kwargs_list, cache_dir=str(tmp_path)),
+                range(8),
+            ))
+
+        assert CountingServiceStub.constructed == 500
+        assert all(result == results[0] for result in results)
+
+    def test_gives_up_waiting_on_stuck_builder(self, tmp_path):
+        kwargs_list = [{"service_id": 1}]
+        path = os.path.join(str(tmp_path), stub_corpus_key(CountingServiceStub, kwargs_list) + ".pickle")
+        open(path + ".lock", "w").close()
+
+        corpus = cached_stub_corpus(CountingServiceStub, kwargs_list, cache_dir=str(tmp_path), timeout=0.1)
+
+        assert corpus == [ServiceStub(service_id=1).response()]
+        assert not os.path.exists(path)
+
+    def test_reclaims_lock_of_crashed_builder(self, tmp_path):
+        kwargs_list = [{"service_id": 1}]
+        path = os.path.join(str(tmp_path), stub_corpus_key(CountingServiceStub, kwargs_list) + ".pickle")
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        with open(path + ".lock", "w") as f:
+            f.write(f"{socket.gethostname()}:{dead.pid}")
+
+        start = time.monotonic()
+        cached_stub_corpus(CountingServiceStub, kwargs_list, cache_dir=str(tmp_path), timeout=10)
+
+        assert time.monotonic() - start < 5
+        # it was built and cached, not given up on
+        assert os.path.exists(path)
+        assert not os.path.exists(path + ".lock")
+
+    def test_reclaims_old_lock_from_another_host(self, tmp_path):
+        kwargs_list = [{"service_id": 1}]
+        path = os.path.join(str(tmp_path), stub_corpus_key(CountingServiceStub, kwargs_list) + ".pickle")
+        with open(path + ".lock", "w") as f:
+            f.write("another-host:1")
+        os.utime(path + ".lock", (time.time() - 60, time.time() - 60))
+
+        cached_stub_corpus(CountingServiceStub, kwargs_list, cache_dir=str(tmp_path), timeout=10, stale_lock_age=30)
+        assert os.path.exists(path)
+
+    def test_doesnt_remove_a_lock_taken_by_someone_else(self, tmp_path):
+        class LockStealingServiceStub(ServiceStub):
+            def __init__(self, **kwargs):
+                # another worker decides our lock is stale and takes it over while we build
+                os.unlink(path + ".lock")
+                with open(path + ".lock", "w") as f:
+                    f.write("another-host:1")
+                super().__init__(**kwargs)
+
+        kwargs_list = [{"service_id": 1}]
+        path = os.path.join(str(tmp_path), stub_corpus_key(LockStealingServiceStub, kwargs_list) + ".pickle")
+        cached_stub_corpus(LockStealingServiceStub, kwargs_list, cache_dir=str(tmp_path))
+
+        with open(path + ".lock") as f:
+            assert f.read() == "another-host:1"
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".removing")]
+
+    def test_reclaiming_a_stale_lock_doesnt_remove_a_fresh_one(self, tmp_path):
+        lock_path = str(tmp_path / "corpus.lock")
+        with open(lock_path, "w") as f:
+            f.write("another-host:1")
+        stale_inode = os.stat(lock_path).st_ino
+
+        # another worker got there first, and has already replaced the stale lock with its own
+        os.rename(lock_path, lock_path + ".old")
+        with open(lock_path, "w") as f:
+            f.write("another-host:2")
+        assert os.stat(lock_path).st_ino != stale_inode
+
+        assert not stub_cache._remove_lock(lock_path, stale_inode)
+        with open(lock_path) as f:
+            assert f.read() == "another-host:2"
+        assert stub_cache._remove_lock(lock_path, os.stat(lock_path).st_ino)
+        assert not os.path.exists(lock_path)
+        assert sorted(os.listdir(tmp_path)) == ["corpus.lock.old"]
+
+    @pytest.mark.skipif(not hasattr(os, "getuid"), reason="unix permissions")
+    def test_cache_dir_is_private(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("DMTESTUTILS_STUB_CACHE_DIR", raising=False)
+        assert default_cache_dir().endswith(f"-{os.getuid()}")
+
+        cache_dir = str(tmp_path / "cache")
+        cached_stub_corpus(CountingServiceStub, [{}], cache_dir=cache_dir)
+        assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+
+        shared_dir = tmp_path / "shared"
+        shared_dir.mkdir()
+        shared_dir.chmod(0o777)
+        with pytest.raises(PermissionError, match="can be written to by other users"):
+            cached_stub_corpus(CountingServiceStub, [{}], cache_dir=str(shared_dir))
+
+    def test_clear_stub_cache(self, tmp_path):
+        cache_dir = str(tmp_path / "cache")
+        cached_stub_corpus(CountingServiceStub, [{}], cache_dir=cache_dir)
+        clear_stub_cache(cache_dir)
+        assert not os.path.exists(cache_dir)
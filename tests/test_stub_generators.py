@@ -0,0 +1,92 @@
+import pytest
+
+from dmtestutils.api_model_stubs import (
+    AuditEventStub,
+    BriefResponseStub,
+    BriefStub,
+    FrameworkStub,
+    ServiceStub,
+    SupplierFrameworkStub,
+    SupplierStub,
+)
+from dmtestutils.stub_generators import DOS_SLUGS, G_CLOUD_SLUGS, StubGenerator
+
+
+ALL_STUB_CLASSES = (
+    AuditEventStub,
+    BriefResponseStub,
+    BriefStub,
+    FrameworkStub,
+    ServiceStub,
+    SupplierFrameworkStub,
+    SupplierStub,
+)
+
+
+class TestStubGenerator:
+    @pytest.mark.parametrize("stub_class", ALL_STUB_CLASSES)
+    def test_same_seed_same_stubs(self, stub_class):
+        first = [stub.response() for stub in StubGenerator(seed=42).stubs(stub_class, 50)]
+        second = [stub.response() for stub in StubGenerator(seed=42).stubs(stub_class, 50)]
+        different = [stub.response() for stub in StubGenerator(seed=43).stubs(stub_class, 50)]
+
+        assert all(isinstance(stub, stub_class) for stub in StubGenerator(seed=42).stubs(stub_class, 5))
+        assert first == second
+        assert first != different
+
+    @pytest.mark.parametrize("stub_class", ALL_STUB_CLASSES)
+    def test_no_snakecase_kwargs_leak_into_response(self, stub_class):
+        for stub in StubGenerator(seed=1).stubs(stub_class, 200):
+            assert not [key for key in stub.response() if "_" in key]
+
+    def test_kwargs_override_generated_values(self):
+        brief = StubGenerator(seed=1).brief(status="draft", title="A title")
+        assert brief.response()["status"] == "draft"
+        assert brief.response()["title"] == "A title"
+
+    def test_briefs_have_status_dependent_timestamps(self):
+        for stub in StubGenerator(seed=2).stubs(BriefStub, 200):
+            brief = stub.response()
+            assert ("publishedAt" in brief) == (brief["status"] != "draft")
+            assert ("withdrawnAt" in brief) == (brief["status"] == "withdrawn")
+            assert brief["framework"]["slug"] == brief["frameworkSlug"]
+            assert brief["lotSlug"] in ("digital-outcomes", "digital-specialists", "user-research-participants")
+
+    def test_frameworks_have_family_lots(self):
+        for stub in StubGenerator(seed=3).stubs(FrameworkStub, 200):
+            framework = stub.response()
+            lot_slugs = {lot["slug"] for lot in framework["lots"]}
+            if framework["family"] == "g-cloud":
+                if int(framework["slug"].split("-")[-1]) <= 8:
+                    assert lot_slugs == {"saas", "paas", "iaas", "scs"}
+                else:
+                    assert lot_slugs == {"cloud-hosting", "cloud-software", "cloud-support"}
+            else:
+                assert "digital-specialists" in lot_slugs
+
+    def test_framework_slugs_come_from_the_catalogue(self):
+        assert G_CLOUD_SLUGS[0] == "g-cloud-4" and "g-cloud-13" in G_CLOUD_SLUGS
+        assert DOS_SLUGS[0] == "digital-outcomes-and-specialists"
+        assert "digital-outcomes-and-specialists-6" in DOS_SLUGS
+
+    @pytest.mark.parametrize("framework_slug, family", (
+        ("g-cloud-13", "g-cloud"),
+        ("g-cloud-14", "g-cloud"),
+        ("digital-outcomes-and-specialists-6", "digital-outcomes-and-specialists"),
+        ("digital-outcomes-and-specialists", "digital-outcomes-and-specialists"),
+        ("some-other-framework", "some-other-framework"),
+    ))
+    def test_supplier_frameworks_have_framework_family(self, framework_slug, family):
+        supplier_framework = StubGenerator(seed=6).supplier_framework(framework_slug=framework_slug).response()
+        assert supplier_framework["frameworkFamily"] == supplier_framework["frameworkFramework"] == family
+
+    def test_services_have_framework_lots(self):
+        for stub in StubGenerator(seed=4).stubs(ServiceStub, 200, framework_slug="g-cloud-7"):
+            service = stub.response()
+            assert service["lotSlug"] in ("saas", "paas", "iaas", "scs")
+            assert service["frameworkName"] == "G-Cloud 7"
+            assert service["links"]["self"].endswith(service["id"])
+
+    def test_endless_stubs(self):
+        stubs = StubGenerator(seed=5).stubs(SupplierStub)
+        assert len([next(stubs) for _ in range(10)]) == 10